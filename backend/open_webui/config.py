@@ -2081,6 +2081,99 @@ ENABLE_RAG_HYBRID_SEARCH = PersistentConfig(
     os.environ.get("ENABLE_RAG_HYBRID_SEARCH", "").lower() == "true",
 )
 
+# Persistent BM25 indexes used by hybrid search, one SQLite file per collection.
+# Disable when several hosts share a vector DB but not the data directory.
+ENABLE_RAG_BM25_INDEX = (
+    os.environ.get("ENABLE_RAG_BM25_INDEX", "True").lower() == "true"
+)
+RAG_BM25_INDEX_DIR = os.environ.get("RAG_BM25_INDEX_DIR", f"{CACHE_DIR}/bm25")
+
+try:
+    RAG_BM25_INDEX_MMAP_SIZE = int(
+        os.environ.get("RAG_BM25_INDEX_MMAP_SIZE", str(256 * 1024 * 1024))
+    )
+except ValueError:
+    RAG_BM25_INDEX_MMAP_SIZE = 256 * 1024 * 1024
+
+# Query embedding cache: an in-memory LRU of RAG_EMBEDDING_CACHE_SIZE entries
+# (0 disables it), backed by "redis" (REDIS_URL) or "sqlite" when set
+try:
+    RAG_EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "2048"))
+except ValueError:
+    RAG_EMBEDDING_CACHE_SIZE = 2048
+
+RAG_EMBEDDING_CACHE_BACKEND = os.environ.get("RAG_EMBEDDING_CACHE_BACKEND", "").lower()
+RAG_EMBEDDING_CACHE_PATH = os.environ.get(
+    "RAG_EMBEDDING_CACHE_PATH", f"{CACHE_DIR}/embeddings.sqlite3"
+)
+
+try:
+    RAG_EMBEDDING_CACHE_TTL = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_TTL", str(7 * 24 * 60 * 60))
+    )
+except ValueError:
+    RAG_EMBEDDING_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Embedding requests to ollama/openai/azure_openai: batches hold at most
+# RAG_EMBEDDING_BATCH_SIZE texts and RAG_EMBEDDING_BATCH_MAX_TOKENS tokens,
+# and up to RAG_EMBEDDING_CONCURRENT_REQUESTS are sent at once per call
+try:
+    RAG_EMBEDDING_BATCH_MAX_TOKENS = int(
+        os.environ.get("RAG_EMBEDDING_BATCH_MAX_TOKENS", "32000")
+    )
+except ValueError:
+    RAG_EMBEDDING_BATCH_MAX_TOKENS = 32000
+
+try:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = int(
+        os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "4")
+    )
+except ValueError:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = 4
+
+try:
+    RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "3"))
+except ValueError:
+    RAG_EMBEDDING_MAX_RETRIES = 3
+
+# Chunks embedded and written to the vector DB at a time while ingesting,
+# which bounds the chunks, embeddings and items held in memory
+try:
+    RAG_INGEST_WINDOW_SIZE = int(os.environ.get("RAG_INGEST_WINDOW_SIZE", "512"))
+except ValueError:
+    RAG_INGEST_WINDOW_SIZE = 512
+
+# Files prepared and embedded at once by /process/files/batch
+try:
+    RAG_BATCH_PROCESSING_WORKERS = int(
+        os.environ.get("RAG_BATCH_PROCESSING_WORKERS", str(min(8, os.cpu_count() or 1)))
+    )
+except ValueError:
+    RAG_BATCH_PROCESSING_WORKERS = min(8, os.cpu_count() or 1)
+
+# Files embedded at once by a knowledge reindex job
+try:
+    RAG_REINDEX_WORKERS = int(os.environ.get("RAG_REINDEX_WORKERS", "4"))
+except ValueError:
+    RAG_REINDEX_WORKERS = 4
+
+# Worker processes that split large ingests; 1 or less splits in process
+try:
+    RAG_TEXT_SPLITTER_WORKERS = int(
+        os.environ.get("RAG_TEXT_SPLITTER_WORKERS", str(min(8, os.cpu_count() or 1)))
+    )
+except ValueError:
+    RAG_TEXT_SPLITTER_WORKERS = min(8, os.cpu_count() or 1)
+
+# Ingests with less text than this are split in process, as sending them to
+# the workers costs more than it saves
+try:
+    RAG_TEXT_SPLITTER_PROCESS_MIN_CHARS = int(
+        os.environ.get("RAG_TEXT_SPLITTER_PROCESS_MIN_CHARS", "1000000")
+    )
+except ValueError:
+    RAG_TEXT_SPLITTER_PROCESS_MIN_CHARS = 1000000
+
 RAG_FULL_CONTEXT = PersistentConfig(
     "RAG_FULL_CONTEXT",
     "rag.full_context",
@@ -336,6 +336,22 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Streamed message updates are buffered and written at most this often (seconds)
+CHAT_SAVE_FLUSH_INTERVAL = os.environ.get("CHAT_SAVE_FLUSH_INTERVAL", "1")
+
+try:
+    CHAT_SAVE_FLUSH_INTERVAL = max(float(CHAT_SAVE_FLUSH_INTERVAL), 0.0)
+except Exception:
+    CHAT_SAVE_FLUSH_INTERVAL = 1.0
+
+# ... or as soon as this many bytes are buffered for a message
+CHAT_SAVE_FLUSH_SIZE = os.environ.get("CHAT_SAVE_FLUSH_SIZE", "65536")
+
+try:
+    CHAT_SAVE_FLUSH_SIZE = max(int(CHAT_SAVE_FLUSH_SIZE), 0)
+except Exception:
+    CHAT_SAVE_FLUSH_SIZE = 65536
+
 ####################################
 # REDIS
 ####################################
@@ -376,6 +392,15 @@ BYPASS_MODEL_ACCESS_CONTROL = (
     os.environ.get("BYPASS_MODEL_ACCESS_CONTROL", "False").lower() == "true"
 )
 
+# Seconds the model list is served before it is rebuilt in the background,
+# 0 rebuilds it on every request
+MODELS_CACHE_TTL = os.environ.get("MODELS_CACHE_TTL", "60")
+
+try:
+    MODELS_CACHE_TTL = max(int(MODELS_CACHE_TTL), 0)
+except Exception:
+    MODELS_CACHE_TTL = 60
+
 WEBUI_AUTH_SIGNOUT_REDIRECT_URL = os.environ.get(
     "WEBUI_AUTH_SIGNOUT_REDIRECT_URL", None
 )
@@ -453,6 +478,23 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 10
 
+# How requests for a model served by several Ollama URLs pick one:
+# "least_outstanding", "power_of_two" or "random"
+OLLAMA_ROUTING_STRATEGY = os.environ.get(
+    "OLLAMA_ROUTING_STRATEGY", "least_outstanding"
+).lower()
+
+if OLLAMA_ROUTING_STRATEGY not in ["least_outstanding", "power_of_two", "random"]:
+    OLLAMA_ROUTING_STRATEGY = "least_outstanding"
+
+# Seconds between /api/ps polls of the Ollama URLs (0 disables polling)
+OLLAMA_PS_POLL_INTERVAL = os.environ.get("OLLAMA_PS_POLL_INTERVAL", "10")
+
+try:
+    OLLAMA_PS_POLL_INTERVAL = max(int(OLLAMA_PS_POLL_INTERVAL), 0)
+except Exception:
+    OLLAMA_PS_POLL_INTERVAL = 10
+
 
 AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA", "10"
@@ -588,3 +630,80 @@ EXTERNAL_PWA_MANIFEST_URL = os.environ.get("EXTERNAL_PWA_MANIFEST_URL")
 NOTION_INTEGRATION_TOKEN = os.environ.get("NOTION_INTEGRATION_TOKEN", "")
 NOTION_DB_ID = os.environ.get("NOTION_DB_ID", "")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+
+NOTION_API_BASE_URL = os.environ.get(
+    "NOTION_API_BASE_URL", "https://api.notion.com/v1"
+).rstrip("/")
+
+NOTION_CLIENT_TIMEOUT = os.environ.get("NOTION_CLIENT_TIMEOUT", "30")
+
+try:
+    NOTION_CLIENT_TIMEOUT = int(NOTION_CLIENT_TIMEOUT)
+except Exception:
+    NOTION_CLIENT_TIMEOUT = 30
+
+# Notion allows an average of three requests per second per integration
+NOTION_CLIENT_MAX_CONCURRENCY = os.environ.get("NOTION_CLIENT_MAX_CONCURRENCY", "3")
+
+try:
+    NOTION_CLIENT_MAX_CONCURRENCY = max(int(NOTION_CLIENT_MAX_CONCURRENCY), 1)
+except Exception:
+    NOTION_CLIENT_MAX_CONCURRENCY = 3
+
+NOTION_CLIENT_MAX_RETRIES = os.environ.get("NOTION_CLIENT_MAX_RETRIES", "5")
+
+try:
+    NOTION_CLIENT_MAX_RETRIES = max(int(NOTION_CLIENT_MAX_RETRIES), 0)
+except Exception:
+    NOTION_CLIENT_MAX_RETRIES = 5
+
+# Requests per second across all Notion calls of an integration
+NOTION_CLIENT_RATE_LIMIT = os.environ.get("NOTION_CLIENT_RATE_LIMIT", "3")
+
+try:
+    NOTION_CLIENT_RATE_LIMIT = max(float(NOTION_CLIENT_RATE_LIMIT), 0.0)
+except Exception:
+    NOTION_CLIENT_RATE_LIMIT = 3.0
+
+NOTION_SCHEMA_CACHE_TTL = os.environ.get("NOTION_SCHEMA_CACHE_TTL", "300")
+
+try:
+    NOTION_SCHEMA_CACHE_TTL = max(int(NOTION_SCHEMA_CACHE_TTL), 0)
+except Exception:
+    NOTION_SCHEMA_CACHE_TTL = 300
+
+# Seconds between full workspace user pulls, 0 disables the background sync
+NOTION_USER_SYNC_INTERVAL = os.environ.get("NOTION_USER_SYNC_INTERVAL", "3600")
+
+try:
+    NOTION_USER_SYNC_INTERVAL = max(int(NOTION_USER_SYNC_INTERVAL), 0)
+except Exception:
+    NOTION_USER_SYNC_INTERVAL = 3600
+
+NOTION_USERS_SNAPSHOT_PATH = os.environ.get(
+    "NOTION_USERS_SNAPSHOT_PATH", str(DATA_DIR / "notion_users.json")
+)
+
+# Attachment limits for the feature-request form, in MB
+NOTION_ATTACHMENT_MAX_FILE_SIZE = os.environ.get(
+    "NOTION_ATTACHMENT_MAX_FILE_SIZE", "100"
+)
+
+try:
+    NOTION_ATTACHMENT_MAX_FILE_SIZE = max(int(NOTION_ATTACHMENT_MAX_FILE_SIZE), 1)
+except Exception:
+    NOTION_ATTACHMENT_MAX_FILE_SIZE = 100
+
+NOTION_ATTACHMENT_MAX_REQUEST_SIZE = os.environ.get(
+    "NOTION_ATTACHMENT_MAX_REQUEST_SIZE", "250"
+)
+
+try:
+    NOTION_ATTACHMENT_MAX_REQUEST_SIZE = max(int(NOTION_ATTACHMENT_MAX_REQUEST_SIZE), 1)
+except Exception:
+    NOTION_ATTACHMENT_MAX_REQUEST_SIZE = 250
+
+# Store attachments with the configured StorageProvider instead of static/uploads
+ENABLE_NOTION_ATTACHMENT_STORAGE = (
+    os.environ.get("ENABLE_NOTION_ATTACHMENT_STORAGE", "False").lower() == "true"
+)
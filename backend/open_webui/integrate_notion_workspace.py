@@ -13,6 +13,7 @@ Usage:
 
 import os
 import sys
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -84,7 +85,7 @@ def example_integration():
         return False
 
 
-def test_functionality():
+async def test_functionality():
     """Test the Notion workspace functionality."""
     try:
         from notion_workspace_manager import NotionWorkspaceManager
@@ -93,7 +94,7 @@ def test_functionality():
         manager = NotionWorkspaceManager()
 
         # Test getting users
-        users = manager.get_workspace_users()
+        users = await manager.get_workspace_users()
         print(f"Found {len(users)} users in workspace")
 
         # Test name matching
@@ -106,7 +107,7 @@ def test_functionality():
                 print(f"Name matching failed for '{test_name}'")
 
         # Test database schema
-        schema = manager.get_database_schema()
+        schema = await manager.get_database_schema()
         print(f"Database schema retrieved successfully")
         return True
 
@@ -124,7 +125,7 @@ def main():
         return 1
 
     # Test functionality
-    if not test_functionality():
+    if not asyncio.run(test_functionality()):
         return 1
 
     # Show integration example
@@ -59,6 +59,7 @@ from open_webui.socket.main import (
     periodic_usage_pool_cleanup,
     get_models_in_use,
     get_active_user_ids,
+    set_event_loop,
 )
 from open_webui.routers import (
     audio,
@@ -93,6 +94,8 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.reindex import run_reindex_jobs
 
 from open_webui.internal.db import Session, engine
 
@@ -423,6 +426,7 @@ from open_webui.env import (
 
 
 from open_webui.utils.models import (
+    MODEL_REGISTRY,
     get_all_models,
     get_all_base_models,
     check_model_access,
@@ -434,7 +438,7 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import access_cache, has_access
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -443,10 +447,14 @@ from open_webui.utils.auth import (
     get_admin_user,
     get_verified_user,
 )
-from open_webui.utils.plugin import install_tool_and_function_dependencies
+from open_webui.utils.plugin import (
+    install_tool_and_function_dependencies,
+    module_cache_listener,
+)
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.notion import close_notion_clients
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -527,22 +535,38 @@ async def lifespan(app: FastAPI):
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        app.state.module_cache_listener = asyncio.create_task(
+            module_cache_listener(app)
+        )
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
+    set_event_loop(asyncio.get_running_loop())
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(notion.periodic_notion_user_sync(app))
 
     # Ensure all database tables are created
     from open_webui.internal.db import Base, engine
 
     Base.metadata.create_all(bind=engine)
 
+    model_registry_task = asyncio.create_task(MODEL_REGISTRY.run(app))
+    ollama_ps_poll_task = asyncio.create_task(ollama.periodic_ollama_ps_poll(app))
+    reindex_task = asyncio.create_task(run_reindex_jobs(app))
+
     yield
 
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
+    if hasattr(app.state, "module_cache_listener"):
+        app.state.module_cache_listener.cancel()
+    model_registry_task.cancel()
+    ollama_ps_poll_task.cancel()
+    reindex_task.cancel()
+
+    await close_notion_clients()
 
 
 app = FastAPI(
@@ -704,12 +728,6 @@ app.state.EXTERNAL_PWA_MANIFEST_URL = EXTERNAL_PWA_MANIFEST_URL
 
 app.state.USER_COUNT = None
 
-app.state.TOOLS = {}
-app.state.TOOL_CONTENTS = {}
-
-app.state.FUNCTIONS = {}
-app.state.FUNCTION_CONTENTS = {}
-
 ########################################
 #
 # RETRIEVAL
@@ -902,6 +920,7 @@ app.state.EMBEDDING_FUNCTION = get_embedding_function(
         if app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
         else None
     ),
+    cache=EMBEDDING_CACHE,
 )
 
 ########################################
@@ -1091,6 +1110,12 @@ async def commit_session_after_request(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def memoize_access_checks(request: Request, call_next):
+    with access_cache():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def check_url(request: Request, call_next):
     start_time = int(time.time())
@@ -0,0 +1,46 @@
+"""Add message and message_reaction indexes
+
+Revision ID: a6c2e9f41d07
+Revises: f3a9d6b81c24
+Create Date: 2025-06-23 10:00:00.000000
+
+"""
+
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "a6c2e9f41d07"
+down_revision = "f3a9d6b81c24"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "message": {
+        "ix_message_channel_id_parent_id_created_at": [
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ],
+        "ix_message_parent_id_created_at": ["parent_id", "created_at"],
+    },
+    "message_reaction": {
+        "ix_message_reaction_message_id": ["message_id"],
+    },
+}
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    for table, indexes in INDEXES.items():
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table)}
+        for name, columns in indexes.items():
+            if name not in existing_indexes:
+                op.create_index(name, table, columns)
+
+
+def downgrade():
+    for table, indexes in INDEXES.items():
+        for name in indexes:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,77 @@
+"""Add reindex job tables
+
+Revision ID: b7d4e2f90a15
+Revises: a6c2e9f41d07
+Create Date: 2025-06-20 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "b7d4e2f90a15"
+down_revision = "a6c2e9f41d07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = set(inspector.get_table_names())
+
+    if "reindex_job" not in existing_tables:
+        op.create_table(
+            "reindex_job",
+            sa.Column("id", sa.Text(), nullable=False, primary_key=True),
+            sa.Column("user_id", sa.Text(), nullable=True),
+            sa.Column("status", sa.Text(), nullable=False),
+            sa.Column("owner", sa.Text(), nullable=True),
+            sa.Column("heartbeat_at", sa.BigInteger(), nullable=True),
+            sa.Column("total_files", sa.BigInteger(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.BigInteger(), nullable=True),
+            sa.Column("updated_at", sa.BigInteger(), nullable=True),
+            sa.Column("finished_at", sa.BigInteger(), nullable=True),
+        )
+        op.create_index("ix_reindex_job_status", "reindex_job", ["status"])
+
+    if "reindex_knowledge" not in existing_tables:
+        op.create_table(
+            "reindex_knowledge",
+            sa.Column("job_id", sa.Text(), nullable=False),
+            sa.Column("knowledge_id", sa.Text(), nullable=False),
+            sa.Column("position", sa.BigInteger(), nullable=True),
+            sa.Column("status", sa.Text(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("updated_at", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint(
+                "job_id", "knowledge_id", name="pk_job_id_knowledge_id"
+            ),
+        )
+
+    if "reindex_file" not in existing_tables:
+        op.create_table(
+            "reindex_file",
+            sa.Column("job_id", sa.Text(), nullable=False),
+            sa.Column("knowledge_id", sa.Text(), nullable=False),
+            sa.Column("file_id", sa.Text(), nullable=False),
+            sa.Column("status", sa.Text(), nullable=False),
+            sa.Column("chunks", sa.BigInteger(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("updated_at", sa.BigInteger(), nullable=True),
+            sa.PrimaryKeyConstraint(
+                "job_id",
+                "knowledge_id",
+                "file_id",
+                name="pk_job_id_knowledge_id_file_id",
+            ),
+        )
+
+
+def downgrade():
+    op.drop_table("reindex_file")
+    op.drop_table("reindex_knowledge")
+    op.drop_index("ix_reindex_job_status", table_name="reindex_job")
+    op.drop_table("reindex_job")
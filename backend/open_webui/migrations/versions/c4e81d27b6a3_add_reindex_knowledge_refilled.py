@@ -0,0 +1,26 @@
+"""Add refilled column to reindex knowledge table
+
+Revision ID: c4e81d27b6a3
+Revises: b7d4e2f90a15
+Create Date: 2025-06-27 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "c4e81d27b6a3"
+down_revision = "b7d4e2f90a15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "reindex_knowledge",
+        sa.Column("refilled", sa.Boolean(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("reindex_knowledge", "refilled")
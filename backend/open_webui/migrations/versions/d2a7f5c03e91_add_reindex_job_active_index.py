@@ -0,0 +1,47 @@
+"""Allow a single active reindex job
+
+Revision ID: d2a7f5c03e91
+Revises: c4e81d27b6a3
+Create Date: 2025-06-27 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d2a7f5c03e91"
+down_revision = "c4e81d27b6a3"
+branch_labels = None
+depends_on = None
+
+ACTIVE_JOB = "status IN ('pending', 'running')"
+
+
+def upgrade():
+    # Keep the oldest of any jobs started concurrently before this index
+    conn = op.get_bind()
+    active = conn.execute(
+        sa.text(f"SELECT id FROM reindex_job WHERE {ACTIVE_JOB} ORDER BY created_at")
+    ).fetchall()
+    for (id,) in active[1:]:
+        conn.execute(
+            sa.text(
+                "UPDATE reindex_job SET status = 'failed', "
+                "error = 'Superseded by another reindex job' WHERE id = :id"
+            ),
+            {"id": id},
+        )
+
+    op.create_index(
+        "uq_reindex_job_active",
+        "reindex_job",
+        # Postgres needs expressions in their own parentheses
+        [sa.text(f"({ACTIVE_JOB})")],
+        unique=True,
+        sqlite_where=sa.text(ACTIVE_JOB),
+        postgresql_where=sa.text(ACTIVE_JOB),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_reindex_job_active", table_name="reindex_job")
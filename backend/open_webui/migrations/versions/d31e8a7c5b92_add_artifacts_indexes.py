@@ -0,0 +1,61 @@
+"""Add artifacts table indexes
+
+Revision ID: d31e8a7c5b92
+Revises: 9f0c9cd09105
+Create Date: 2025-06-02 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "d31e8a7c5b92"
+down_revision = "9f0c9cd09105"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_artifacts_workspace_id_updated_at": ["workspace_id", "updated_at", "id"],
+    "ix_artifacts_workspace_id_priority": ["workspace_id", "priority"],
+    "ix_artifacts_workspace_id_owner": ["workspace_id", "owner"],
+}
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # The table used to be created on startup by metadata.create_all
+    if "artifacts" not in inspector.get_table_names():
+        op.create_table(
+            "artifacts",
+            sa.Column("id", sa.String(), nullable=False, primary_key=True),
+            sa.Column("workspace_id", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("client", sa.String(), nullable=False),
+            sa.Column("module", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("owner", sa.String(), nullable=False),
+            sa.Column("priority", sa.String(), nullable=False),
+            sa.Column("due_date", sa.DateTime(), nullable=False),
+            sa.Column("reference_link", sa.String(), nullable=True),
+            sa.Column("data", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        existing_indexes = set()
+    else:
+        existing_indexes = {
+            index["name"] for index in inspector.get_indexes("artifacts")
+        }
+
+    for name, columns in INDEXES.items():
+        if name not in existing_indexes:
+            op.create_index(name, "artifacts", columns)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name="artifacts")
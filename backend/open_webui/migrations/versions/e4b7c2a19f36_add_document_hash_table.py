@@ -0,0 +1,103 @@
+"""Add document_hash table
+
+Revision ID: e4b7c2a19f36
+Revises: d31e8a7c5b92
+Create Date: 2025-06-09 10:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "e4b7c2a19f36"
+down_revision = "d31e8a7c5b92"
+branch_labels = None
+depends_on = None
+
+
+def _load(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if "document_hash" in inspector.get_table_names():
+        return
+
+    document_hash = op.create_table(
+        "document_hash",
+        sa.Column("collection_name", sa.Text(), nullable=False),
+        sa.Column("hash", sa.Text(), nullable=False),
+        sa.Column("file_id", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint(
+            "collection_name", "hash", name="pk_collection_name_hash"
+        ),
+    )
+    op.create_index(
+        "ix_document_hash_collection_name_file_id",
+        "document_hash",
+        ["collection_name", "file_id"],
+    )
+
+    # Register the hashes of files that were already processed, in the
+    # collection they were last saved to and in every knowledge base that
+    # lists them
+    file_table = sa.table(
+        "file",
+        sa.column("id", sa.Text()),
+        sa.column("hash", sa.Text()),
+        sa.column("meta", sa.JSON()),
+    )
+    knowledge_table = sa.table(
+        "knowledge", sa.column("id", sa.Text()), sa.column("data", sa.JSON())
+    )
+
+    hashes = {}
+    rows = {}
+    for id, hash, meta in conn.execute(
+        sa.select(file_table.c.id, file_table.c.hash, file_table.c.meta)
+    ):
+        collection_name = (_load(meta) or {}).get("collection_name")
+        if hash and collection_name:
+            hashes[id] = hash
+            rows[(collection_name, hash)] = id
+
+    for id, data in conn.execute(
+        sa.select(knowledge_table.c.id, knowledge_table.c.data)
+    ):
+        for file_id in (_load(data) or {}).get("file_ids", []):
+            if file_id in hashes:
+                rows.setdefault((id, hashes[file_id]), file_id)
+
+    now = int(time.time())
+    if rows:
+        op.bulk_insert(
+            document_hash,
+            [
+                {
+                    "collection_name": collection_name,
+                    "hash": hash,
+                    "file_id": file_id,
+                    "created_at": now,
+                }
+                for (collection_name, hash), file_id in rows.items()
+            ],
+        )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_document_hash_collection_name_file_id", table_name="document_hash"
+    )
+    op.drop_table("document_hash")
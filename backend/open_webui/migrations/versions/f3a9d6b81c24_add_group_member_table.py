@@ -0,0 +1,65 @@
+"""Add group_member table
+
+Revision ID: f3a9d6b81c24
+Revises: e4b7c2a19f36
+Create Date: 2025-06-16 10:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "f3a9d6b81c24"
+down_revision = "e4b7c2a19f36"
+branch_labels = None
+depends_on = None
+
+
+def _load(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if "group_member" in inspector.get_table_names():
+        return
+
+    group_member = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+    )
+    op.create_index("ix_group_member_user_id", "group_member", ["user_id"])
+
+    # Copy the members listed in each group's user_ids
+    group_table = sa.table(
+        "group", sa.column("id", sa.Text()), sa.column("user_ids", sa.JSON())
+    )
+
+    now = int(time.time())
+    rows = [
+        {"group_id": id, "user_id": user_id, "created_at": now}
+        for id, user_ids in conn.execute(
+            sa.select(group_table.c.id, group_table.c.user_ids)
+        )
+        for user_id in dict.fromkeys(_load(user_ids) or [])
+    ]
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade():
+    op.drop_index("ix_group_member_user_id", table_name="group_member")
+    op.drop_table("group_member")
@@ -1,6 +1,24 @@
-from typing import Optional, List
+import uuid
+from datetime import datetime
+from typing import Callable, Literal, Optional, List, Tuple
 from pydantic import BaseModel
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    DateTime,
+    Text,
+    JSON,
+    Index,
+    and_,
+    bindparam,
+    delete,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.sql import func
 from open_webui.internal.db import Base
 
@@ -23,6 +41,21 @@ class ArtifactModel(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # id breaks updated_at ties so keyset pages are read straight off the index
+        Index(
+            "ix_artifacts_workspace_id_updated_at", "workspace_id", "updated_at", "id"
+        ),
+        Index("ix_artifacts_workspace_id_priority", "workspace_id", "priority"),
+        Index("ix_artifacts_workspace_id_owner", "workspace_id", "owner"),
+    )
+
+
+ARTIFACT_FIELDS = [column.name for column in ArtifactModel.__table__.columns]
+
+# Large columns left out of listings unless requested with `fields`
+ARTIFACT_HEAVY_FIELDS = {"description", "data"}
+
 
 class ArtifactForm(BaseModel):
     title: str
@@ -54,6 +87,57 @@ class ArtifactResponse(BaseModel):
     updated_at: str
 
 
+class ArtifactFilter(BaseModel):
+    type: Optional[str] = None
+    client: Optional[str] = None
+    module: Optional[str] = None
+    owner: Optional[str] = None
+    priority: Optional[str] = None
+    due_from: Optional[datetime] = None
+    due_to: Optional[datetime] = None
+
+
+class ArtifactListResponse(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None
+
+
+class ArtifactBulkItem(BaseModel):
+    op: Literal["upsert", "delete"]
+    id: Optional[str] = None
+    artifact: Optional[ArtifactForm] = None
+
+
+class ArtifactBulkForm(BaseModel):
+    items: List[ArtifactBulkItem]
+
+
+class ArtifactBulkResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    op: str
+    status: Literal["created", "updated", "deleted", "not_found", "error"]
+    error: Optional[str] = None
+
+
+class ArtifactBulkResponse(BaseModel):
+    results: List[ArtifactBulkResult]
+
+
+# Items applied per transaction by Artifacts.bulk_apply
+BULK_CHUNK_SIZE = 500
+
+ARTIFACT_FORM_FIELDS = list(ArtifactForm.model_fields.keys())
+
+
+def _keyset_timestamp(session, value: datetime):
+    # SQLite keeps func.now() timestamps as "YYYY-MM-DD HH:MM:SS" text, while a
+    # bound datetime is rendered with microseconds; compare in the stored format
+    if session.bind.dialect.name == "sqlite" and not value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
 class Artifacts:
     @staticmethod
     def get_artifacts_by_workspace_id(workspace_id: str) -> List[ArtifactModel]:
@@ -66,6 +150,78 @@ class Artifacts:
                 .all()
             )
 
+    @staticmethod
+    def get_artifacts_page(
+        workspace_id: str,
+        filters: Optional[ArtifactFilter] = None,
+        fields: Optional[List[str]] = None,
+        limit: int = 50,
+        cursor: Optional[Tuple[datetime, str]] = None,
+    ) -> Tuple[List[dict], Optional[Tuple[datetime, str]]]:
+        """
+        One page of a workspace's artifacts, most recently updated first.
+
+        Only the id and the columns in `fields` are returned, so listings can
+        skip the heavy description and data columns. `cursor` is the (updated_at, id) of the last
+        artifact of the previous page; the returned cursor is None on the
+        last page.
+        """
+        from open_webui.internal.db import Session
+
+        fields = fields or ARTIFACT_FIELDS
+        columns = ["id", "updated_at"] + [
+            field for field in fields if field not in ("id", "updated_at")
+        ]
+
+        with Session() as session:
+            query = session.query(
+                *[getattr(ArtifactModel, column) for column in columns]
+            ).filter(ArtifactModel.workspace_id == workspace_id)
+
+            if filters:
+                for field in ("type", "client", "module", "owner", "priority"):
+                    value = getattr(filters, field)
+                    if value is not None:
+                        query = query.filter(getattr(ArtifactModel, field) == value)
+                if filters.due_from:
+                    query = query.filter(ArtifactModel.due_date >= filters.due_from)
+                if filters.due_to:
+                    query = query.filter(ArtifactModel.due_date <= filters.due_to)
+
+            if cursor:
+                updated_at = _keyset_timestamp(session, cursor[0])
+                query = query.filter(
+                    or_(
+                        ArtifactModel.updated_at < updated_at,
+                        and_(
+                            ArtifactModel.updated_at == updated_at,
+                            ArtifactModel.id < cursor[1],
+                        ),
+                    )
+                )
+
+            rows = (
+                query.order_by(ArtifactModel.updated_at.desc(), ArtifactModel.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].updated_at, rows[-1].id)
+
+        items = []
+        for row in rows:
+            item = {}
+            for column, value in zip(columns, row):
+                if column == "id" or column in fields:
+                    item[column] = (
+                        value.isoformat() if isinstance(value, datetime) else value
+                    )
+            items.append(item)
+        return items, next_cursor
+
     @staticmethod
     def get_artifact_by_id(artifact_id: str) -> Optional[ArtifactModel]:
         from open_webui.internal.db import Session
@@ -151,3 +307,160 @@ class Artifacts:
                 session.commit()
                 return True
             return False
+
+    @staticmethod
+    def _bulk_chunks(items: List[Tuple[int, ArtifactBulkItem]], chunk_size: int):
+        """Split items into chunks in which every id appears at most once"""
+        chunk, ids = [], set()
+        for index, item in items:
+            if len(chunk) >= chunk_size or (item.id and item.id in ids):
+                yield chunk
+                chunk, ids = [], set()
+            chunk.append((index, item))
+            if item.id:
+                ids.add(item.id)
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _bulk_upsert(session, rows: List[dict]):
+        dialect = session.bind.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = dialect_insert(ArtifactModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ArtifactModel.id],
+                set_={
+                    **{field: stmt.excluded[field] for field in ARTIFACT_FORM_FIELDS},
+                    "updated_at": func.now(),
+                },
+                # Never move an artifact to another workspace
+                where=ArtifactModel.workspace_id == stmt.excluded.workspace_id,
+            )
+            session.execute(stmt, rows)
+        else:
+            existing = set(
+                session.scalars(
+                    select(ArtifactModel.id).where(
+                        ArtifactModel.id.in_([row["id"] for row in rows])
+                    )
+                )
+            )
+            new_rows = [row for row in rows if row["id"] not in existing]
+            if new_rows:
+                session.execute(insert(ArtifactModel), new_rows)
+            updated_rows = [
+                {**row, "artifact_id": row["id"]}
+                for row in rows
+                if row["id"] in existing
+            ]
+            if updated_rows:
+                table = ArtifactModel.__table__
+                session.execute(
+                    update(table).where(table.c.id == bindparam("artifact_id")),
+                    updated_rows,
+                )
+
+    @staticmethod
+    def bulk_apply(
+        workspace_id: str,
+        items: List[ArtifactBulkItem],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        validate: Optional[Callable[[Optional[dict]], List[str]]] = None,
+    ) -> List[ArtifactBulkResult]:
+        """
+        Apply a mixed list of upserts and deletes to a workspace, in one
+        transaction per chunk of `chunk_size` items, and report each item's
+        outcome in input order. A chunk that fails is rolled back as a whole
+        and the remaining chunks are still applied. `validate` checks the
+        `data` of each upsert and returns its errors.
+        """
+        from open_webui.internal.db import Session
+
+        results: List[Optional[ArtifactBulkResult]] = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                if item.op == "delete":
+                    if not item.id:
+                        raise ValueError("id is required to delete an artifact")
+                    row = None
+                else:
+                    if item.artifact is None:
+                        raise ValueError("artifact is required to upsert an artifact")
+                    if validate:
+                        errors = validate(item.artifact.data)
+                        if errors:
+                            raise ValueError("; ".join(errors))
+                    item.id = item.id or str(uuid.uuid4())
+                    row = {
+                        **item.artifact.model_dump(),
+                        "id": item.id,
+                        "workspace_id": workspace_id,
+                        "due_date": datetime.fromisoformat(item.artifact.due_date),
+                    }
+                valid.append((index, item, row))
+            except ValueError as e:
+                results[index] = ArtifactBulkResult(
+                    index=index, id=item.id, op=item.op, status="error", error=str(e)
+                )
+
+        rows_by_index = {index: row for index, _, row in valid}
+        for chunk in Artifacts._bulk_chunks(
+            [(index, item) for index, item, _ in valid], chunk_size
+        ):
+            ids = [item.id for _, item in chunk]
+            try:
+                with Session() as session:
+                    owners = dict(
+                        session.execute(
+                            select(ArtifactModel.id, ArtifactModel.workspace_id).where(
+                                ArtifactModel.id.in_(ids)
+                            )
+                        ).all()
+                    )
+
+                    upserts, deletes = [], []
+                    for index, item in chunk:
+                        owner = owners.get(item.id)
+                        if owner is not None and owner != workspace_id:
+                            status, error = (
+                                "error",
+                                "Artifact belongs to another workspace",
+                            )
+                        elif item.op == "delete":
+                            status, error = ("deleted" if owner else "not_found"), None
+                            if owner:
+                                deletes.append(item.id)
+                        else:
+                            status, error = ("updated" if owner else "created"), None
+                            upserts.append(rows_by_index[index])
+                        results[index] = ArtifactBulkResult(
+                            index=index,
+                            id=item.id,
+                            op=item.op,
+                            status=status,
+                            error=error,
+                        )
+
+                    if upserts:
+                        Artifacts._bulk_upsert(session, upserts)
+                    if deletes:
+                        session.execute(
+                            delete(ArtifactModel).where(
+                                ArtifactModel.id.in_(deletes),
+                                ArtifactModel.workspace_id == workspace_id,
+                            )
+                        )
+                    session.commit()
+            except Exception as e:
+                for index, item in chunk:
+                    results[index] = ArtifactBulkResult(
+                        index=index,
+                        id=item.id,
+                        op=item.op,
+                        status="error",
+                        error=str(e),
+                    )
+
+        return results
@@ -10,7 +10,8 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import or_, func, select, and_, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import exists
 
 ####################
@@ -248,6 +249,117 @@ class ChatTable:
         chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
+    def update_message_fields_by_id_and_message_id(
+        self,
+        id: str,
+        message_id: str,
+        fields: dict,
+        append_content: str = "",
+    ) -> bool:
+        """
+        Set `fields` on an existing message and append `append_content` to its
+        content, making it the current message. On SQLite and PostgreSQL only
+        the changed values are sent and patched in place in the chat JSON;
+        otherwise (or if the message doesn't exist yet) the whole chat is
+        rewritten. Returns False if the chat doesn't exist.
+        """
+        try:
+            with get_db() as db:
+                dialect = db.bind.dialect.name
+                quotable = all('"' not in key for key in [message_id, *fields])
+                if dialect == "sqlite" and quotable:
+                    message_path = f'$.history.messages."{message_id}"'
+                    args, params = [":current_path", ":message_id"], {
+                        "current_path": "$.history.currentId",
+                        "message_id": message_id,
+                    }
+                    for i, (key, value) in enumerate(fields.items()):
+                        if key == "content" and append_content:
+                            value = value + append_content
+                        args += [f":path_{i}", f"json(:value_{i})"]
+                        params[f"path_{i}"] = f'{message_path}."{key}"'
+                        params[f"value_{i}"] = json.dumps(value)
+                    if append_content and "content" not in fields:
+                        args += [
+                            ":content_path",
+                            "COALESCE(json_extract(chat, :content_path), '') || :append",
+                        ]
+                        params["content_path"] = f"{message_path}.content"
+                        params["append"] = append_content
+
+                    result = db.execute(
+                        text(
+                            f"UPDATE chat SET chat = json_set(chat, {', '.join(args)}), "
+                            "updated_at = :updated_at "
+                            "WHERE id = :id AND json_type(chat, :message_path) = 'object'"
+                        ),
+                        {
+                            **params,
+                            "message_path": message_path,
+                            "updated_at": int(time.time()),
+                            "id": id,
+                        },
+                    )
+                    db.commit()
+                    if result.rowcount:
+                        return True
+                elif dialect == "postgresql":
+                    patch = dict(fields)
+                    if "content" in patch and append_content:
+                        patch["content"] += append_content
+                    message = "(chat::jsonb #> :message_path) || CAST(:patch AS jsonb)"
+                    binds = [bindparam("message_path", type_=ARRAY(Text))]
+                    params = {
+                        "message_path": ["history", "messages", message_id],
+                        "patch": json.dumps(patch),
+                    }
+                    if append_content and "content" not in patch:
+                        message += (
+                            " || jsonb_build_object('content', "
+                            "COALESCE(chat::jsonb #>> :content_path, '') || :append)"
+                        )
+                        binds.append(bindparam("content_path", type_=ARRAY(Text)))
+                        params["content_path"] = [
+                            "history",
+                            "messages",
+                            message_id,
+                            "content",
+                        ]
+                        params["append"] = append_content
+
+                    result = db.execute(
+                        text(
+                            "UPDATE chat SET chat = jsonb_set("
+                            f"jsonb_set(chat::jsonb, :message_path, {message}), "
+                            "'{history,currentId}', to_jsonb(CAST(:message_id AS text))"
+                            ")::json, updated_at = :updated_at "
+                            "WHERE id = :id "
+                            "AND jsonb_typeof(chat::jsonb #> :message_path) = 'object'"
+                        ).bindparams(*binds),
+                        {
+                            **params,
+                            "message_id": message_id,
+                            "updated_at": int(time.time()),
+                            "id": id,
+                        },
+                    )
+                    db.commit()
+                    if result.rowcount:
+                        return True
+        except Exception as e:
+            log.exception(f"Partial message update failed, rewriting chat: {e}")
+
+        message = dict(fields)
+        if append_content:
+            if "content" not in message:
+                existing = self.get_message_by_id_and_message_id(id, message_id) or {}
+                message["content"] = existing.get("content", "")
+            message["content"] += append_content
+        return (
+            self.upsert_message_to_chat_by_id_and_message_id(id, message_id, message)
+            is not None
+        )
+
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
     ) -> Optional[ChatModel]:
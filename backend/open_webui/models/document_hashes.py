@@ -0,0 +1,113 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, PrimaryKeyConstraint, Text
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# DocumentHash DB Schema
+####################
+
+
+class DocumentHash(Base):
+    """
+    Registry of the content hashes stored in each vector DB collection, so
+    duplicate checks don't have to search the collection's metadata.
+    """
+
+    __tablename__ = "document_hash"
+
+    collection_name = Column(Text, nullable=False)
+    hash = Column(Text, nullable=False)
+    file_id = Column(Text, nullable=True)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("collection_name", "hash", name="pk_collection_name_hash"),
+        Index("ix_document_hash_collection_name_file_id", "collection_name", "file_id"),
+    )
+
+
+class DocumentHashModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    collection_name: str
+    hash: str
+    file_id: Optional[str] = None
+    created_at: Optional[int] = None
+
+
+class DocumentHashTable:
+    def insert_hash(
+        self, collection_name: str, hash: str, file_id: Optional[str] = None
+    ) -> Optional[DocumentHashModel]:
+        with get_db() as db:
+            try:
+                result = db.merge(
+                    DocumentHash(
+                        collection_name=collection_name,
+                        hash=hash,
+                        file_id=file_id,
+                        created_at=int(time.time()),
+                    )
+                )
+                db.commit()
+                return DocumentHashModel.model_validate(result)
+            except Exception as e:
+                log.exception(f"Error registering hash for {collection_name}: {e}")
+                return None
+
+    def has_hash(self, collection_name: str, hash: str) -> bool:
+        with get_db() as db:
+            return db.get(DocumentHash, (collection_name, hash)) is not None
+
+    def delete_hash(self, collection_name: str, hash: str) -> bool:
+        with get_db() as db:
+            try:
+                db.query(DocumentHash).filter_by(
+                    collection_name=collection_name, hash=hash
+                ).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+    def delete_hashes_by_file_id(self, collection_name: str, file_id: str) -> bool:
+        with get_db() as db:
+            try:
+                db.query(DocumentHash).filter_by(
+                    collection_name=collection_name, file_id=file_id
+                ).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+    def delete_hashes_by_collection_name(self, collection_name: str) -> bool:
+        with get_db() as db:
+            try:
+                db.query(DocumentHash).filter_by(
+                    collection_name=collection_name
+                ).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+    def delete_all_hashes(self) -> bool:
+        with get_db() as db:
+            try:
+                db.query(DocumentHash).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+
+DocumentHashes = DocumentHashTable()
@@ -5,7 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, update
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -211,6 +211,46 @@ class FilesTable:
             except Exception:
                 return None
 
+    def update_files_by_id(self, updates: dict[str, dict]) -> bool:
+        """
+        Update many files at once. `updates` maps file ids to a dict with any
+        of "hash", "data" and "meta"; data and meta are merged into the
+        existing values as in update_file_data_by_id/update_file_metadata_by_id.
+        """
+        if not updates:
+            return True
+
+        with get_db() as db:
+            try:
+                rows = {
+                    id: (data, meta)
+                    for id, data, meta in db.query(File.id, File.data, File.meta)
+                    .filter(File.id.in_(list(updates.keys())))
+                    .all()
+                }
+
+                values = []
+                for id, update_data in updates.items():
+                    if id not in rows:
+                        continue
+                    data, meta = rows[id]
+                    value = {"id": id}
+                    if "hash" in update_data:
+                        value["hash"] = update_data["hash"]
+                    if "data" in update_data:
+                        value["data"] = {**(data or {}), **update_data["data"]}
+                    if "meta" in update_data:
+                        value["meta"] = {**(meta or {}), **update_data["meta"]}
+                    values.append(value)
+
+                if values:
+                    db.execute(update(File), values)
+                db.commit()
+                return True
+            except Exception as e:
+                log.exception(f"Error updating files: {e}")
+                return False
+
     def delete_file_by_id(self, id: str) -> bool:
         with get_db() as db:
             try:
@@ -156,6 +156,10 @@ class FunctionsTable:
             log.exception(f"Error syncing functions for user {user_id}: {e}")
             return []
 
+    def get_function_updated_at_by_id(self, id: str) -> Optional[int]:
+        with get_db() as db:
+            return db.query(Function.updated_at).filter_by(id=id).scalar()
+
     def get_function_by_id(self, id: str) -> Optional[FunctionModel]:
         try:
             with get_db() as db:
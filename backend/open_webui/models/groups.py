@@ -11,7 +11,14 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    PrimaryKeyConstraint,
+    Text,
+    JSON,
+)
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +48,24 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    """
+    One row per member of group.user_ids, indexed by user, so finding a
+    user's groups doesn't scan the group table. Kept in sync by GroupTable.
+    """
+
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+        Index("ix_group_member_user_id", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +113,16 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def _set_group_members(self, db, id: str, user_ids: list[str]):
+        db.query(GroupMember).filter_by(group_id=id).delete()
+        now = int(time.time())
+        db.add_all(
+            [
+                GroupMember(group_id=id, user_id=user_id, created_at=now)
+                for user_id in dict.fromkeys(user_ids)
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -127,16 +162,34 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        with get_db() as db:
+            return {
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id).filter_by(
+                    user_id=user_id
+                )
+            }
+
+    def get_user_ids_by_group_ids(self, group_ids: list[str]) -> dict[str, set[str]]:
+        """Member user ids of each of `group_ids`, in one query"""
+        user_ids = {group_id: set() for group_id in group_ids}
+        if not group_ids:
+            return user_ids
+
+        with get_db() as db:
+            for group_id, user_id in db.query(
+                GroupMember.group_id, GroupMember.user_id
+            ).filter(GroupMember.group_id.in_(group_ids)):
+                user_ids[group_id].add(user_id)
+        return user_ids
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,6 +216,8 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
                 return self.get_group_by_id(id=id)
         except Exception as e:
@@ -173,6 +228,7 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
                 return True
         except Exception:
@@ -182,6 +238,7 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
 
                 return True
@@ -201,7 +258,8 @@ class GroupTable:
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
 
                 return True
             except Exception:
@@ -257,6 +315,9 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.query(GroupMember).filter_by(
+                            group_id=group.id, user_id=user_id
+                        ).delete()
 
                 # Add user to new groups
                 for group in groups:
@@ -268,6 +329,13 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.merge(
+                            GroupMember(
+                                group_id=group.id,
+                                user_id=user_id,
+                                created_at=int(time.time()),
+                            )
+                        )
 
                 db.commit()
                 return True
@@ -7,7 +7,7 @@ import uuid
 from open_webui.internal.db import Base, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
-from open_webui.models.files import FileMetadataResponse
+from open_webui.models.files import File, FileMetadataResponse
 from open_webui.models.users import Users, UserResponse
 
 
@@ -126,33 +126,66 @@ class KnowledgeTable:
             except Exception:
                 return None
 
-    def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
+    def _with_users(
+        self, knowledge_bases: list[KnowledgeModel]
+    ) -> list[KnowledgeUserModel]:
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({knowledge_base.user_id for knowledge_base in knowledge_bases})
+            )
+        }
+        return [
+            KnowledgeUserModel.model_validate(
+                {
+                    **knowledge_base.model_dump(),
+                    "user": (
+                        users[knowledge_base.user_id].model_dump()
+                        if knowledge_base.user_id in users
+                        else None
+                    ),
+                }
+            )
+            for knowledge_base in knowledge_bases
+        ]
+
+    def get_knowledge_bases(
+        self, skip: int = 0, limit: Optional[int] = None
+    ) -> list[KnowledgeUserModel]:
         with get_db() as db:
-            knowledge_bases = []
-            for knowledge in (
-                db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
-                knowledge_bases.append(
-                    KnowledgeUserModel.model_validate(
-                        {
-                            **KnowledgeModel.model_validate(knowledge).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-            return knowledge_bases
+            query = db.query(Knowledge).order_by(Knowledge.updated_at.desc())
+            if skip:
+                query = query.offset(skip)
+            if limit:
+                query = query.limit(limit)
+            knowledge_bases = [
+                KnowledgeModel.model_validate(knowledge) for knowledge in query.all()
+            ]
+        return self._with_users(knowledge_bases)
 
     def get_knowledge_bases_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: int = 0,
+        limit: Optional[int] = None,
     ) -> list[KnowledgeUserModel]:
-        knowledge_bases = self.get_knowledge_bases()
-        return [
+        with get_db() as db:
+            knowledge_bases = [
+                KnowledgeModel.model_validate(knowledge)
+                for knowledge in db.query(Knowledge)
+                .order_by(Knowledge.updated_at.desc())
+                .all()
+            ]
+
+        # access_control is JSON, so access is checked here rather than in SQL
+        knowledge_bases = [
             knowledge_base
             for knowledge_base in knowledge_bases
             if knowledge_base.user_id == user_id
             or has_access(user_id, permission, knowledge_base.access_control)
         ]
+        return self._with_users(knowledge_bases[skip : skip + limit if limit else None])
 
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
@@ -198,6 +231,45 @@ class KnowledgeTable:
             log.exception(e)
             return None
 
+    def remove_missing_file_ids(self, ids: Optional[list[str]] = None) -> int:
+        """
+        Remove the file ids that have no file from the data of the knowledge
+        bases with the given ids (all of them by default). Returns the number
+        of knowledge bases updated.
+        """
+        with get_db() as db:
+            query = db.query(Knowledge)
+            if ids is not None:
+                query = query.filter(Knowledge.id.in_(ids))
+            knowledge_bases = [
+                knowledge
+                for knowledge in query.all()
+                if isinstance(knowledge.data, dict) and knowledge.data.get("file_ids")
+            ]
+
+            file_ids = {
+                file_id
+                for knowledge in knowledge_bases
+                for file_id in knowledge.data["file_ids"]
+            }
+            existing_ids = {
+                id for (id,) in db.query(File.id).filter(File.id.in_(file_ids)).all()
+            }
+
+            updated = 0
+            for knowledge in knowledge_bases:
+                file_ids = [
+                    file_id
+                    for file_id in knowledge.data["file_ids"]
+                    if file_id in existing_ids
+                ]
+                if len(file_ids) != len(knowledge.data["file_ids"]):
+                    knowledge.data = {**knowledge.data, "file_ids": file_ids}
+                    knowledge.updated_at = int(time.time())
+                    updated += 1
+            db.commit()
+            return updated
+
     def delete_knowledge_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
@@ -0,0 +1,402 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Index,
+    PrimaryKeyConstraint,
+    Text,
+    func,
+    or_,
+    text,
+)
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Knowledge Reindex DB Schema
+####################
+
+ACTIVE_JOB = "status IN ('pending', 'running')"
+
+
+class ReindexJob(Base):
+    """
+    A reindex of every knowledge base. status is pending, running,
+    completed or failed; a running job whose owner stops updating
+    heartbeat_at is picked up by another worker. A unique partial index
+    keeps a single job pending or running.
+    """
+
+    __tablename__ = "reindex_job"
+
+    id = Column(Text, primary_key=True)
+    user_id = Column(Text)
+    status = Column(Text, nullable=False)
+    owner = Column(Text, nullable=True)
+    heartbeat_at = Column(BigInteger, nullable=True)
+    total_files = Column(BigInteger, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+    finished_at = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index("ix_reindex_job_status", "status"),
+        Index(
+            "uq_reindex_job_active",
+            # Postgres needs expressions in their own parentheses
+            text(f"({ACTIVE_JOB})"),
+            unique=True,
+            sqlite_where=text(ACTIVE_JOB),
+            postgresql_where=text(ACTIVE_JOB),
+        ),
+    )
+
+
+class ReindexKnowledge(Base):
+    """
+    Checkpoint of a knowledge base in a job: pending, building (its files are
+    being embedded), swapping (its collection is being replaced), done,
+    failed or skipped. refilled is set when the embedding dimension changed,
+    so its collection had to be emptied before the new chunks went in.
+    """
+
+    __tablename__ = "reindex_knowledge"
+
+    job_id = Column(Text, nullable=False)
+    knowledge_id = Column(Text, nullable=False)
+    position = Column(BigInteger, default=0)
+    status = Column(Text, nullable=False)
+    error = Column(Text, nullable=True)
+    refilled = Column(Boolean, nullable=True)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("job_id", "knowledge_id", name="pk_job_id_knowledge_id"),
+    )
+
+
+class ReindexFile(Base):
+    """Checkpoint of a file embedded (done) or given up on (failed) in a job"""
+
+    __tablename__ = "reindex_file"
+
+    job_id = Column(Text, nullable=False)
+    knowledge_id = Column(Text, nullable=False)
+    file_id = Column(Text, nullable=False)
+    status = Column(Text, nullable=False)
+    chunks = Column(BigInteger, default=0)
+    error = Column(Text, nullable=True)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "job_id", "knowledge_id", "file_id", name="pk_job_id_knowledge_id_file_id"
+        ),
+    )
+
+
+class ReindexJobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: Optional[str] = None
+    status: str
+    owner: Optional[str] = None
+    heartbeat_at: Optional[int] = None
+    total_files: int = 0
+    error: Optional[str] = None
+
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    finished_at: Optional[int] = None
+
+
+class ReindexKnowledgeModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str
+    knowledge_id: str
+    position: int = 0
+    status: str
+    error: Optional[str] = None
+    refilled: Optional[bool] = None
+    updated_at: Optional[int] = None
+
+
+class ReindexFileModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str
+    knowledge_id: str
+    file_id: str
+    status: str
+    chunks: int = 0
+    error: Optional[str] = None
+    updated_at: Optional[int] = None
+
+
+####################
+# Forms
+####################
+
+
+class ReindexJobResponse(ReindexJobModel):
+    total_knowledge_bases: int = 0
+    done_knowledge_bases: int = 0
+    # Knowledge bases whose collection was emptied and refilled, as the
+    # embedding dimension changed
+    refilled_knowledge_bases: int = 0
+    done_files: int = 0
+    failed_files: int = 0
+
+
+class ReindexJobTable:
+    def insert_new_job(
+        self, user_id: str, knowledge_bases: list[tuple[str, int]]
+    ) -> Optional[ReindexJobModel]:
+        """
+        A pending job for the (knowledge id, file count) of each knowledge
+        base. None if another job is already pending or running.
+        """
+        now = int(time.time())
+        with get_db() as db:
+            try:
+                job = ReindexJob(
+                    id=str(uuid.uuid4()),
+                    user_id=user_id,
+                    status="pending",
+                    total_files=sum(count for _, count in knowledge_bases),
+                    created_at=now,
+                    updated_at=now,
+                )
+                db.add(job)
+                db.add_all(
+                    [
+                        ReindexKnowledge(
+                            job_id=job.id,
+                            knowledge_id=knowledge_id,
+                            position=position,
+                            status="pending",
+                            updated_at=now,
+                        )
+                        for position, (knowledge_id, _) in enumerate(knowledge_bases)
+                    ]
+                )
+                db.commit()
+                db.refresh(job)
+                return ReindexJobModel.model_validate(job)
+            except IntegrityError:
+                db.rollback()
+                return None
+            except Exception as e:
+                log.exception(f"Error creating reindex job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[ReindexJobModel]:
+        with get_db() as db:
+            job = db.get(ReindexJob, id)
+            return ReindexJobModel.model_validate(job) if job else None
+
+    def get_active_job(self) -> Optional[ReindexJobModel]:
+        with get_db() as db:
+            job = (
+                db.query(ReindexJob)
+                .filter(ReindexJob.status.in_(["pending", "running"]))
+                .order_by(ReindexJob.created_at)
+                .first()
+            )
+            return ReindexJobModel.model_validate(job) if job else None
+
+    def get_latest_job(self) -> Optional[ReindexJobModel]:
+        with get_db() as db:
+            job = db.query(ReindexJob).order_by(ReindexJob.created_at.desc()).first()
+            return ReindexJobModel.model_validate(job) if job else None
+
+    def claim_job(self, owner: str, stale_before: int) -> Optional[ReindexJobModel]:
+        """
+        Take the oldest pending job, or a running one whose owner is `owner`
+        or last sent a heartbeat before `stale_before`. Only one worker can
+        claim a job.
+        """
+        with get_db() as db:
+            job = (
+                db.query(ReindexJob)
+                .filter(ReindexJob.status.in_(["pending", "running"]))
+                .order_by(ReindexJob.created_at)
+                .first()
+            )
+            if job is None:
+                return None
+
+            now = int(time.time())
+            claimed = (
+                db.query(ReindexJob)
+                .filter(
+                    ReindexJob.id == job.id,
+                    or_(
+                        ReindexJob.status == "pending",
+                        ReindexJob.owner == owner,
+                        ReindexJob.heartbeat_at < stale_before,
+                    ),
+                )
+                .update(
+                    {
+                        "status": "running",
+                        "owner": owner,
+                        "heartbeat_at": now,
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return self.get_job_by_id(job.id) if claimed else None
+
+    def heartbeat(self, id: str, owner: str) -> bool:
+        """Whether `owner` still holds the running job"""
+        with get_db() as db:
+            updated = (
+                db.query(ReindexJob)
+                .filter_by(id=id, owner=owner, status="running")
+                .update({"heartbeat_at": int(time.time())}, synchronize_session=False)
+            )
+            db.commit()
+            return updated > 0
+
+    def finish_job(
+        self, id: str, status: str, error: Optional[str] = None
+    ) -> Optional[ReindexJobModel]:
+        now = int(time.time())
+        with get_db() as db:
+            db.query(ReindexJob).filter_by(id=id).update(
+                {
+                    "status": status,
+                    "error": error,
+                    "updated_at": now,
+                    "finished_at": now,
+                }
+            )
+            db.commit()
+        return self.get_job_by_id(id)
+
+    def add_total_files(self, id: str, count: int):
+        with get_db() as db:
+            db.query(ReindexJob).filter_by(id=id).update(
+                {"total_files": ReindexJob.total_files + count},
+                synchronize_session=False,
+            )
+            db.commit()
+
+    def get_knowledge_checkpoints(self, job_id: str) -> list[ReindexKnowledgeModel]:
+        with get_db() as db:
+            return [
+                ReindexKnowledgeModel.model_validate(checkpoint)
+                for checkpoint in db.query(ReindexKnowledge)
+                .filter_by(job_id=job_id)
+                .order_by(ReindexKnowledge.position)
+                .all()
+            ]
+
+    def update_knowledge_status(
+        self,
+        job_id: str,
+        knowledge_id: str,
+        status: str,
+        error: Optional[str] = None,
+        refilled: Optional[bool] = None,
+    ):
+        with get_db() as db:
+            db.query(ReindexKnowledge).filter_by(
+                job_id=job_id, knowledge_id=knowledge_id
+            ).update(
+                {
+                    "status": status,
+                    "error": error,
+                    # Kept once set, as a resumed swap finds nothing to refill
+                    **({"refilled": refilled} if refilled is not None else {}),
+                    "updated_at": int(time.time()),
+                }
+            )
+            db.commit()
+
+    def get_file_checkpoints(
+        self, job_id: str, knowledge_id: str
+    ) -> dict[str, ReindexFileModel]:
+        with get_db() as db:
+            return {
+                checkpoint.file_id: ReindexFileModel.model_validate(checkpoint)
+                for checkpoint in db.query(ReindexFile)
+                .filter_by(job_id=job_id, knowledge_id=knowledge_id)
+                .all()
+            }
+
+    def upsert_file_status(
+        self,
+        job_id: str,
+        knowledge_id: str,
+        file_id: str,
+        status: str,
+        chunks: int = 0,
+        error: Optional[str] = None,
+    ):
+        with get_db() as db:
+            db.merge(
+                ReindexFile(
+                    job_id=job_id,
+                    knowledge_id=knowledge_id,
+                    file_id=file_id,
+                    status=status,
+                    chunks=chunks,
+                    error=error,
+                    updated_at=int(time.time()),
+                )
+            )
+            db.commit()
+
+    def get_job_progress(self, job: ReindexJobModel) -> ReindexJobResponse:
+        with get_db() as db:
+            files = dict(
+                db.query(ReindexFile.status, func.count())
+                .filter_by(job_id=job.id)
+                .group_by(ReindexFile.status)
+                .all()
+            )
+            knowledge_bases = dict(
+                db.query(ReindexKnowledge.status, func.count())
+                .filter_by(job_id=job.id)
+                .group_by(ReindexKnowledge.status)
+                .all()
+            )
+            refilled = (
+                db.query(func.count())
+                .select_from(ReindexKnowledge)
+                .filter_by(job_id=job.id, refilled=True)
+                .scalar()
+            )
+
+        return ReindexJobResponse(
+            **job.model_dump(),
+            total_knowledge_bases=sum(knowledge_bases.values()),
+            done_knowledge_bases=sum(
+                knowledge_bases.get(status, 0)
+                for status in ("done", "failed", "skipped")
+            ),
+            refilled_knowledge_bases=refilled or 0,
+            done_files=files.get("done", 0),
+            failed_files=files.get("failed", 0),
+        )
+
+
+ReindexJobs = ReindexJobTable()
@@ -8,7 +8,7 @@ from open_webui.models.tags import TagModel, Tag, Tags
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -25,6 +25,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("ix_message_reaction_message_id", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +54,16 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index(
+            "ix_message_channel_id_parent_id_created_at",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        Index("ix_message_parent_id_created_at", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -94,6 +106,28 @@ class MessageResponse(MessageModel):
     reactions: list[Reactions]
 
 
+def page_before(query, db, before: Optional[str]):
+    """
+    Newest first, only the messages older than the message `before` (keyset
+    pagination, so deep pages don't scan the skipped rows). The cursor is a
+    message id because time_ns timestamps don't survive JSON in the browser.
+    """
+    if before is not None:
+        cursor = db.get(Message, before)
+        if cursor is None:
+            return None
+        query = query.filter(
+            or_(
+                Message.created_at < cursor.created_at,
+                and_(
+                    Message.created_at == cursor.created_at,
+                    Message.id < cursor.id,
+                ),
+            )
+        )
+    return query.order_by(Message.created_at.desc(), Message.id.desc())
+
+
 class MessageTable:
     def insert_new_message(
         self, form_data: MessageForm, channel_id: str, user_id: str
@@ -157,22 +191,52 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
+    def get_reply_stats_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, tuple[int, Optional[int]]]:
+        """(reply count, latest reply's created_at) of each of `ids`"""
+        if not ids:
+            return {}
+
+        with get_db() as db:
+            stats = {
+                parent_id: (count, latest_reply_at)
+                for parent_id, count, latest_reply_at in db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
+                )
+                .filter(Message.parent_id.in_(ids))
+                .group_by(Message.parent_id)
+            }
+            return {id: stats.get(id, (0, None)) for id in ids}
+
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            query = page_before(
+                db.query(Message).filter_by(channel_id=channel_id, parent_id=None),
+                db,
+                before,
             )
+            if query is None:
+                return []
+
+            all_messages = query.offset(skip).limit(limit).all()
             return [MessageModel.model_validate(message) for message in all_messages]
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             message = db.get(Message, parent_id)
@@ -180,14 +244,15 @@ class MessageTable:
             if not message:
                 return []
 
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            query = page_before(
+                db.query(Message).filter_by(channel_id=channel_id, parent_id=parent_id),
+                db,
+                before,
             )
+            if query is None:
+                return []
+
+            all_messages = query.offset(skip).limit(limit).all()
 
             # If length of all_messages is less than limit, then add the parent message
             if len(all_messages) < limit:
@@ -243,6 +308,35 @@ class MessageTable:
 
             return [Reactions(**reaction) for reaction in reactions.values()]
 
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        """Reactions of each of `ids`, grouped by name as get_reactions_by_message_id"""
+        reactions = {id: {} for id in ids}
+        if not ids:
+            return {}
+
+        with get_db() as db:
+            for message_id, name, user_id in (
+                db.query(
+                    MessageReaction.message_id,
+                    MessageReaction.name,
+                    MessageReaction.user_id,
+                )
+                .filter(MessageReaction.message_id.in_(ids))
+                .order_by(MessageReaction.created_at)
+            ):
+                reaction = reactions[message_id].setdefault(
+                    name, {"name": name, "user_ids": [], "count": 0}
+                )
+                reaction["user_ids"].append(user_id)
+                reaction["count"] += 1
+
+        return {
+            id: [Reactions(**reaction) for reaction in grouped.values()]
+            for id, grouped in reactions.items()
+        }
+
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
     ) -> bool:
@@ -134,6 +134,10 @@ class ToolsTable:
                 log.exception(f"Error creating a new tool: {e}")
                 return None
 
+    def get_tool_updated_at_by_id(self, id: str) -> Optional[int]:
+        with get_db() as db:
+            return db.query(Tool.updated_at).filter_by(id=id).scalar()
+
     def get_tool_by_id(self, id: str) -> Optional[ToolModel]:
         try:
             with get_db() as db:
@@ -1,12 +1,26 @@
 import os
 import json
+import time
+import heapq
+import asyncio
+import hashlib
 import logging
-import requests
-from typing import Dict, List, Optional, Tuple
+import tempfile
+import uuid
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime, timezone
 from difflib import SequenceMatcher
 from dotenv import load_dotenv
 
+from open_webui.env import NOTION_USERS_SNAPSHOT_PATH
+from open_webui.utils.notion import (
+    NotionAPIError,
+    get_notion_client,
+    notion_schema_cache,
+)
+from open_webui.utils.redis import release_lock
+
 load_dotenv()
 
 logging.basicConfig(
@@ -15,29 +29,480 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Minimum score for find_user_by_name to accept a fuzzy match
+MATCH_THRESHOLD = 0.6
+
+
+def _match_score(search_lower: str, user_name: str) -> float:
+    """Score a workspace user name against a search for find_user_by_name"""
+    # Calculate multiple similarity scores
+    scores = []
+    full_score = SequenceMatcher(None, search_lower, user_name.lower()).ratio()
+    scores.append(full_score)
+    if search_lower in user_name.lower() or user_name.lower() in search_lower:
+        scores.append(0.8)
+
+    # First name exact match
+    parts = user_name.split()
+    if parts and search_lower == parts[0].lower():
+        scores.append(0.95)
+
+    # Last name exact match
+    if len(parts) > 1 and search_lower == parts[-1].lower():
+        scores.append(0.9)
+
+    # Middle name match
+    for part in parts[1:-1]:
+        if search_lower == part.lower():
+            scores.append(0.85)
+
+    # Initials match
+    initials = "".join([p[0].lower() for p in parts if p])
+    if search_lower == initials:
+        scores.append(0.9)
+
+    # Take the best score
+    return max(scores) if scores else 0.0
+
+
+def _prefix_score(partial_lower: str, user_name: str) -> float:
+    """Score everything in a name suggestion except the fuzzy similarity term"""
+    score = 0.0
+
+    # Starts with partial
+    if user_name.lower().startswith(partial_lower):
+        score += 0.8
+
+    # Contains partial
+    if partial_lower in user_name.lower():
+        score += 0.6
+
+    # First name starts with
+    parts = user_name.split()
+    if parts and parts[0].lower().startswith(partial_lower):
+        score += 0.9
+
+    # Last name starts with
+    if len(parts) > 1 and parts[-1].lower().startswith(partial_lower):
+        score += 0.7
+
+    return score
+
+
+def _suggestion_score(partial_lower: str, user_name: str) -> float:
+    """Score a workspace user name against partial input for get_name_suggestions"""
+    score = _prefix_score(partial_lower, user_name)
+
+    # Fuzzy similarity
+    similarity = SequenceMatcher(None, partial_lower, user_name.lower()).ratio()
+    score += similarity * 0.5
+    return score
+
+
+def _bigrams(text: str) -> Counter:
+    return Counter(text[i : i + 2] for i in range(len(text) - 1))
+
+
+def _ratio_upper_bound(
+    shared: int, len_a: int, len_b: int, common: Optional[int] = None
+) -> float:
+    """
+    Upper bound of SequenceMatcher.ratio() for two strings sharing `shared`
+    bigrams and `common` characters (counted with multiplicity).
+
+    Matching blocks of size m contribute m - 1 shared bigrams, and any two blocks
+    are separated by at least one unmatched character, so 3 * matches can never
+    exceed shared + len_a + len_b + 1.
+    """
+    total = len_a + len_b
+    if not total:
+        return 1.0
+    matches = min(len_a, len_b, (shared + total + 1) // 3)
+    if common is not None:
+        matches = min(matches, common)
+    return 2.0 * matches / total
+
+
+class _PrefixTrie:
+    """
+    Burst trie over lowercase names.
+
+    Nodes branch per character down to BURST_DEPTH; deeper keys are kept in the
+    node's bucket and filtered on lookup, which keeps the node count bounded
+    for large workspaces.
+    """
+
+    BURST_DEPTH = 4
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key: str, idx: int):
+        node = self.root
+        for char in key[: self.BURST_DEPTH]:
+            node = node.setdefault(char, {})
+        node.setdefault("", []).append((key, idx))
+
+    def search(self, prefix: str) -> Set[int]:
+        node = self.root
+        for char in prefix[: self.BURST_DEPTH]:
+            node = node.get(char)
+            if node is None:
+                return set()
+
+        result = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for char, child in current.items():
+                if char:
+                    stack.append(child)
+                else:
+                    result.update(idx for key, idx in child if key.startswith(prefix))
+        return result
+
+
+class _TopK:
+    """Keeps the k best (score, -index) entries that rank above `floor`"""
+
+    def __init__(self, k: int, floor: Tuple[float, float]):
+        self.k = k
+        self.floor = floor
+        self.heap: List[Tuple[float, int]] = []
+
+    def cutoff(self) -> Tuple[float, float]:
+        return self.heap[0] if len(self.heap) >= self.k else self.floor
+
+    def add(self, idx: int, score: float):
+        entry = (score, -idx)
+        if entry <= self.cutoff():
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heapreplace(self.heap, entry)
+
+    def results(self) -> List[Tuple[int, float]]:
+        return [(-neg_idx, score) for score, neg_idx in sorted(self.heap, reverse=True)]
+
+
+class NameIndex:
+    """
+    Prebuilt lookup structures for matching names against workspace users.
+
+    Candidates are shortlisted through exact part lookups, a prefix trie and
+    character n-gram inverted indexes, then scored with the same functions as
+    a full scan in order of their best possible score. Scoring stops once no
+    remaining candidate can beat the current results, so they are identical
+    to scanning every user, ties going to the earliest user.
+    """
+
+    def __init__(self, users: Optional[Iterable[Dict]] = None):
+        self.users: List[Dict] = []
+        self.names: List[str] = []
+        self.users_by_id: Dict[str, Dict] = {}
+
+        self.full_names: Dict[str, List[int]] = defaultdict(list)
+        self.first_names: Dict[str, List[int]] = defaultdict(list)
+        self.last_names: Dict[str, List[int]] = defaultdict(list)
+        self.middle_names: Dict[str, List[int]] = defaultdict(list)
+        self.initials: Dict[str, List[int]] = defaultdict(list)
+
+        self.prefix_trie = _PrefixTrie()
+        self.char_index: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.bigram_index: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.name_lengths: Counter = Counter()
+
+        if users:
+            self.add_users(users)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def add_users(self, users: Iterable[Dict]):
+        for user in users:
+            self.add_user(user)
+
+    def add_user(self, user: Dict):
+        idx = len(self.users)
+        self.users.append(user)
+        if "id" in user:
+            self.users_by_id.setdefault(user["id"], user)
+
+        user_name = user.get("name", "").strip()
+        name_lower = user_name.lower()
+        self.names.append(name_lower)
+        if not user_name:
+            return
+
+        parts = user_name.split()
+        self.full_names[name_lower].append(idx)
+        self.first_names[parts[0].lower()].append(idx)
+        if len(parts) > 1:
+            self.last_names[parts[-1].lower()].append(idx)
+        for part in set(p.lower() for p in parts[1:-1]):
+            self.middle_names[part].append(idx)
+        self.initials["".join([p[0].lower() for p in parts if p])].append(idx)
+
+        self.prefix_trie.insert(name_lower, idx)
+        self.prefix_trie.insert(parts[0].lower(), idx)
+        if len(parts) > 1:
+            self.prefix_trie.insert(parts[-1].lower(), idx)
+
+        for char, count in Counter(name_lower).items():
+            self.char_index[char][idx] = count
+        for gram, count in _bigrams(name_lower).items():
+            self.bigram_index[gram][idx] = count
+        self.name_lengths[len(name_lower)] += 1
+
+    def _user_name(self, idx: int) -> str:
+        return self.users[idx].get("name", "").strip()
+
+    @staticmethod
+    def _shared(index: Dict[str, Dict[int, int]], query: Counter) -> Dict[int, int]:
+        shared = defaultdict(int)
+        for key, query_count in query.items():
+            for idx, count in index.get(key, {}).items():
+                shared[idx] += count if count < query_count else query_count
+        return shared
+
+    def _unseen_ratio_bound(self, query_length: int) -> float:
+        """Best ratio any user sharing no bigram with the query could reach"""
+        return max(
+            (
+                _ratio_upper_bound(0, query_length, length)
+                for length in self.name_lengths
+            ),
+            default=0.0,
+        )
+
+    def _score_candidates(
+        self,
+        query: str,
+        bounds: Dict[int, float],
+        score_fn: Callable[[str, str], float],
+        top: _TopK,
+        scored: Set[int],
+    ):
+        """Score candidates from the highest bound down until none can enter `top`"""
+        candidates = [
+            (bound, -idx)
+            for idx, bound in bounds.items()
+            if (bound, -idx) > top.cutoff()
+        ]
+        candidates.sort(reverse=True)
+        for entry in candidates:
+            if entry <= top.cutoff():
+                break
+            idx = -entry[1]
+            scored.add(idx)
+            top.add(idx, score_fn(query, self._user_name(idx)))
+
+    def _scan(self, query: str, score_fn: Callable[[str, str], float], top: _TopK):
+        for idx, name in enumerate(self.names):
+            if name:
+                top.add(idx, score_fn(query, self._user_name(idx)))
+
+    def best_match(self, search_lower: str) -> Tuple[Optional[Dict], float, int]:
+        """
+        Return (user, score, candidates_scored) for the highest scoring user at
+        or above MATCH_THRESHOLD, as find_user_by_name's full scan would.
+        """
+        top = _TopK(1, (MATCH_THRESHOLD, float("-inf")))
+        scored: Set[int] = set()
+
+        if not search_lower:
+            self._scan(search_lower, _match_score, top)
+        else:
+            query_length = len(search_lower)
+            query_grams = _bigrams(search_lower)
+            total_grams = sum(query_grams.values())
+            shared = self._shared(self.bigram_index, query_grams)
+
+            # Phase 1: users sharing a bigram, plus exact part, initials and
+            # "name inside search" hits which may outscore the ratio
+            bounds = {}
+            for idx, count in shared.items():
+                bound = _ratio_upper_bound(count, query_length, len(self.names[idx]))
+                # Every bigram being present is necessary for a substring match
+                if count == total_grams and bound < 0.8:
+                    bound = 0.8
+                bounds[idx] = bound
+
+            structured = (
+                self.first_names.get(search_lower, [])
+                + self.last_names.get(search_lower, [])
+                + self.middle_names.get(search_lower, [])
+                + self.initials.get(search_lower, [])
+            )
+            for start in range(query_length):
+                for end in range(start + 1, query_length + 1):
+                    structured += self.full_names.get(search_lower[start:end], [])
+            for idx in structured:
+                bounds[idx] = 1.0
+
+            self._score_candidates(search_lower, bounds, _match_score, top, scored)
+
+            # Phase 2: everyone else, bounded by shared characters. A single
+            # character query is contained in every user sharing it.
+            unseen_bound = self._unseen_ratio_bound(query_length)
+            if total_grams == 0:
+                unseen_bound = max(unseen_bound, 0.8)
+            if (unseen_bound, 0) > top.cutoff():
+                common = self._shared(self.char_index, Counter(search_lower))
+                bounds = {}
+                for idx, count in common.items():
+                    if idx in scored:
+                        continue
+                    bound = _ratio_upper_bound(
+                        shared.get(idx, 0), query_length, len(self.names[idx]), count
+                    )
+                    if total_grams == 0 or shared.get(idx, 0) == total_grams:
+                        bound = max(bound, 0.8)
+                    bounds[idx] = bound
+                self._score_candidates(search_lower, bounds, _match_score, top, scored)
+
+        results = top.results()
+        if not results:
+            return None, 0.0, len(scored)
+        idx, score = results[0]
+        return self.users[idx], score, len(scored)
+
+    def suggestions(self, partial_lower: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Return the top (index, score) pairs scoring above 0.3, ordered like a
+        stable descending sort over get_name_suggestions' full scan.
+        """
+        if limit <= 0:
+            return []
+
+        top = _TopK(limit, (0.3, float("inf")))
+        scored: Set[int] = set()
+
+        if not partial_lower:
+            self._scan(partial_lower, _suggestion_score, top)
+            return top.results()
+
+        query_length = len(partial_lower)
+        query_grams = _bigrams(partial_lower)
+        total_grams = sum(query_grams.values())
+        shared = self._shared(self.bigram_index, query_grams)
+        prefixed = self.prefix_trie.search(partial_lower)
+
+        def bound_for(idx: int, common: Optional[int] = None) -> float:
+            count = shared.get(idx, 0)
+            bound = 0.5 * _ratio_upper_bound(
+                count, query_length, len(self.names[idx]), common
+            )
+            # Prefix and containment bonuses are cheap to compute exactly
+            if idx in prefixed or total_grams == 0 or count == total_grams:
+                bound += _prefix_score(partial_lower, self._user_name(idx))
+            return bound
+
+        # Phase 1: prefix matches and users sharing a bigram
+        bounds = {idx: bound_for(idx) for idx in prefixed.union(shared)}
+        self._score_candidates(partial_lower, bounds, _suggestion_score, top, scored)
+
+        # Phase 2: everyone else, bounded by shared characters
+        unseen_bound = 0.5 * self._unseen_ratio_bound(query_length)
+        if total_grams == 0:
+            unseen_bound += 0.6
+        if (unseen_bound, 0) > top.cutoff():
+            common = self._shared(self.char_index, Counter(partial_lower))
+            bounds = {
+                idx: bound_for(idx, count)
+                for idx, count in common.items()
+                if idx not in scored
+            }
+            self._score_candidates(
+                partial_lower, bounds, _suggestion_score, top, scored
+            )
+
+        return top.results()
+
+
+def _add_name_mappings(mapping: Dict[str, str], users: Iterable[Dict]):
+    """Add exact-match keys (full name, parts, first+last, initials) for users"""
+    for user in users:
+        name = user.get("name", "").strip()
+        if name:
+            mapping[name.lower()] = user["id"]
+
+            # Store individual parts
+            parts = name.split()
+            if parts:
+                mapping[parts[0].lower()] = user["id"]
+                if len(parts) > 1:
+                    mapping[parts[-1].lower()] = user["id"]
+                for part in parts[1:-1]:
+                    if part:
+                        mapping[part.lower()] = user["id"]
+
+                if len(parts) >= 2:
+                    mapping[f"{parts[0].lower()} {parts[-1].lower()}"] = user["id"]
+                    initials = "".join([p[0].lower() for p in parts if p])
+                    mapping[initials] = user["id"]
+
+
+def _person_users(results: List[Dict]) -> List[Dict]:
+    """Keep the person users of a Notion users page in the local format"""
+    return [
+        {
+            "id": user["id"],
+            "name": user.get("name", ""),
+            "email": user.get("person", {}).get("email", ""),
+            "type": user.get("type"),
+            "avatar_url": user.get("avatar_url"),
+        }
+        for user in results
+        if user.get("object") == "user" and user.get("type") == "person"
+    ]
+
+
+def _users_version(users: List[Dict]) -> str:
+    return hashlib.sha256(
+        json.dumps(users, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _write_snapshot(path: str, users: List[Dict]):
+    """Write the users snapshot so readers only ever see a complete file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(users, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
 class NotionWorkspaceManager:
+    REDIS_KEY = "open-webui:notion:users"
+
     def __init__(self):
         self.notion_token = os.environ.get("NOTION_INTEGRATION_TOKEN2")
         self.database_id = os.environ.get("NOTION_DB_ID2")
         self.use_api = bool(self.notion_token and self.database_id)
 
         if self.use_api:
-            self.headers = {
-                "Authorization": f"Bearer {self.notion_token}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28",
-            }
+            self.client = get_notion_client(self.notion_token)
         else:
-            self.headers = None
+            self.client = None
 
         self.workspace_users = None
         self.user_name_mapping = {}
-        self.get_workspace_users()
+        self.name_index = NameIndex()
+        self.users_version = None
+        self.users_synced_at = 0.0
+        self._sync_lock = asyncio.Lock()
+        self._load_local_users()
 
-    def get_workspace_users(self) -> List[Dict]:
-        if self.workspace_users is not None:
-            return self.workspace_users
+    def _load_local_users(self) -> bool:
         possible_paths = [
+            NOTION_USERS_SNAPSHOT_PATH,
             "notion_users.json",
             "../notion_users.json",
             "../../notion_users.json",
@@ -49,10 +514,12 @@ class NotionWorkspaceManager:
                 with open(file_path, "r") as f:
                     self.workspace_users = json.load(f)
                     self._build_name_mapping()
+                    self.users_version = _users_version(self.workspace_users)
+                    self.users_synced_at = os.path.getmtime(file_path)
                     logger.info(
                         f"Loaded {len(self.workspace_users)} users from local JSON file: {file_path}"
                     )
-                    return self.workspace_users
+                    return True
             except (FileNotFoundError, json.JSONDecodeError) as e:
                 logger.debug(f"Could not load local users file from {file_path}: {e}")
                 continue
@@ -60,36 +527,18 @@ class NotionWorkspaceManager:
         logger.warning(
             f"Could not load local users file from any of the tried paths: {possible_paths}"
         )
+        return False
+
+    async def get_workspace_users(self) -> List[Dict]:
+        if self.workspace_users is not None:
+            return self.workspace_users
 
         # Fallback to API if local file not found
         if self.use_api:
             try:
-                response = requests.get(
-                    "https://api.notion.com/v1/users", headers=self.headers
-                )
-                if response.status_code != 200:
-                    logger.error(
-                        f"Failed to fetch users: {response.status_code} - {response.text}"
-                    )
-                    raise Exception(f"Failed to fetch users: {response.text}")
-
-                users = response.json().get("results", [])
-                person_users = []
-
-                for user in users:
-                    if user.get("object") == "user" and user.get("type") == "person":
-                        person_users.append(
-                            {
-                                "id": user["id"],
-                                "name": user.get("name", ""),
-                                "email": user.get("person", {}).get("email", ""),
-                                "type": user.get("type"),
-                            }
-                        )
-
-                self.workspace_users = person_users
-                self._build_name_mapping()
-                return person_users
+                await self.sync_users()
+                if self.workspace_users is not None:
+                    return self.workspace_users
             except Exception as e:
                 logger.error(f"Failed to fetch users from API: {e}")
 
@@ -101,32 +550,114 @@ class NotionWorkspaceManager:
         if not self.workspace_users:
             return
 
-        for user in self.workspace_users:
-            name = user.get("name", "").strip()
-            if name:
-                self.user_name_mapping[name.lower()] = user["id"]
-
-                # Store individual parts
-                parts = name.split()
-                if parts:
-                    self.user_name_mapping[parts[0].lower()] = user["id"]
-                    if len(parts) > 1:
-                        self.user_name_mapping[parts[-1].lower()] = user["id"]
-                    for part in parts[1:-1]:
-                        if part:
-                            self.user_name_mapping[part.lower()] = user["id"]
-
-                    if len(parts) >= 2:
-                        self.user_name_mapping[
-                            f"{parts[0].lower()} {parts[-1].lower()}"
-                        ] = user["id"]
-                        initials = "".join([p[0].lower() for p in parts if p])
-                        self.user_name_mapping[initials] = user["id"]
+        _add_name_mappings(self.user_name_mapping, self.workspace_users)
+        self.name_index = NameIndex(self.workspace_users)
 
         logger.info(
             f"Built comprehensive name mapping with {len(self.user_name_mapping)} entries"
         )
 
+    def _read_snapshot(self) -> Optional[Tuple[List[Dict], Dict, NameIndex, str]]:
+        try:
+            with open(NOTION_USERS_SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+                users = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.debug(f"Could not read users snapshot: {e}")
+            return None
+
+        mapping = {}
+        _add_name_mappings(mapping, users)
+        return users, mapping, NameIndex(users), _users_version(users)
+
+    def _swap_users(
+        self, users: List[Dict], mapping: Dict, index: NameIndex, version: str
+    ):
+        # Replaced together, without awaiting in between, so requests never see
+        # users and indexes from different snapshots
+        self.workspace_users = users
+        self.user_name_mapping = mapping
+        self.name_index = index
+        self.users_version = version
+        self.users_synced_at = time.time()
+
+    async def _pull_users(self) -> bool:
+        users, mapping, index = [], {}, NameIndex()
+        cursor = None
+        while True:
+            page = await self.client.list_users(start_cursor=cursor)
+            batch = _person_users(page.get("results", []))
+
+            # Indexed page by page so no single step holds the event loop long
+            users.extend(batch)
+            _add_name_mappings(mapping, batch)
+            index.add_users(batch)
+
+            cursor = page.get("next_cursor")
+            if not page.get("has_more") or not cursor:
+                break
+
+        version = _users_version(users)
+        if version == self.users_version:
+            self.users_synced_at = time.time()
+            logger.info(f"Notion users unchanged ({len(users)} users)")
+            return False
+
+        previous = {user["id"]: user for user in self.workspace_users or []}
+        current = {user["id"]: user for user in users}
+        logger.info(
+            f"Notion users changed: {len(current.keys() - previous.keys())} added, "
+            f"{len(previous.keys() - current.keys())} removed, "
+            f"{sum(1 for id in current.keys() & previous.keys() if current[id] != previous[id])} updated"
+        )
+
+        await asyncio.to_thread(_write_snapshot, NOTION_USERS_SNAPSHOT_PATH, users)
+        self._swap_users(users, mapping, index, version)
+        return True
+
+    async def sync_users(self, redis=None, interval: int = 0) -> bool:
+        """
+        Pull all workspace users page by page and swap in fresh indexes when
+        they changed. Returns True when the users were updated.
+
+        Skipped while the last sync is younger than `interval` seconds. With
+        Redis, workers share the snapshot version: one worker pulls, the others
+        load its snapshot from disk.
+        """
+        if not self.use_api:
+            return False
+
+        async with self._sync_lock:
+            if redis is None:
+                if interval and time.time() - self.users_synced_at < interval:
+                    return False
+                return await self._pull_users()
+
+            shared_version = await redis.get(f"{self.REDIS_KEY}:version")
+            if shared_version:
+                if shared_version != self.users_version:
+                    snapshot = await asyncio.to_thread(self._read_snapshot)
+                    if snapshot and snapshot[3] == shared_version:
+                        self._swap_users(*snapshot)
+                        logger.info(
+                            f"Loaded {len(snapshot[0])} Notion users from shared snapshot"
+                        )
+                if shared_version == self.users_version:
+                    return False
+
+            token = str(uuid.uuid4())
+            if not await redis.set(f"{self.REDIS_KEY}:lock", token, nx=True, ex=600):
+                return False
+            try:
+                changed = await self._pull_users()
+                await redis.set(
+                    f"{self.REDIS_KEY}:version",
+                    self.users_version,
+                    ex=interval or None,
+                )
+                return changed
+            finally:
+                await release_lock(redis, f"{self.REDIS_KEY}:lock", token)
+
     def find_user_by_name(self, search_name: str) -> Optional[Dict]:
         """Enhanced AI-powered name matching"""
         if not search_name or not self.workspace_users:
@@ -143,60 +674,15 @@ class NotionWorkspaceManager:
         # 1. Exact match in mapping
         if search_lower in self.user_name_mapping:
             user_id = self.user_name_mapping[search_lower]
-            user = next((u for u in self.workspace_users if u["id"] == user_id), None)
+            user = self.name_index.users_by_id.get(user_id)
             logger.info(f"Found exact match in mapping: {user}")
             return user
 
-        # 2. AI-powered fuzzy matching
-        best_match = None
-        best_score = 0.0
-        matches = []
+        # 2. AI-powered fuzzy matching over the prebuilt name index
+        best_match, best_score, scored = self.name_index.best_match(search_lower)
 
-        for user in self.workspace_users:
-            user_name = user.get("name", "").strip()
-            if not user_name:
-                continue
-
-            # Calculate multiple similarity scores
-            scores = []
-            full_score = SequenceMatcher(None, search_lower, user_name.lower()).ratio()
-            scores.append(full_score)
-            if search_lower in user_name.lower() or user_name.lower() in search_lower:
-                scores.append(0.8)
-
-            # First name exact match
-            parts = user_name.split()
-            if parts and search_lower == parts[0].lower():
-                scores.append(0.95)
-
-            # Last name exact match
-            if len(parts) > 1 and search_lower == parts[-1].lower():
-                scores.append(0.9)
-
-            # Middle name match
-            for part in parts[1:-1]:
-                if search_lower == part.lower():
-                    scores.append(0.85)
-
-            # Initials match
-            initials = "".join([p[0].lower() for p in parts if p])
-            if search_lower == initials:
-                scores.append(0.9)
-
-            # Take the best score
-            score = max(scores) if scores else 0.0
-
-            if score >= 0.5:  # Lower threshold for more matches
-                matches.append((user, score))
-                if score > best_score:
-                    best_score = score
-                    best_match = user
-
-        logger.info(f"Found {len(matches)} potential matches, best score: {best_score}")
-        if best_match and best_score >= 0.6:
-            return best_match
-
-        return None
+        logger.info(f"Scored {scored} candidate matches, best score: {best_score}")
+        return best_match
 
     def get_name_suggestions(self, partial_name: str, limit: int = 5) -> List[Dict]:
         """Get AI-powered name suggestions for partial input"""
@@ -204,43 +690,14 @@ class NotionWorkspaceManager:
             return []
 
         partial_lower = partial_name.strip().lower()
-        suggestions = []
-
-        for user in self.workspace_users:
-            user_name = user.get("name", "").strip()
-            if not user_name:
-                continue
-
-            # Calculate relevance score
-            score = 0.0
-
-            # Starts with partial
-            if user_name.lower().startswith(partial_lower):
-                score += 0.8
-
-            # Contains partial
-            if partial_lower in user_name.lower():
-                score += 0.6
-
-            # First name starts with
-            parts = user_name.split()
-            if parts and parts[0].lower().startswith(partial_lower):
-                score += 0.9
-
-            # Last name starts with
-            if len(parts) > 1 and parts[-1].lower().startswith(partial_lower):
-                score += 0.7
-
-            # Fuzzy similarity
-            similarity = SequenceMatcher(None, partial_lower, user_name.lower()).ratio()
-            score += similarity * 0.5
-
-            if score > 0.3:  # Only include relevant suggestions
-                suggestions.append({"user": user, "score": score, "name": user_name})
-
-        # Sort by score and return top matches
-        suggestions.sort(key=lambda x: x["score"], reverse=True)
-        return suggestions[:limit]
+        return [
+            {
+                "user": self.name_index.users[idx],
+                "score": score,
+                "name": self.name_index.users[idx].get("name", "").strip(),
+            }
+            for idx, score in self.name_index.suggestions(partial_lower, limit)
+        ]
 
     def get_user_id_by_name(self, name: str) -> Optional[str]:
         """Get user ID by name with enhanced matching"""
@@ -251,20 +708,45 @@ class NotionWorkspaceManager:
         logger.warning(f"Could not find user ID for name '{name}'")
         return None
 
-    def create_database_entry(self, form_data: Dict) -> Dict:
-        """Create database entry with people property support"""
+    def resolve_user_ids(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve many names at once, matching each distinct name only once"""
+        user_ids = {}
+        for name in names:
+            if name and name not in user_ids:
+                user = self.find_user_by_name(name)
+                user_ids[name] = user["id"] if user and "id" in user else None
+
+        logger.info(
+            f"Resolved {sum(1 for id in user_ids.values() if id)} of {len(user_ids)} names"
+        )
+        return user_ids
+
+    async def get_database_schema(self, redis=None) -> Dict:
+        """Get the database schema with its properties and select options"""
+        if not self.use_api:
+            raise Exception("Notion API not configured")
+        schema = await notion_schema_cache.get(self.client, self.database_id, redis)
+        return schema["schema"]
+
+    async def create_database_entry(
+        self, form_data: Dict, user_ids: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict:
+        """
+        Create database entry with people property support. `user_ids` holds
+        names already resolved with resolve_user_ids, e.g. for bulk imports.
+        """
         if not self.workspace_users:
-            self.get_workspace_users()
+            await self.get_workspace_users()
 
         now_iso = datetime.now(timezone.utc).isoformat()
         owner_name = form_data.get("owner", "")
         created_by_name = form_data.get("created_by", "")
 
         # Get user IDs for people properties
-        owner_user_id = self.get_user_id_by_name(owner_name) if owner_name else None
-        created_by_user_id = (
-            self.get_user_id_by_name(created_by_name) if created_by_name else None
-        )
+        if user_ids is None:
+            user_ids = self.resolve_user_ids([owner_name, created_by_name])
+        owner_user_id = user_ids.get(owner_name) if owner_name else None
+        created_by_user_id = user_ids.get(created_by_name) if created_by_name else None
 
         properties = {
             "Request Title": {
@@ -327,27 +809,22 @@ class NotionWorkspaceManager:
             logger.warning("Notion API not configured, returning mock response")
             return {"id": "mock-page-id", "properties": properties}
 
-        response = requests.post(
-            "https://api.notion.com/v1/pages", headers=self.headers, json=page_data
-        )
-        if response.status_code != 200:
-            logger.error(
-                f"Failed to create database entry: {response.status_code} - {response.text}"
-            )
-            raise Exception(f"Failed to create database entry: {response.text}")
-
-        return response.json()
+        try:
+            return await self.client.create_page(page_data)
+        except NotionAPIError as e:
+            logger.error(f"Failed to create database entry: {e.status} - {e}")
+            raise Exception(f"Failed to create database entry: {e}")
 
-    def save_users_to_json(self, filename="notion_users.json"):
+    async def save_users_to_json(self, filename="notion_users.json"):
         """Save current users to JSON file"""
-        users = self.get_workspace_users()
+        users = await self.get_workspace_users()
         with open(filename, "w") as f:
             json.dump(users, f, indent=2)
         return filename
 
-    def get_all_users_for_dropdown(self) -> List[Dict]:
+    async def get_all_users_for_dropdown(self) -> List[Dict]:
         """Get all users formatted for dropdown/autocomplete"""
-        users = self.get_workspace_users()
+        users = await self.get_workspace_users()
         return [
             {
                 "id": user["id"],
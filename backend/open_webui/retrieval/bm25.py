@@ -0,0 +1,485 @@
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from filelock import FileLock
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from open_webui.config import (
+    ENABLE_RAG_BM25_INDEX,
+    RAG_BM25_INDEX_DIR,
+    RAG_BM25_INDEX_MMAP_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Okapi BM25 parameters, the rank_bm25 (BM25Okapi) defaults used by
+# BM25Retriever. Terms in more than half of the documents have a negative
+# idf, which is replaced by EPSILON times the average idf of all terms.
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+
+# Stay below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds
+SQL_VARIABLE_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    metadata TEXT,
+    length INTEGER NOT NULL,
+    terms BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (key, value) VALUES ('doc_count', 0), ('total_length', 0);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    # Same tokens as BM25Retriever's default preprocessing
+    return text.split()
+
+
+def _chunks(values: list, size: int = SQL_VARIABLE_LIMIT) -> Iterator[list]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+class BM25Index:
+    """
+    On-disk BM25 inverted indexes, one SQLite database per collection.
+
+    Documents are added and removed alongside the vector DB writes, so hybrid
+    search no longer pulls a whole collection out of the vector DB and
+    re-tokenizes it for every query. Term postings are clustered by term, and
+    scoring runs as a single aggregate query over the postings of the query
+    terms, with the database file memory-mapped for reads.
+
+    A collection without an index file (e.g. one created before indexes
+    existed, or on another host) is backfilled from the vector DB the first
+    time it is searched. Writes to a collection that has no index yet are
+    skipped rather than creating a partial one. A per-collection file lock
+    makes writes wait while the collection is backfilled, across workers, so
+    none land between the vector DB snapshot and the index being published.
+    """
+
+    def __init__(self, directory: str, mmap_size: int = 0):
+        self.directory = directory
+        self.mmap_size = mmap_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, collection_name: str) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name)
+        return os.path.join(self.directory, f"{name}.sqlite3")
+
+    def has_index(self, collection_name: str) -> bool:
+        return os.path.exists(self.get_path(collection_name))
+
+    def _lock(self, collection_name: str) -> FileLock:
+        return FileLock(f"{self.get_path(collection_name)}.lock")
+
+    @contextmanager
+    def _connect(self, path: str, create: bool = False):
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if create:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    ####################################
+    # Writes
+    ####################################
+
+    def _add(self, conn: sqlite3.Connection, items: list[dict]):
+        self._delete_ids(conn, [item["id"] for item in items])
+
+        docs = []
+        term_counts = []
+        df = Counter()
+        total_length = 0
+        for item in items:
+            tokens = tokenize(item["text"])
+            counts = Counter(tokens)
+            df.update(counts.keys())
+            term_counts.append(counts)
+            total_length += len(tokens)
+            docs.append(
+                (
+                    item["id"],
+                    item["text"],
+                    json.dumps(item.get("metadata") or {}, default=str),
+                    len(tokens),
+                )
+            )
+
+        conn.executemany(
+            "INSERT INTO terms (term, df) VALUES (?, ?) "
+            "ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+            df.items(),
+        )
+        term_ids = {}
+        for terms in _chunks(list(df)):
+            rows = conn.execute(
+                "SELECT term, term_id FROM terms WHERE term IN "
+                f"({', '.join('?' * len(terms))})",
+                terms,
+            )
+            term_ids.update(rows.fetchall())
+
+        first_doc = conn.execute("SELECT COALESCE(MAX(doc), 0) + 1 FROM docs")
+        first_doc = first_doc.fetchone()[0]
+        # Each document keeps its term ids, so deleting it needs no index on
+        # postings.doc
+        conn.executemany(
+            "INSERT INTO docs (doc, id, text, metadata, length, terms) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    first_doc + i,
+                    *doc,
+                    array("q", (term_ids[term] for term in counts)).tobytes(),
+                )
+                for i, (doc, counts) in enumerate(zip(docs, term_counts))
+            ],
+        )
+
+        # Inserting in primary key order keeps the postings B-tree writes local
+        conn.executemany(
+            "INSERT INTO postings (term_id, doc, tf) VALUES (?, ?, ?)",
+            sorted(
+                (term_ids[term], first_doc + i, tf)
+                for i, counts in enumerate(term_counts)
+                for term, tf in counts.items()
+            ),
+        )
+        self._update_stats(conn, len(docs), total_length)
+
+    def _delete_docs(self, conn: sqlite3.Connection, docs: list[int]):
+        for chunk in _chunks(docs):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT doc, length, terms FROM docs WHERE doc IN ({placeholders})",
+                chunk,
+            ).fetchall()
+
+            df = Counter()
+            postings = []
+            for doc, _, terms in rows:
+                doc_terms = array("q")
+                doc_terms.frombytes(terms)
+                df.update(doc_terms)
+                postings.extend((term_id, doc) for term_id in doc_terms)
+
+            conn.executemany(
+                "DELETE FROM postings WHERE term_id = ? AND doc = ?", sorted(postings)
+            )
+            conn.execute(f"DELETE FROM docs WHERE doc IN ({placeholders})", chunk)
+            conn.executemany(
+                "UPDATE terms SET df = df - ? WHERE term_id = ?",
+                [(count, term_id) for term_id, count in df.items()],
+            )
+            for term_ids in _chunks(list(df)):
+                conn.execute(
+                    "DELETE FROM terms WHERE df <= 0 AND term_id IN "
+                    f"({', '.join('?' * len(term_ids))})",
+                    term_ids,
+                )
+            self._update_stats(conn, -len(rows), -sum(row[1] for row in rows))
+
+    def _delete_ids(self, conn: sqlite3.Connection, ids: list[str]):
+        docs = []
+        for chunk in _chunks(ids):
+            rows = conn.execute(
+                f"SELECT doc FROM docs WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            docs.extend(row[0] for row in rows)
+        self._delete_docs(conn, docs)
+
+    def _update_stats(self, conn: sqlite3.Connection, docs: int, length: int):
+        conn.executemany(
+            "UPDATE stats SET value = value + ? WHERE key = ?",
+            [(docs, "doc_count"), (length, "total_length")],
+        )
+
+    def add(self, collection_name: str, items: list[dict], create: bool = False):
+        """
+        Index vector DB items ({"id", "text", "metadata"}). Items that are
+        already indexed are replaced. Unless `create` is set (the collection
+        is new), nothing is written when the collection has no index yet.
+        """
+        path = self.get_path(collection_name)
+        with self._lock(collection_name):
+            if not create and not os.path.exists(path):
+                return
+
+            with self._connect(path, create=True) as conn:
+                with self._transaction(conn):
+                    self._add(conn, items)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        """Remove documents by id or by exact metadata match, like VECTOR_DB_CLIENT.delete"""
+        path = self.get_path(collection_name)
+        with self._lock(collection_name):
+            if not os.path.exists(path):
+                return
+
+            with self._connect(path) as conn:
+                with self._transaction(conn):
+                    if ids:
+                        self._delete_ids(conn, ids)
+                    if filter:
+                        clauses = " AND ".join(
+                            "json_extract(metadata, ?) = ?" for _ in filter
+                        )
+                        params = []
+                        for key, value in filter.items():
+                            params.extend([f'$."{key}"', value])
+                        rows = conn.execute(
+                            f"SELECT doc FROM docs WHERE {clauses}", params
+                        ).fetchall()
+                        self._delete_docs(conn, [row[0] for row in rows])
+
+    def _remove(self, path: str):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{path}{suffix}")
+            except FileNotFoundError:
+                pass
+
+    def delete_collection(self, collection_name: str):
+        with self._lock(collection_name):
+            self._remove(self.get_path(collection_name))
+
+    def reset(self):
+        for filename in os.listdir(self.directory):
+            if filename.endswith((".sqlite3", ".sqlite3-wal", ".sqlite3-shm")):
+                os.remove(os.path.join(self.directory, filename))
+
+    def build(
+        self,
+        collection_name: str,
+        get_collection: Callable[[], Any],
+        replace: bool = True,
+    ) -> None:
+        """
+        (Re)build the index of a collection from the VECTOR_DB_CLIENT.get
+        result `get_collection` returns. It is called with the collection's
+        writes held back until the index is published, so none are lost.
+        Unless `replace` is set, an existing index is kept.
+        """
+        path = self.get_path(collection_name)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with self._lock(collection_name):
+            if not replace and os.path.exists(path):
+                return
+
+            get_result = get_collection()
+            try:
+                with self._connect(tmp_path, create=True) as conn:
+                    conn.execute("PRAGMA journal_mode=DELETE")
+                    with self._transaction(conn):
+                        if get_result is not None and get_result.ids:
+                            self._add(
+                                conn,
+                                [
+                                    {"id": id, "text": text or "", "metadata": metadata}
+                                    for id, text, metadata in zip(
+                                        get_result.ids[0],
+                                        get_result.documents[0],
+                                        get_result.metadatas[0],
+                                    )
+                                ],
+                            )
+                self._remove(path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    ####################################
+    # Search
+    ####################################
+
+    def search(self, collection_name: str, query: str, k: int) -> list[Document]:
+        """
+        Top `k` documents by BM25 score, best first, scored as BM25Retriever
+        does. As with BM25Retriever, documents without any query term (score
+        0) fill up the k after the documents that matched.
+        """
+        query_terms = Counter(tokenize(query))
+        if not query_terms or k <= 0:
+            return []
+
+        with self._connect(self.get_path(collection_name)) as conn:
+            stats = dict(conn.execute("SELECT key, value FROM stats").fetchall())
+            doc_count = stats.get("doc_count", 0)
+            if doc_count <= 0:
+                return []
+            avgdl = max(stats.get("total_length", 0) / doc_count, 1e-9)
+
+            def get_idf(df: int) -> float:
+                return math.log(doc_count - df + 0.5) - math.log(df + 0.5)
+
+            weights = []
+            terms = list(query_terms)
+            for chunk in _chunks(terms):
+                rows = conn.execute(
+                    "SELECT term, term_id, df FROM terms WHERE df > 0 AND term IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                weights.extend(
+                    (term_id, get_idf(df), query_terms[term])
+                    for term, term_id, df in rows
+                )
+
+            if any(idf < 0 for _, idf, _ in weights):
+                # The floor depends on the idf of every term; there are far
+                # fewer distinct document frequencies than terms
+                idf_sum, term_count = 0.0, 0
+                for df, count in conn.execute(
+                    "SELECT df, COUNT(*) FROM terms WHERE df > 0 GROUP BY df"
+                ):
+                    idf_sum += get_idf(df) * count
+                    term_count += count
+                floor = EPSILON * idf_sum / max(term_count, 1)
+                weights = [
+                    (term_id, floor if idf < 0 else idf, count)
+                    for term_id, idf, count in weights
+                ]
+            weights = [(term_id, idf * count) for term_id, idf, count in weights]
+
+            rows = []
+            if weights:
+                values = ", ".join("(?, ?)" for _ in weights)
+                scores = (
+                    f"WITH weights (term_id, weight) AS (VALUES {values}) "
+                    "SELECT p.doc, SUM(w.weight * p.tf * ? / "
+                    "(p.tf + ? * (1 - ? + ? * d.length / ?))) AS score "
+                    "FROM weights w "
+                    "JOIN postings p ON p.term_id = w.term_id "
+                    "JOIN docs d ON d.doc = p.doc "
+                    "GROUP BY p.doc HAVING score {} 0 "
+                    "ORDER BY score DESC, p.doc LIMIT ?"
+                )
+                params = [
+                    *(value for weight in weights for value in weight),
+                    K1 + 1,
+                    K1,
+                    B,
+                    B,
+                    avgdl,
+                ]
+                rows = conn.execute(scores.format(">"), [*params, k]).fetchall()
+
+            if len(rows) < k:
+                # Documents without any query term score 0
+                term_ids = [term_id for term_id, _ in weights]
+                matched = (
+                    "SELECT doc FROM postings WHERE term_id IN "
+                    f"({', '.join('?' * len(term_ids))})"
+                )
+                rows += conn.execute(
+                    "SELECT doc, 0 FROM docs "
+                    + (f"WHERE doc NOT IN ({matched}) " if term_ids else "")
+                    + "ORDER BY doc LIMIT ?",
+                    [*term_ids, k - len(rows)],
+                ).fetchall()
+
+            if len(rows) < k and weights:
+                rows += conn.execute(
+                    scores.format("<="), [*params, k - len(rows)]
+                ).fetchall()
+
+            docs = {}
+            for chunk in _chunks([doc for doc, _ in rows]):
+                docs.update(
+                    (doc, (text, metadata))
+                    for doc, text, metadata in conn.execute(
+                        "SELECT doc, text, metadata FROM docs WHERE doc IN "
+                        f"({', '.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                )
+
+        return [
+            Document(
+                page_content=docs[doc][0],
+                metadata=json.loads(docs[doc][1]) if docs[doc][1] else {},
+            )
+            for doc, _ in rows
+        ]
+
+
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    collection_name: str
+    k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return self.index.search(self.collection_name, query, self.k)
+
+
+BM25_INDEX = (
+    BM25Index(RAG_BM25_INDEX_DIR, RAG_BM25_INDEX_MMAP_SIZE)
+    if ENABLE_RAG_BM25_INDEX
+    else None
+)
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.config import (
+    RAG_EMBEDDING_CACHE_BACKEND,
+    RAG_EMBEDDING_CACHE_PATH,
+    RAG_EMBEDDING_CACHE_SIZE,
+    RAG_EMBEDDING_CACHE_TTL,
+)
+from open_webui.env import (
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.utils.telemetry.metrics import record_embedding_cache_lookups
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def _pack(embedding: list[float]) -> bytes:
+    return array("d", embedding).tobytes()
+
+
+def _unpack(data: bytes) -> list[float]:
+    embedding = array("d")
+    embedding.frombytes(data)
+    return embedding.tolist()
+
+
+class RedisEmbeddingStore:
+    name = "redis"
+    prefix = "open-webui:embedding:"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.redis = get_redis_connection(
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            decode_responses=False,
+        )
+        if self.redis is None:
+            raise ValueError("REDIS_URL is required for the redis embedding cache")
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        return self.redis.mget([f"{self.prefix}{key}" for key in keys])
+
+    def set_many(self, items: dict[str, bytes]):
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(f"{self.prefix}{key}", value, ex=self.ttl or None)
+        pipe.execute()
+
+
+class SqliteEmbeddingStore:
+    name = "sqlite"
+
+    # Expired rows are removed every this many writes
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, path: str, ttl: int):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, expires_at REAL)"
+        )
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self.conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({', '.join('?' * len(chunk))}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    [*chunk, time.time()],
+                )
+                found.update(rows.fetchall())
+        return [found.get(key) for key in keys]
+
+    def set_many(self, items: dict[str, bytes]):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, expires_at) "
+                "VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, value in items.items()],
+            )
+            self.writes += len(items)
+            if self.writes >= self.PRUNE_INTERVAL:
+                self.writes = 0
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE expires_at <= ?", (time.time(),)
+                )
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings, keyed by (engine, model, prefix,
+    sha256 of the text).
+
+    Lookups go through a bounded in-memory LRU first, then the optional shared
+    store (Redis or SQLite), and only the texts missing from both are sent to
+    the embedding backend, de-duplicated. Store errors are logged and treated
+    as misses so they never fail a query.
+    """
+
+    def __init__(self, maxsize: int, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        return hashlib.sha256(
+            json.dumps([engine, model, prefix, text]).encode()
+        ).hexdigest()
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        with self._lock:
+            embeddings = []
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                embeddings.append(embedding)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        record_embedding_cache_lookups(len(keys) - len(missing), len(missing))
+
+        if missing and self.store is not None:
+            try:
+                values = self.store.get_many([keys[i] for i in missing])
+            except Exception as e:
+                log.warning(f"Embedding cache {self.store.name} lookup failed: {e}")
+                values = [None] * len(missing)
+
+            found = {}
+            for i, value in zip(missing, values):
+                if value is not None:
+                    embeddings[i] = found[keys[i]] = _unpack(value)
+            record_embedding_cache_lookups(
+                len(found), len(missing) - len(found), self.store.name
+            )
+            self._remember(found)
+        return embeddings
+
+    def set_many(self, items: dict[str, list[float]]):
+        self._remember(items)
+        if self.store is not None and items:
+            try:
+                self.store.set_many(
+                    {key: _pack(embedding) for key, embedding in items.items()}
+                )
+            except Exception as e:
+                log.warning(f"Embedding cache {self.store.name} write failed: {e}")
+
+    def _remember(self, items: dict[str, list[float]]):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for key, embedding in items.items():
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def wrap(self, engine: str, model: str, embedding_function: Callable) -> Callable:
+        """Cached version of an embedding function from get_embedding_function"""
+
+        def embed(query, prefix=None, user=None):
+            texts = query if isinstance(query, list) else [query]
+            keys = [self.get_key(engine, model, prefix, text) for text in texts]
+            embeddings = self.get_many(keys)
+
+            missing = {}
+            for key, text, embedding in zip(keys, texts, embeddings):
+                if embedding is None:
+                    missing.setdefault(key, text)
+            if missing:
+                computed = embedding_function(
+                    list(missing.values()) if isinstance(query, list) else query,
+                    prefix=prefix,
+                    user=user,
+                )
+                if computed is None:
+                    return None
+                if not isinstance(query, list):
+                    computed = [computed]
+
+                computed = dict(zip(missing, computed))
+                self.set_many(
+                    {
+                        key: embedding
+                        for key, embedding in computed.items()
+                        if embedding is not None
+                    }
+                )
+                embeddings = [
+                    embedding if embedding is not None else computed[key]
+                    for key, embedding in zip(keys, embeddings)
+                ]
+
+            return embeddings if isinstance(query, list) else embeddings[0]
+
+        return embed
+
+
+def get_embedding_store():
+    try:
+        if RAG_EMBEDDING_CACHE_BACKEND == "redis":
+            return RedisEmbeddingStore(RAG_EMBEDDING_CACHE_TTL)
+        elif RAG_EMBEDDING_CACHE_BACKEND == "sqlite":
+            return SqliteEmbeddingStore(
+                RAG_EMBEDDING_CACHE_PATH, RAG_EMBEDDING_CACHE_TTL
+            )
+        elif RAG_EMBEDDING_CACHE_BACKEND:
+            log.warning(
+                f"Unknown RAG_EMBEDDING_CACHE_BACKEND {RAG_EMBEDDING_CACHE_BACKEND}"
+            )
+    except Exception as e:
+        log.error(f"Embedding cache {RAG_EMBEDDING_CACHE_BACKEND} unavailable: {e}")
+    return None
+
+
+EMBEDDING_CACHE = EmbeddingCache(RAG_EMBEDDING_CACHE_SIZE, get_embedding_store())
@@ -0,0 +1,311 @@
+import asyncio
+import atexit
+import logging
+import random
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+
+import aiohttp
+
+from open_webui.config import (
+    RAG_EMBEDDING_BATCH_MAX_TOKENS,
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_MAX_RETRIES,
+    RAG_EMBEDDING_PREFIX_FIELD_NAME,
+)
+from open_webui.env import (
+    AIOHTTP_CLIENT_SESSION_SSL,
+    AIOHTTP_CLIENT_TIMEOUT,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    SRC_LOG_LEVELS,
+)
+from open_webui.models.users import UserModel
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class EmbeddingAPIError(Exception):
+    def __init__(self, status: Optional[int], message: str):
+        super().__init__(message)
+        self.status = status
+
+
+####################################
+# Batching
+####################################
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        log.warning(f"Estimating embedding batch tokens, tiktoken unavailable: {e}")
+        return None
+
+
+def count_tokens(texts: list[str]) -> list[int]:
+    encoding = _get_encoding()
+    if encoding is None:
+        return [len(text) // 4 + 1 for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def split_batches(
+    texts: list[str],
+    batch_size: Optional[int] = None,
+    max_tokens: int = RAG_EMBEDDING_BATCH_MAX_TOKENS,
+) -> list[tuple[int, int]]:
+    """
+    (start, end) ranges of `texts`, each with at most `batch_size` texts and
+    `max_tokens` tokens. A text over the token budget gets a batch of its own.
+    """
+    counts = count_tokens(texts) if max_tokens > 0 else [0] * len(texts)
+
+    batches = []
+    start, tokens = 0, 0
+    for i, count in enumerate(counts):
+        if i > start and (
+            (batch_size and i - start >= batch_size)
+            or (max_tokens > 0 and tokens + count > max_tokens)
+        ):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+####################################
+# Requests
+####################################
+
+
+def _user_headers(user: Optional[UserModel]) -> dict:
+    if ENABLE_FORWARD_USER_INFO_HEADERS and user:
+        return {
+            "X-OpenWebUI-User-Name": user.name,
+            "X-OpenWebUI-User-Id": user.id,
+            "X-OpenWebUI-User-Email": user.email,
+            "X-OpenWebUI-User-Role": user.role,
+        }
+    return {}
+
+
+def _parse_openai(data: dict) -> list[list[float]]:
+    if "data" not in data:
+        raise EmbeddingAPIError(None, "Something went wrong :/")
+    items = sorted(data["data"], key=lambda elem: elem.get("index", 0))
+    return [elem["embedding"] for elem in items]
+
+
+def _parse_ollama(data: dict) -> list[list[float]]:
+    if "embeddings" not in data:
+        raise EmbeddingAPIError(None, "Something went wrong :/")
+    return data["embeddings"]
+
+
+def build_request(
+    engine: str,
+    model: str,
+    url: str,
+    key: str = "",
+    prefix: Optional[str] = None,
+    user: Optional[UserModel] = None,
+    azure_api_version: Optional[str] = None,
+) -> tuple[str, dict, Callable[[list[str]], dict], Callable]:
+    """(endpoint, headers, payload for a batch of texts, response parser)"""
+    headers = {"Content-Type": "application/json", **_user_headers(user)}
+    extra = {}
+    if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
+        extra[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+
+    if engine == "ollama":
+        return (
+            f"{url}/api/embed",
+            {**headers, "Authorization": f"Bearer {key}"},
+            lambda texts: {"input": texts, "model": model, **extra},
+            _parse_ollama,
+        )
+    elif engine == "openai":
+        return (
+            f"{url}/embeddings",
+            {**headers, "Authorization": f"Bearer {key}"},
+            lambda texts: {"input": texts, "model": model, **extra},
+            _parse_openai,
+        )
+    elif engine == "azure_openai":
+        return (
+            f"{url}/openai/deployments/{model}/embeddings?api-version={azure_api_version}",
+            {**headers, "api-key": key},
+            lambda texts: {"input": texts, **extra},
+            _parse_openai,
+        )
+    raise ValueError(f"Unknown embedding engine: {engine}")
+
+
+class EmbeddingClient:
+    """
+    Sends embedding requests from synchronous code over one pooled aiohttp
+    session.
+
+    The session lives on an event loop in a background thread, so
+    connections are reused across calls from any worker thread. A call's
+    texts are split into batches bounded by count and tokens, up to
+    `concurrency` batches are in flight at once, 429/5xx responses and
+    connection errors are retried with exponential backoff, and the
+    embeddings come back in input order.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = RAG_EMBEDDING_MAX_RETRIES,
+        timeout: Optional[int] = AIOHTTP_CLIENT_TIMEOUT,
+    ):
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="embedding-client", daemon=True
+                ).start()
+                self._loop = loop
+                atexit.register(self.close)
+        return self._loop
+
+    def close(self):
+        if self._loop is not None and self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(
+                timeout=5
+            )
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return min(2**attempt, 30) * (0.5 + random.random() / 2)
+
+    async def _post(self, endpoint: str, headers: dict, payload: dict) -> dict:
+        session = self._get_session()
+
+        attempt = 0
+        while True:
+            status, message, retry_after = None, "", None
+            try:
+                async with session.post(
+                    endpoint,
+                    json=payload,
+                    headers=headers,
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                ) as response:
+                    if response.status < 400:
+                        return await response.json(content_type=None)
+
+                    status = response.status
+                    message = await response.text()
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                message = f"Connection error: {e}"
+
+            if (
+                status is not None and status not in RETRYABLE_STATUS_CODES
+            ) or attempt >= self.max_retries:
+                raise EmbeddingAPIError(status, message)
+
+            delay = self._backoff(attempt, retry_after)
+            log.warning(
+                f"Embedding request failed ({status or message}), "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _embed(
+        self,
+        texts: list[str],
+        request: tuple,
+        batch_size: Optional[int],
+        max_tokens: int,
+        concurrency: int,
+    ) -> list[list[float]]:
+        endpoint, headers, get_payload, parse = request
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def embed_batch(start: int, end: int) -> list[list[float]]:
+            async with semaphore:
+                data = await self._post(
+                    endpoint, headers, get_payload(texts[start:end])
+                )
+            embeddings = parse(data)
+            if len(embeddings) != end - start:
+                raise EmbeddingAPIError(
+                    None,
+                    f"Expected {end - start} embeddings, got {len(embeddings)}",
+                )
+            return embeddings
+
+        batches = split_batches(texts, batch_size, max_tokens)
+        log.debug(f"Embedding {len(texts)} texts in {len(batches)} batches")
+
+        # A failed batch cancels the others
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(embed_batch(*batch)) for batch in batches]
+        return [embedding for task in tasks for embedding in task.result()]
+
+    def embed(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        url: str,
+        key: str = "",
+        prefix: Optional[str] = None,
+        user: Optional[UserModel] = None,
+        azure_api_version: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_tokens: int = RAG_EMBEDDING_BATCH_MAX_TOKENS,
+        concurrency: int = RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    ) -> list[list[float]]:
+        """Embed `texts` with the engine's API; blocks the calling thread"""
+        if not texts:
+            return []
+
+        request = build_request(
+            engine, model, url, key, prefix, user, azure_api_version
+        )
+        future = asyncio.run_coroutine_threadsafe(
+            self._embed(texts, request, batch_size, max_tokens, concurrency),
+            self._get_loop(),
+        )
+        try:
+            return future.result()
+        except BaseExceptionGroup as e:
+            raise e.exceptions[0] from None
+
+
+EMBEDDING_CLIENT = EmbeddingClient()
@@ -0,0 +1,493 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional
+
+from fastapi import Request
+
+from open_webui.config import (
+    CACHE_DIR,
+    RAG_EMBEDDING_CONTENT_PREFIX,
+    RAG_INGEST_WINDOW_SIZE,
+    RAG_REINDEX_WORKERS,
+)
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import INSTANCE_ID, SRC_LOG_LEVELS
+from open_webui.models.document_hashes import DocumentHashes
+from open_webui.models.files import FileModel, Files
+from open_webui.models.knowledge import Knowledges
+from open_webui.models.knowledge_reindex import ReindexJobModel, ReindexJobs
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.routers.retrieval import (
+    get_collection_file_docs,
+    get_ingest_embedding_function,
+    get_ingest_windows,
+    get_vector_items,
+)
+from open_webui.socket.main import emit_to_user
+from open_webui.utils.misc import calculate_sha256_string
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Embedded chunks of each file, kept until its knowledge base is swapped
+REINDEX_DIR = CACHE_DIR / "reindex"
+
+OWNER = f"{INSTANCE_ID}:{os.getpid()}"
+# Seconds between heartbeats of a running job, and without one after which
+# another worker takes it over
+HEARTBEAT_INTERVAL = 15
+HEARTBEAT_TIMEOUT = 90
+# Seconds between checks for jobs left by a stopped worker
+POLL_INTERVAL = 60
+
+wakeup = asyncio.Event()
+
+
+def get_file_path(job_id: str, knowledge_id: str, file_id: str) -> str:
+    return os.path.join(REINDEX_DIR, job_id, knowledge_id, f"{file_id}.jsonl")
+
+
+def get_meta_path(path: str) -> str:
+    """
+    The hash, chunk ids and embedding config of a built file, so swaps need
+    not parse its chunks twice
+    """
+    return f"{os.path.splitext(path)[0]}.json"
+
+
+def is_file_built(job_id: str, knowledge_id: str, file_id: str) -> bool:
+    path = get_file_path(job_id, knowledge_id, file_id)
+    return os.path.exists(path) and os.path.exists(get_meta_path(path))
+
+
+def build_file(
+    request: Request, job_id: str, knowledge_id: str, file: FileModel
+) -> int:
+    """
+    Split and embed a file for a knowledge base into its file under
+    REINDEX_DIR, without touching the collection. Returns the chunks written.
+    """
+    docs = get_collection_file_docs(file)
+    metadata = {
+        "file_id": file.id,
+        "name": file.filename,
+        "hash": calculate_sha256_string(file.data.get("content", "")),
+    }
+    embedding_function = get_ingest_embedding_function(request)
+
+    path = get_file_path(job_id, knowledge_id, file.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    ids = []
+    embedding_config = None
+    with open(f"{path}.tmp", "w") as f:
+        for window in get_ingest_windows(request, docs):
+            embeddings = embedding_function(
+                [doc.page_content.replace("\n", " ") for doc in window],
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            if embeddings is None:
+                raise ValueError(
+                    ERROR_MESSAGES.DEFAULT("Failed to generate embeddings")
+                )
+
+            for item in get_vector_items(request, window, embeddings, metadata):
+                f.write(json.dumps(item) + "\n")
+                ids.append(item["id"])
+                embedding_config = item["metadata"]["embedding_config"]
+
+    if not ids:
+        os.remove(f"{path}.tmp")
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+
+    meta_path = get_meta_path(path)
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(
+            {
+                "hash": metadata["hash"],
+                "ids": ids,
+                "embedding_config": embedding_config,
+            },
+            f,
+        )
+
+    # Only complete files are picked up on resume
+    os.replace(f"{meta_path}.tmp", meta_path)
+    os.replace(f"{path}.tmp", path)
+    return len(ids)
+
+
+def read_file_items(path: str) -> Iterator[list[dict]]:
+    with open(path) as f:
+        items = []
+        for line in f:
+            items.append(json.loads(line))
+            if len(items) >= RAG_INGEST_WINDOW_SIZE:
+                yield items
+                items = []
+        if items:
+            yield items
+
+
+def swap_collection(
+    request: Request, job_id: str, knowledge_id: str, file_ids: list[str]
+) -> list[str]:
+    """
+    Replace the chunks of the built files of `file_ids` in a knowledge base's
+    collection, one file at a time: its old chunks are deleted by file_id
+    and the new ones upserted. Chunks and hashes of files that failed to
+    build, or were added since, are left alone, and built files that have
+    since left the knowledge base are removed. Running it again after an
+    interruption finishes the swap.
+
+    Only when the vector DB rejects the new chunks after the embedding model
+    changed (a new embedding dimension) is the collection deleted and
+    refilled from the built files, which loses the chunks of failed ones.
+    That is recorded on the job's knowledge checkpoint as refilled.
+
+    Returns the ids of files left out as duplicate content.
+    """
+    knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+    current_ids = set(
+        knowledge.data.get("file_ids", [])
+        if knowledge and isinstance(knowledge.data, dict)
+        else []
+    )
+
+    # Files built on another node are left as they are, like failed ones
+    metas = {}
+    for file_id in dict.fromkeys(file_ids):
+        if is_file_built(job_id, knowledge_id, file_id):
+            with open(get_meta_path(get_file_path(job_id, knowledge_id, file_id))) as f:
+                metas[file_id] = json.load(f)
+
+    hashes = {}
+    duplicates = []
+    for file_id, meta in metas.items():
+        if file_id not in current_ids:
+            continue
+        if meta["hash"] in hashes.values():
+            duplicates.append(file_id)
+        else:
+            hashes[file_id] = meta["hash"]
+
+    if current_ids and not hashes:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("No file could be reindexed"))
+
+    def delete_file(file_id: str):
+        VECTOR_DB_CLIENT.delete(
+            collection_name=knowledge_id, filter={"file_id": file_id}
+        )
+        if BM25_INDEX is not None:
+            BM25_INDEX.delete(knowledge_id, filter={"file_id": file_id})
+        DocumentHashes.delete_hashes_by_file_id(knowledge_id, file_id)
+
+    def upsert(items: list[dict], create_index: bool):
+        VECTOR_DB_CLIENT.upsert(collection_name=knowledge_id, items=items)
+        # An index created here would lack the chunks of failed files, so
+        # it is only created for a refilled collection
+        if BM25_INDEX is not None:
+            BM25_INDEX.add(
+                knowledge_id,
+                items,
+                create=create_index
+                and request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+            )
+
+    # Upserting a first window finds out whether the collection still takes
+    # the new chunks, before any are deleted
+    refilled = False
+    if hashes:
+        file_id = next(iter(hashes))
+        items = next(read_file_items(get_file_path(job_id, knowledge_id, file_id)))
+        try:
+            upsert(items, create_index=False)
+        except Exception as e:
+            old_config = next(
+                (
+                    (result.metadatas[0][0] or {}).get("embedding_config")
+                    for result in (
+                        VECTOR_DB_CLIENT.query(
+                            collection_name=knowledge_id,
+                            filter={"file_id": id},
+                            limit=1,
+                        )
+                        for id in hashes
+                    )
+                    if result and result.metadatas and result.metadatas[0]
+                ),
+                None,
+            )
+            if old_config is None or old_config == metas[file_id]["embedding_config"]:
+                raise
+
+            log.warning(
+                f"Collection {knowledge_id} rejected chunks of the new embedding model ({e}), refilling it"
+            )
+            ReindexJobs.update_knowledge_status(
+                job_id, knowledge_id, "swapping", refilled=True
+            )
+            VECTOR_DB_CLIENT.delete_collection(collection_name=knowledge_id)
+            if BM25_INDEX is not None:
+                BM25_INDEX.delete_collection(knowledge_id)
+            DocumentHashes.delete_hashes_by_collection_name(knowledge_id)
+            refilled = True
+
+    for file_id in metas:
+        if file_id not in hashes:
+            delete_file(file_id)
+
+    for file_id, hash in hashes.items():
+        delete_file(file_id)
+        for items in read_file_items(get_file_path(job_id, knowledge_id, file_id)):
+            upsert(items, create_index=refilled)
+        DocumentHashes.insert_hash(knowledge_id, hash, file_id)
+        Files.update_file_metadata_by_id(file_id, {"collection_name": knowledge_id})
+
+    return duplicates
+
+
+class ReindexRun:
+    """
+    One worker's run of a reindex job, from its checkpoints.
+
+    Knowledge bases are reindexed one at a time. Their files are embedded
+    on a pool of RAG_REINDEX_WORKERS threads into files under REINDEX_DIR,
+    checkpointing each file, while the existing collection keeps serving
+    queries. Once every file is built, their chunks replace the collection's
+    (see swap_collection). A knowledge base interrupted while being swapped
+    is swapped again.
+    """
+
+    def __init__(self, app, job: ReindexJobModel, stop: threading.Event):
+        self.request = Request({"type": "http", "app": app})
+        self.job = job
+        self.stop = stop
+        self.started = time.monotonic()
+        self.files_at_start = None
+
+    def report(self, status: Optional[str] = None):
+        progress = ReindexJobs.get_job_progress(self.job)
+        files = progress.done_files + progress.failed_files
+        if self.files_at_start is None:
+            self.files_at_start = files
+
+        eta = None
+        elapsed = time.monotonic() - self.started
+        if files > self.files_at_start and elapsed > 0:
+            rate = (files - self.files_at_start) / elapsed
+            eta = round(max(progress.total_files - files, 0) / rate)
+
+        emit_to_user(
+            self.job.user_id,
+            "knowledge-events",
+            {
+                "job_id": self.job.id,
+                "data": {
+                    "type": "reindex:progress",
+                    **progress.model_dump(),
+                    "status": status or progress.status,
+                    "eta": eta,
+                },
+            },
+        )
+
+    def build_files(
+        self, pool: ThreadPoolExecutor, knowledge_id: str, files: list[FileModel]
+    ):
+        futures = {
+            pool.submit(build_file, self.request, self.job.id, knowledge_id, file): file
+            for file in files
+        }
+        for future in as_completed(futures):
+            file = futures[future]
+            try:
+                chunks = future.result()
+                ReindexJobs.upsert_file_status(
+                    self.job.id, knowledge_id, file.id, "done", chunks
+                )
+            except Exception as e:
+                log.error(f"Error reindexing file {file.filename} ({file.id}): {e}")
+                ReindexJobs.upsert_file_status(
+                    self.job.id, knowledge_id, file.id, "failed", error=str(e)
+                )
+            self.report()
+
+            if self.stop.is_set():
+                for future in futures:
+                    future.cancel()
+                return
+
+    def reindex_knowledge(self, pool: ThreadPoolExecutor, knowledge_id: str):
+        knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+        if knowledge is None:
+            ReindexJobs.update_knowledge_status(self.job.id, knowledge_id, "skipped")
+            return
+
+        if not knowledge.data or not isinstance(knowledge.data, dict):
+            log.warning(
+                f"Knowledge base {knowledge.id} has no data or invalid data ({knowledge.data!r}). Deleting."
+            )
+            Knowledges.delete_knowledge_by_id(id=knowledge.id)
+            ReindexJobs.update_knowledge_status(
+                self.job.id, knowledge_id, "skipped", "Invalid data"
+            )
+            return
+
+        ReindexJobs.update_knowledge_status(self.job.id, knowledge_id, "building")
+
+        # Files added while the others are built are built too, so none are
+        # lost in the swap
+        seen_ids = set()
+        while True:
+            file_ids = [
+                file_id
+                for file_id in knowledge.data.get("file_ids", [])
+                if file_id not in seen_ids
+            ]
+            if not file_ids:
+                break
+            if seen_ids:
+                ReindexJobs.add_total_files(self.job.id, len(file_ids))
+            seen_ids.update(file_ids)
+
+            checkpoints = ReindexJobs.get_file_checkpoints(self.job.id, knowledge_id)
+            files = [
+                file
+                for file in Files.get_files_by_ids(file_ids)
+                if file.id not in checkpoints
+                or (
+                    checkpoints[file.id].status == "done"
+                    # Built by a worker on another node
+                    and not is_file_built(self.job.id, knowledge_id, file.id)
+                )
+            ]
+            self.build_files(pool, knowledge_id, files)
+            if self.stop.is_set():
+                return
+
+            knowledge = Knowledges.get_knowledge_by_id(knowledge_id)
+            if knowledge is None or not isinstance(knowledge.data, dict):
+                ReindexJobs.update_knowledge_status(
+                    self.job.id, knowledge_id, "skipped"
+                )
+                return
+
+        self.swap(knowledge_id)
+
+    def swap(self, knowledge_id: str):
+        ReindexJobs.update_knowledge_status(self.job.id, knowledge_id, "swapping")
+        checkpoints = ReindexJobs.get_file_checkpoints(self.job.id, knowledge_id)
+        built_ids = [
+            file_id
+            for file_id, checkpoint in checkpoints.items()
+            if checkpoint.status == "done"
+        ]
+
+        try:
+            duplicates = swap_collection(
+                self.request, self.job.id, knowledge_id, built_ids
+            )
+        except Exception as e:
+            log.exception(f"Error swapping collection {knowledge_id}: {e}")
+            ReindexJobs.update_knowledge_status(
+                self.job.id, knowledge_id, "failed", str(e)
+            )
+            return
+
+        for file_id in duplicates:
+            ReindexJobs.upsert_file_status(
+                self.job.id,
+                knowledge_id,
+                file_id,
+                "failed",
+                error=ERROR_MESSAGES.DUPLICATE_CONTENT,
+            )
+
+        ReindexJobs.update_knowledge_status(self.job.id, knowledge_id, "done")
+        shutil.rmtree(os.path.join(REINDEX_DIR, self.job.id, knowledge_id), True)
+
+    def run(self) -> bool:
+        """Returns False if stopped before the job was done"""
+        self.report()
+        with ThreadPoolExecutor(max_workers=max(RAG_REINDEX_WORKERS, 1)) as pool:
+            for checkpoint in ReindexJobs.get_knowledge_checkpoints(self.job.id):
+                if self.stop.is_set():
+                    return False
+
+                if checkpoint.status == "swapping":
+                    knowledge = Knowledges.get_knowledge_by_id(checkpoint.knowledge_id)
+                    if knowledge and isinstance(knowledge.data, dict):
+                        self.swap(checkpoint.knowledge_id)
+                elif checkpoint.status in ("pending", "building"):
+                    self.reindex_knowledge(pool, checkpoint.knowledge_id)
+
+        if self.stop.is_set():
+            return False
+
+        shutil.rmtree(os.path.join(REINDEX_DIR, self.job.id), True)
+        return True
+
+
+async def run_job(app, job: ReindexJobModel):
+    log.info(f"Running knowledge reindex job {job.id}")
+    stop = threading.Event()
+    run = ReindexRun(app, job, stop)
+    task = asyncio.create_task(asyncio.to_thread(run.run))
+
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=HEARTBEAT_INTERVAL)
+            if not task.done() and not await asyncio.to_thread(
+                ReindexJobs.heartbeat, job.id, OWNER
+            ):
+                log.warning(f"Reindex job {job.id} was taken over, stopping")
+                stop.set()
+        completed = task.result()
+    except asyncio.CancelledError:
+        # Left running, to be resumed once its heartbeat is stale
+        stop.set()
+        raise
+    except Exception as e:
+        log.exception(f"Reindex job {job.id} failed: {e}")
+        ReindexJobs.finish_job(job.id, "failed", str(e))
+        run.report("failed")
+        return
+
+    if completed:
+        job = ReindexJobs.finish_job(job.id, "completed")
+        log.info(f"Knowledge reindex job {job.id} completed")
+        run.job = job
+        run.report()
+
+
+async def run_reindex_jobs(app):
+    """
+    Run reindex jobs as they are created, and resume the ones whose worker
+    stopped (after a restart, or on another worker) from their checkpoints
+    """
+    while True:
+        wakeup.clear()
+        try:
+            job = await asyncio.to_thread(
+                ReindexJobs.claim_job, OWNER, int(time.time()) - HEARTBEAT_TIMEOUT
+            )
+            if job:
+                await run_job(app, job)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Knowledge reindex failed: {e}")
+
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,147 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from langchain.text_splitter import (
+    RecursiveCharacterTextSplitter,
+    TextSplitter,
+    TokenTextSplitter,
+)
+from langchain_core.documents import Document
+
+from open_webui.constants import ERROR_MESSAGES
+
+# This module is imported by the splitter worker processes, so it must not
+# import open_webui.env or open_webui.config (and with them torch); callers
+# pass the settings in instead.
+log = logging.getLogger(__name__)
+
+# Characters of text sent to a worker process at a time
+SHARD_SIZE = 256 * 1024
+
+
+@lru_cache(maxsize=8)
+def get_text_splitter(
+    splitter: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding_name: Optional[str] = None,
+) -> TextSplitter:
+    """
+    Text splitter for the TEXT_SPLITTER setting. Splitters are cached per
+    process, so the tiktoken encoding is loaded once per worker rather than
+    on every ingest.
+    """
+    if splitter in ["", "character"]:
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+    elif splitter == "token":
+        log.info(f"Using token text splitter: {encoding_name}")
+        return TokenTextSplitter(
+            encoding_name=str(encoding_name),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+    raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+
+def split_shard(docs: list[Document], options: tuple) -> list[list[Document]]:
+    """Chunks of each document, split on their own so start_index is per document"""
+    text_splitter = get_text_splitter(*options)
+    return [text_splitter.split_documents([doc]) for doc in docs]
+
+
+def get_shards(docs: list[Document], size: int = SHARD_SIZE) -> Iterator[list]:
+    shard, length = [], 0
+    for doc in docs:
+        shard.append(doc)
+        length += len(doc.page_content)
+        if length >= size:
+            yield shard
+            shard, length = [], 0
+    if shard:
+        yield shard
+
+
+class TextSplitterPool:
+    """
+    Splits documents on a pool of worker processes.
+
+    Documents are sent to the workers in shards of about SHARD_SIZE
+    characters, with at most two shards per worker in flight, and their
+    chunks come back in document order. Each document is split on its own,
+    so the chunks and their start_index are the same as splitting in
+    process. Ingests smaller than `min_chars`, or any ingest when `workers`
+    is 1 or less, are split in the calling thread.
+    """
+
+    def __init__(self, workers: int, min_chars: int):
+        self.workers = workers
+        self.min_chars = min_chars
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process with running threads isn't safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                atexit.register(self.close)
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def split(self, docs: list[Document], options: tuple) -> Iterator[list[Document]]:
+        """
+        Chunks of each of `docs`, in order. `options` are the arguments of
+        get_text_splitter.
+        """
+        if self.workers <= 1 or (
+            sum(len(doc.page_content) for doc in docs) < self.min_chars
+        ):
+            text_splitter = get_text_splitter(*options)
+            for doc in docs:
+                yield text_splitter.split_documents([doc])
+            return
+
+        executor = self._get_executor()
+        shards = get_shards(docs)
+        pending = deque()
+
+        def submit():
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(executor.submit(split_shard, shard, options))
+
+        try:
+            for _ in range(self.workers * 2):
+                submit()
+            while pending:
+                chunks = pending.popleft().result()
+                submit()
+                yield from chunks
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a new pool next time
+            self.close()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
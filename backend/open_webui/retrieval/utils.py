@@ -2,10 +2,9 @@ import logging
 import os
 from typing import Optional, Union
 
-import requests
-import hashlib
 from concurrent.futures import ThreadPoolExecutor
-import time
+
+import numpy as np
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
@@ -14,6 +13,9 @@ from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX, BM25IndexRetriever
+from open_webui.retrieval.embedding_cache import EmbeddingCache
+from open_webui.retrieval.embeddings import EMBEDDING_CLIENT
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
@@ -24,7 +26,6 @@ from open_webui.retrieval.vector.main import GetResult
 from open_webui.env import (
     SRC_LOG_LEVELS,
     OFFLINE_MODE,
-    ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
@@ -108,9 +109,46 @@ def get_doc(collection_name: str, user: UserModel = None):
         raise e
 
 
+def ensure_bm25_index(collection_name: str):
+    """Build the persistent BM25 index of a collection if it has none yet"""
+    if BM25_INDEX.has_index(collection_name):
+        return
+
+    # Fetched by the build once the collection's writes are held back, so an
+    # earlier snapshot can't miss chunks written in between
+    def get_collection():
+        collection_result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        if collection_result is None:
+            raise ValueError(f"Collection {collection_name} not found")
+        return collection_result
+
+    log.info(f"Building BM25 index for collection {collection_name}")
+    BM25_INDEX.build(collection_name, get_collection, replace=False)
+
+
+def get_bm25_retriever(
+    collection_name: str, k: int, collection_result: Optional[GetResult] = None
+) -> BaseRetriever:
+    if BM25_INDEX is not None:
+        ensure_bm25_index(collection_name)
+        return BM25IndexRetriever(
+            index=BM25_INDEX, collection_name=collection_name, k=k
+        )
+
+    # Without persistent indexes, index the whole collection for this query
+    if collection_result is None:
+        collection_result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+    bm25_retriever = BM25Retriever.from_texts(
+        texts=collection_result.documents[0],
+        metadatas=collection_result.metadatas[0],
+    )
+    bm25_retriever.k = k
+    return bm25_retriever
+
+
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    collection_result: Optional[GetResult],
     query: str,
     embedding_function,
     k: int,
@@ -121,11 +159,11 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
+        bm25_retriever = (
+            get_bm25_retriever(collection_name, k, collection_result)
+            if hybrid_bm25_weight > 0
+            else None
         )
-        bm25_retriever.k = k
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -209,43 +247,113 @@ def merge_get_results(get_results: list[dict]) -> dict:
     return result
 
 
-def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
-    # Initialize lists to store combined data
-    combined = dict()  # To store documents with unique document hashes
+# Reciprocal rank fusion constant, as in Cormack et al.
+RRF_K = 60
 
-    for data in query_results:
-        distances = data["distances"][0]
-        documents = data["documents"][0]
-        metadatas = data["metadatas"][0]
 
-        for distance, document, metadata in zip(distances, documents, metadatas):
-            if isinstance(document, str):
-                doc_hash = hashlib.sha256(
-                    document.encode()
-                ).hexdigest()  # Compute a hash for uniqueness
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, highest first, without a full sort"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        indices = np.argpartition(-scores, k - 1)[:k]
+    else:
+        indices = np.arange(len(scores))
+    return indices[np.argsort(-scores[indices], kind="stable")]
 
-                if doc_hash not in combined.keys():
-                    combined[doc_hash] = (distance, document, metadata)
-                    continue  # if doc is new, no further comparison is needed
 
-                # if doc is alredy in, but new distance is better, update
-                if distance > combined[doc_hash][0]:
-                    combined[doc_hash] = (distance, document, metadata)
+def cosine_similarity(queries, documents) -> np.ndarray:
+    """(queries x documents) cosine similarities of two stacks of embeddings"""
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    documents = np.atleast_2d(np.asarray(documents, dtype=np.float32))
+    queries = queries / np.maximum(
+        np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+    )
+    documents = documents / np.maximum(
+        np.linalg.norm(documents, axis=1, keepdims=True), 1e-12
+    )
+    return queries @ documents.T
 
-    combined = list(combined.values())
-    # Sort the list based on distances
-    combined.sort(key=lambda x: x[0], reverse=True)
 
-    # Slice to keep only the top k elements
-    sorted_distances, sorted_documents, sorted_metadatas = (
-        zip(*combined[:k]) if combined else ([], [], [])
-    )
+def merge_and_sort_query_results(
+    query_results: list[dict], k: int, queries: Optional[list] = None
+) -> dict:
+    """
+    Merge the results of several queries and collections into the top k.
+
+    `queries` gives the query each result list is for (all the same query by
+    default). The results of one query are ranked by distance across its
+    collections, as their distances are comparable. With several queries,
+    documents are ordered by reciprocal rank fusion of those per-query
+    ranks, so a document found by several queries ranks above one that a
+    single query scored highly, and ties are broken by distance. Duplicate
+    documents are merged, keeping their best distance and its metadata.
+    """
+    if queries is None:
+        queries = [None] * len(query_results)
+
+    query_index = {}
+    document_index = {}
+    documents = []
+    # One entry per document in each result list
+    entry_docs, entry_queries, entry_distances, entry_metadatas = [], [], [], []
+
+    for data, query in zip(query_results, queries):
+        query_idx = query_index.setdefault(query, len(query_index))
+        for distance, document, metadata in zip(
+            data["distances"][0], data["documents"][0], data["metadatas"][0]
+        ):
+            if isinstance(document, str):
+                idx = document_index.setdefault(document, len(documents))
+                if idx == len(documents):
+                    documents.append(document)
+                entry_docs.append(idx)
+                entry_queries.append(query_idx)
+                entry_distances.append(
+                    float(distance) if distance is not None else -np.inf
+                )
+                entry_metadatas.append(metadata)
+
+    if not documents:
+        return {"distances": [[]], "documents": [[]], "metadatas": [[]]}
+
+    entry_docs = np.array(entry_docs, dtype=np.intp)
+    entry_queries = np.array(entry_queries, dtype=np.intp)
+    entry_distances = np.array(entry_distances)
+
+    # Best entry of each document: sort by document, then distance descending
+    order = np.lexsort((-entry_distances, entry_docs))
+    _, first = np.unique(entry_docs[order], return_index=True)
+    best_entries = order[first]
+    best_distances = entry_distances[best_entries]
+
+    fused = np.zeros(len(documents))
+    num_queries = len(query_index)
+    if num_queries > 1:
+        # Best distance of each document in each query's results
+        pairs = entry_docs * num_queries + entry_queries
+        order = np.lexsort((-entry_distances, pairs))
+        pairs, first = np.unique(pairs[order], return_index=True)
+        pair_distances = entry_distances[order[first]]
+        pair_docs, pair_queries = np.divmod(pairs, num_queries)
+
+        # Rank of each document in its query's results, best distance first
+        order = np.lexsort((-pair_distances, pair_queries))
+        sorted_queries = pair_queries[order]
+        ranks = np.empty(len(order), dtype=np.intp)
+        ranks[order] = np.arange(len(order)) - np.searchsorted(
+            sorted_queries, sorted_queries
+        )
+        np.add.at(fused, pair_docs, 1.0 / (RRF_K + 1 + ranks))
+
+    # Select on the full key, so ties at the k-th place go to the better
+    # distance (and then the first seen document)
+    top = np.lexsort((-best_distances, -fused))[:k]
 
-    # Create and return the output dictionary
     return {
-        "distances": [list(sorted_distances)],
-        "documents": [list(sorted_documents)],
-        "metadatas": [list(sorted_metadatas)],
+        "distances": [[float(best_distances[i]) for i in top]],
+        "documents": [[documents[i] for i in top]],
+        "metadatas": [[entry_metadatas[best_entries[i]] for i in top]],
     }
 
 
@@ -298,24 +406,26 @@ def query_collection(
 
     with ThreadPoolExecutor() as executor:
         future_results = []
-        for query_embedding in query_embeddings:
+        for query, query_embedding in zip(queries, query_embeddings):
             for collection_name in collection_names:
                 result = executor.submit(
                     process_query_collection, collection_name, query_embedding
                 )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+                future_results.append((query, result))
+        task_results = [(query, future.result()) for query, future in future_results]
 
-    for result, err in task_results:
+    result_queries = []
+    for query, (result, err) in task_results:
         if err is not None:
             error = True
         elif result is not None:
             results.append(result)
+            result_queries.append(query)
 
     if error and not results:
         log.warning("All collection queries failed. No results returned.")
 
-    return merge_and_sort_query_results(results, k=k)
+    return merge_and_sort_query_results(results, k=k, queries=result_queries)
 
 
 def query_collection_with_hybrid_search(
@@ -330,20 +440,26 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
+    # Prepare each collection once, sequentially, before the queries run:
+    # make sure its BM25 index exists, or without persistent indexes fetch
+    # its data once rather than for every query
     collection_results = {}
     for collection_name in collection_names:
         try:
+            if BM25_INDEX is not None:
+                if hybrid_bm25_weight > 0:
+                    ensure_bm25_index(collection_name)
+                collection_results[collection_name] = None
+                continue
+
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
+            result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+            if result is not None:
+                collection_results[collection_name] = result
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -368,30 +484,29 @@ def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that failed to prepare
     tasks = [
-        (cn, q)
-        for cn in collection_names
-        if collection_results[cn] is not None
-        for q in queries
+        (cn, q) for cn in collection_names if cn in collection_results for q in queries
     ]
 
     with ThreadPoolExecutor() as executor:
         future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
         task_results = [future.result() for future in future_results]
 
-    for result, err in task_results:
+    result_queries = []
+    for (_, query), (result, err) in zip(tasks, task_results):
         if err is not None:
             error = True
         elif result is not None:
             results.append(result)
+            result_queries.append(query)
 
     if error and not results:
         raise Exception(
             "Hybrid search failed for all collections. Using Non-hybrid search as fallback."
         )
 
-    return merge_and_sort_query_results(results, k=k)
+    return merge_and_sort_query_results(results, k=k, queries=result_queries)
 
 
 def get_embedding_function(
@@ -402,13 +517,32 @@ def get_embedding_function(
     key,
     embedding_batch_size,
     azure_api_version=None,
+    cache: Optional[EmbeddingCache] = None,
 ):
+    if cache is not None:
+        # Cache lookups wrap the whole function, so batches only carry misses
+        return cache.wrap(
+            embedding_engine,
+            embedding_model,
+            get_embedding_function(
+                embedding_engine,
+                embedding_model,
+                embedding_function,
+                url,
+                key,
+                embedding_batch_size,
+                azure_api_version=azure_api_version,
+            ),
+        )
+
     if embedding_engine == "":
         return lambda query, prefix=None, user=None: embedding_function.encode(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        # Lists are split into batches of embedding_batch_size texts (and a
+        # token budget) that are sent concurrently
+        return lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -417,25 +551,7 @@ def get_embedding_function(
             key=key,
             user=user,
             azure_api_version=azure_api_version,
-        )
-
-        def generate_multiple(query, prefix, user, func):
-            if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
-                return embeddings
-            else:
-                return func(query, prefix, user)
-
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
+            batch_size=embedding_batch_size,
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
@@ -662,39 +778,22 @@ def generate_openai_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_openai_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
-            },
-            json=json_data,
+        return EMBEDDING_CLIENT.embed(
+            "openai",
+            model,
+            texts,
+            url,
+            key,
+            prefix=prefix,
+            user=user,
+            batch_size=batch_size,
         )
-        r.raise_for_status()
-        data = r.json()
-        if "data" in data:
-            return [elem["embedding"] for elem in data["data"]]
-        else:
-            raise "Something went wrong :/"
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
@@ -708,47 +807,23 @@ def generate_azure_openai_batch_embeddings(
     version: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_azure_openai_batch_embeddings:deployment {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        url = f"{url}/openai/deployments/{model}/embeddings?api-version={version}"
-
-        for _ in range(5):
-            r = requests.post(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    "api-key": key,
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=json_data,
-            )
-            if r.status_code == 429:
-                retry = float(r.headers.get("Retry-After", "1"))
-                time.sleep(retry)
-                continue
-            r.raise_for_status()
-            data = r.json()
-            if "data" in data:
-                return [elem["embedding"] for elem in data["data"]]
-            else:
-                raise Exception("Something went wrong :/")
-        return None
+        return EMBEDDING_CLIENT.embed(
+            "azure_openai",
+            model,
+            texts,
+            url,
+            key,
+            prefix=prefix,
+            user=user,
+            azure_api_version=version,
+            batch_size=batch_size,
+        )
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
@@ -761,40 +836,22 @@ def generate_ollama_batch_embeddings(
     key: str = "",
     prefix: str = None,
     user: UserModel = None,
+    batch_size: Optional[int] = None,
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
             f"generate_ollama_batch_embeddings:model {model} batch size: {len(texts)}"
         )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
-
-        r = requests.post(
-            f"{url}/api/embed",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
-            },
-            json=json_data,
+        return EMBEDDING_CLIENT.embed(
+            "ollama",
+            model,
+            texts,
+            url,
+            key,
+            prefix=prefix,
+            user=user,
+            batch_size=batch_size,
         )
-        r.raise_for_status()
-        data = r.json()
-
-        if "embeddings" in data:
-            return data["embeddings"]
-        else:
-            raise "Something went wrong :/"
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
@@ -810,6 +867,7 @@ def generate_embeddings(
     url = kwargs.get("url", "")
     key = kwargs.get("key", "")
     user = kwargs.get("user")
+    batch_size = kwargs.get("batch_size")
 
     if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
         if isinstance(text, list):
@@ -817,38 +875,28 @@ def generate_embeddings(
         else:
             text = f"{prefix}{text}"
 
+    texts = text if isinstance(text, list) else [text]
     if engine == "ollama":
         embeddings = generate_ollama_batch_embeddings(
-            **{
-                "model": model,
-                "texts": text if isinstance(text, list) else [text],
-                "url": url,
-                "key": key,
-                "prefix": prefix,
-                "user": user,
-            }
+            model, texts, url, key, prefix, user, batch_size
         )
-        return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "openai":
         embeddings = generate_openai_batch_embeddings(
-            model, text if isinstance(text, list) else [text], url, key, prefix, user
+            model, texts, url, key, prefix, user, batch_size
         )
-        return embeddings[0] if isinstance(text, str) else embeddings
     elif engine == "azure_openai":
         azure_api_version = kwargs.get("azure_api_version", "")
         embeddings = generate_azure_openai_batch_embeddings(
-            model,
-            text if isinstance(text, list) else [text],
-            url,
-            key,
-            azure_api_version,
-            prefix,
-            user,
+            model, texts, url, key, azure_api_version, prefix, user, batch_size
         )
-        return embeddings[0] if isinstance(text, str) else embeddings
+    else:
+        return None
+
+    if embeddings is None:
+        return None
+    return embeddings[0] if isinstance(text, str) else embeddings
 
 
-import operator
 from typing import Optional, Sequence
 
 from langchain_core.callbacks import Callbacks
@@ -871,37 +919,34 @@ class RerankCompressor(BaseDocumentCompressor):
         query: str,
         callbacks: Optional[Callbacks] = None,
     ) -> Sequence[Document]:
-        reranking = self.reranking_function is not None
+        if not documents:
+            return []
 
-        if reranking:
+        if self.reranking_function is not None:
             scores = self.reranking_function.predict(
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
-
             query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
+            document_embeddings = self.embedding_function(
                 [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = cosine_similarity(query_embedding, document_embeddings)[0]
 
-        docs_with_scores = list(
-            zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
-        )
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        candidates = np.arange(len(documents))
         if self.r_score:
-            docs_with_scores = [
-                (d, s) for d, s in docs_with_scores if s >= self.r_score
-            ]
+            candidates = candidates[scores >= self.r_score]
 
-        result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
         final_results = []
-        for doc, doc_score in result[: self.top_n]:
+        for idx in candidates[top_k_indices(scores[candidates], self.top_n)]:
+            doc = documents[idx]
             metadata = doc.metadata
-            metadata["score"] = doc_score
-            doc = Document(
-                page_content=doc.page_content,
-                metadata=metadata,
+            metadata["score"] = float(scores[idx])
+            final_results.append(
+                Document(
+                    page_content=doc.page_content,
+                    metadata=metadata,
+                )
             )
-            final_results.append(doc)
         return final_results
@@ -1,21 +1,31 @@
+import base64
 import json
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 from uuid import uuid4
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 import logging
 
 from open_webui.models.artifacts import (
+    ARTIFACT_FIELDS,
+    ARTIFACT_FORM_FIELDS,
+    ARTIFACT_HEAVY_FIELDS,
     Artifacts,
+    ArtifactBulkForm,
+    ArtifactBulkResponse,
+    ArtifactFilter,
     ArtifactForm,
+    ArtifactListResponse,
     ArtifactResponse,
 )
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_permission
 from open_webui.config import CACHE_DIR
+from open_webui.utils.artifacts import ArtifactsConfigCache
 
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -29,6 +39,9 @@ class ArtifactsConfigResponse(BaseModel):
     fields: List[dict]
 
 
+artifacts_config = ArtifactsConfigCache(tuple(ARTIFACT_FORM_FIELDS))
+
+
 ############################
 # Get Artifacts Config
 ############################
@@ -38,34 +51,9 @@ class ArtifactsConfigResponse(BaseModel):
 async def get_artifacts_config(request: Request, user=Depends(get_verified_user)):
     """Get artifacts configuration from artifacts.json file"""
     try:
-        # Try to load from workspace-specific artifacts.json
+        # Workspace-specific artifacts.json, falling back to the project root
         workspace_id = request.query_params.get("workspace_id")
-        if workspace_id:
-            artifacts_path = (
-                Path.home()
-                / ".local"
-                / "share"
-                / "open-webui"
-                / "data"
-                / "workspace"
-                / workspace_id
-                / "artifacts.json"
-            )
-            if artifacts_path.exists():
-                with open(artifacts_path, "r") as f:
-                    config = json.load(f)
-                    return ArtifactsConfigResponse(**config)
-
-        # Fallback to default artifacts.json in project root
-        default_path = Path("artifacts.json")
-        if default_path.exists():
-            with open(default_path, "r") as f:
-                config = json.load(f)
-                return ArtifactsConfigResponse(**config)
-
-        # Return empty config if no file found
-        return ArtifactsConfigResponse(fields=[])
-
+        return ArtifactsConfigResponse(**artifacts_config.get(workspace_id)["config"])
     except Exception as e:
         log.exception(f"Failed to load artifacts config: {e}")
         raise HTTPException(
@@ -74,34 +62,92 @@ async def get_artifacts_config(request: Request, user=Depends(get_verified_user)
         )
 
 
+def validate_artifact_data(workspace_id: str, data: Optional[dict]):
+    errors = artifacts_config.get(workspace_id)["validator"].validate(data)
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("; ".join(errors)),
+        )
+
+
 ############################
 # Get Artifacts
 ############################
 
 
-@router.get("/", response_model=List[ArtifactResponse])
-async def get_artifacts(workspace_id: str, user=Depends(get_verified_user)):
-    """Get all artifacts for a workspace"""
+def encode_cursor(cursor) -> Optional[str]:
+    if cursor is None:
+        return None
+    updated_at, artifact_id = cursor
+    return base64.urlsafe_b64encode(
+        json.dumps([updated_at.isoformat(), artifact_id]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str):
     try:
-        artifacts = Artifacts.get_artifacts_by_workspace_id(workspace_id)
+        updated_at, artifact_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(updated_at), artifact_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Invalid cursor"),
+        )
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """`fields` is a comma separated column list, or "summary" for all but the heavy ones"""
+    if not fields:
+        return None
+    if fields == "summary":
         return [
-            ArtifactResponse(
-                id=getattr(artifact, "id"),
-                workspace_id=getattr(artifact, "workspace_id"),
-                title=getattr(artifact, "title"),
-                type=getattr(artifact, "type"),
-                client=getattr(artifact, "client"),
-                module=getattr(artifact, "module"),
-                description=getattr(artifact, "description"),
-                owner=getattr(artifact, "owner"),
-                priority=getattr(artifact, "priority"),
-                due_date=getattr(artifact, "due_date").isoformat(),
-                data=getattr(artifact, "data"),
-                created_at=getattr(artifact, "created_at").isoformat(),
-                updated_at=getattr(artifact, "updated_at").isoformat(),
-            )
-            for artifact in artifacts
+            field for field in ARTIFACT_FIELDS if field not in ARTIFACT_HEAVY_FIELDS
         ]
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ARTIFACT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(f"Unknown fields: {', '.join(unknown)}"),
+        )
+    return requested
+
+
+@router.get("/", response_model=ArtifactListResponse)
+async def get_artifacts(
+    workspace_id: str,
+    type: Optional[str] = None,
+    client: Optional[str] = None,
+    module: Optional[str] = None,
+    owner: Optional[str] = None,
+    priority: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    user=Depends(get_verified_user),
+):
+    """Get a page of artifacts for a workspace, most recently updated first"""
+    filters = ArtifactFilter(
+        type=type,
+        client=client,
+        module=module,
+        owner=owner,
+        priority=priority,
+        due_from=due_from,
+        due_to=due_to,
+    )
+    fields = parse_fields(fields)
+    cursor = decode_cursor(cursor) if cursor else None
+
+    try:
+        items, next_cursor = Artifacts.get_artifacts_page(
+            workspace_id, filters, fields, limit, cursor
+        )
+        return ArtifactListResponse(items=items, next_cursor=encode_cursor(next_cursor))
     except Exception as e:
         log.exception(f"Failed to get artifacts: {e}")
         raise HTTPException(
@@ -164,6 +210,7 @@ async def create_new_artifact(
     user=Depends(get_verified_user),
 ):
     """Create a new artifact"""
+    validate_artifact_data(workspace_id, form_data.data)
     try:
         artifact_id = str(uuid4())
         artifact = Artifacts.insert_new_artifact(workspace_id, form_data, artifact_id)
@@ -199,6 +246,33 @@ async def create_new_artifact(
         )
 
 
+############################
+# Bulk Create/Update/Delete Artifacts
+############################
+
+
+@router.post("/bulk", response_model=ArtifactBulkResponse)
+async def bulk_update_artifacts(
+    form_data: ArtifactBulkForm,
+    workspace_id: str,
+    user=Depends(get_verified_user),
+):
+    """Apply a mixed list of upserts and deletes, returning a result per item"""
+    try:
+        results = Artifacts.bulk_apply(
+            workspace_id,
+            form_data.items,
+            validate=artifacts_config.get(workspace_id)["validator"].validate,
+        )
+        return ArtifactBulkResponse(results=results)
+    except Exception as e:
+        log.exception(f"Failed to apply bulk artifact changes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ERROR_MESSAGES.DEFAULT("Failed to apply bulk artifact changes"),
+        )
+
+
 ############################
 # Update Artifact
 ############################
@@ -211,6 +285,14 @@ async def update_artifact(
     user=Depends(get_verified_user),
 ):
     """Update an existing artifact"""
+    artifact = Artifacts.get_artifact_by_id(artifact_id)
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Artifact not found",
+        )
+    validate_artifact_data(artifact.workspace_id, form_data.data)
+
     try:
         artifact = Artifacts.update_artifact(artifact_id, form_data)
 
@@ -143,10 +143,52 @@ class MessageUserResponse(MessageResponse):
     user: UserNameResponse
 
 
+def get_message_user_responses(
+    message_list: list[MessageModel], with_replies: bool = True
+) -> list[MessageUserResponse]:
+    """
+    A page of messages with their authors, reply counts and reactions, each
+    loaded for the whole page in one query
+    """
+    ids = [message.id for message in message_list]
+    users = {
+        user.id: user
+        for user in Users.get_users_by_user_ids(
+            list({message.user_id for message in message_list})
+        )
+    }
+    reply_stats = Messages.get_reply_stats_by_message_ids(ids) if with_replies else {}
+    reactions = Messages.get_reactions_by_message_ids(ids)
+
+    messages = []
+    for message in message_list:
+        reply_count, latest_reply_at = reply_stats.get(message.id, (0, None))
+        messages.append(
+            MessageUserResponse(
+                **{
+                    **message.model_dump(),
+                    "reply_count": reply_count,
+                    "latest_reply_at": latest_reply_at,
+                    "reactions": reactions[message.id],
+                    "user": UserNameResponse(**users[message.user_id].model_dump()),
+                }
+            )
+        )
+    return messages
+
+
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    before: Optional[str] = None,
+    user=Depends(get_verified_user),
 ):
+    """
+    Newest messages first; pass the id of the oldest message loaded as
+    `before` for the next page.
+    """
     channel = Channels.get_channel_by_id(id)
     if not channel:
         raise HTTPException(
@@ -160,31 +202,8 @@ async def get_channel_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        replies = Messages.get_replies_by_message_id(message.id)
-        latest_reply_at = replies[0].created_at if replies else None
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": len(replies),
-                    "latest_reply_at": latest_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_channel_id(id, skip, limit, before)
+    return get_message_user_responses(message_list)
 
 
 ############################
@@ -374,6 +393,7 @@ async def get_channel_thread_messages(
     message_id: str,
     skip: int = 0,
     limit: int = 50,
+    before: Optional[str] = None,
     user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
@@ -389,28 +409,10 @@ async def get_channel_thread_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_parent_id(
+        id, message_id, skip, limit, before
+    )
+    return get_message_user_responses(message_list, with_replies=False)
 
 
 ############################
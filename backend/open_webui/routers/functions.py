@@ -13,6 +13,9 @@ from open_webui.models.functions import (
     Functions,
 )
 from open_webui.utils.plugin import (
+    FUNCTION_MODULES,
+    get_content_hash,
+    invalidate_module,
     load_function_module_by_id,
     replace_imports,
     get_function_module_from_cache,
@@ -21,6 +24,7 @@ from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.models import MODEL_REGISTRY
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, HttpUrl
 
@@ -139,7 +143,10 @@ class SyncFunctionsForm(FunctionForm):
 async def sync_functions(
     request: Request, form_data: SyncFunctionsForm, user=Depends(get_admin_user)
 ):
-    return Functions.sync_functions(user.id, form_data.functions)
+    functions = Functions.sync_functions(user.id, form_data.functions)
+    await invalidate_module(request, FUNCTION_MODULES)
+    await MODEL_REGISTRY.invalidate()
+    return functions
 
 
 ############################
@@ -169,15 +176,23 @@ async def create_new_function(
             )
             form_data.meta.manifest = frontmatter
 
-            FUNCTIONS = request.app.state.FUNCTIONS
-            FUNCTIONS[form_data.id] = function_module
+            content_hash = get_content_hash(form_data.content)
+            FUNCTION_MODULES.set(
+                form_data.id,
+                content_hash,
+                (function_module, function_type, frontmatter),
+            )
 
             function = Functions.insert_new_function(user.id, function_type, form_data)
+            await invalidate_module(
+                request, FUNCTION_MODULES, form_data.id, content_hash
+            )
 
             function_cache_dir = CACHE_DIR / "functions" / form_data.id
             function_cache_dir.mkdir(parents=True, exist_ok=True)
 
             if function:
+                await MODEL_REGISTRY.invalidate()
                 return function
             else:
                 raise HTTPException(
@@ -229,6 +244,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            await MODEL_REGISTRY.invalidate()
             return function
         else:
             raise HTTPException(
@@ -256,6 +272,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            await MODEL_REGISTRY.invalidate()
             return function
         else:
             raise HTTPException(
@@ -285,8 +302,10 @@ async def update_function_by_id(
         )
         form_data.meta.manifest = frontmatter
 
-        FUNCTIONS = request.app.state.FUNCTIONS
-        FUNCTIONS[id] = function_module
+        content_hash = get_content_hash(form_data.content)
+        FUNCTION_MODULES.set(
+            id, content_hash, (function_module, function_type, frontmatter)
+        )
 
         updated = {**form_data.model_dump(exclude={"id"}), "type": function_type}
         log.debug(updated)
@@ -294,6 +313,8 @@ async def update_function_by_id(
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            await invalidate_module(request, FUNCTION_MODULES, id, content_hash)
+            await MODEL_REGISTRY.invalidate()
             return function
         else:
             raise HTTPException(
@@ -320,9 +341,8 @@ async def delete_function_by_id(
     result = Functions.delete_function_by_id(id)
 
     if result:
-        FUNCTIONS = request.app.state.FUNCTIONS
-        if id in FUNCTIONS:
-            del FUNCTIONS[id]
+        await invalidate_module(request, FUNCTION_MODULES, id)
+        await MODEL_REGISTRY.invalidate()
 
     return result
 
@@ -399,6 +419,7 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                await MODEL_REGISTRY.invalidate()
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
@@ -1,16 +1,30 @@
 from typing import List, Optional
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+    Request,
+)
 import logging
+import threading
 
 from open_webui.models.knowledge import (
     Knowledges,
     KnowledgeForm,
     KnowledgeResponse,
+    KnowledgeUserModel,
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.models.knowledge_reindex import ReindexJobs, ReindexJobResponse
+from open_webui.models.document_hashes import DocumentHashes
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval import reindex
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -38,99 +52,107 @@ router = APIRouter()
 ############################
 
 
-@router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
-    knowledge_bases = []
+# Only one reconciliation runs at a time; listings that find missing files
+# while it runs leave them for the next listing
+reconcile_lock = threading.Lock()
 
-    if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
-    else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
-
-    # Get files for each knowledge base
-    knowledge_with_files = []
-    for knowledge_base in knowledge_bases:
-        files = []
-        if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
 
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
+def remove_missing_knowledge_files(knowledge_ids: list[str]):
+    if not reconcile_lock.acquire(blocking=False):
+        return
+    try:
+        updated = Knowledges.remove_missing_file_ids(knowledge_ids)
+        log.info(f"Removed missing files from {updated} knowledge bases")
+    except Exception as e:
+        log.exception(f"Failed to remove missing knowledge files: {e}")
+    finally:
+        reconcile_lock.release()
 
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
 
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
+def get_knowledge_bases_with_files(
+    knowledge_bases: list[KnowledgeUserModel], background_tasks: BackgroundTasks
+) -> list[KnowledgeUserResponse]:
+    """
+    Add each knowledge base's files, with the metadata of every file fetched
+    in one query. File ids without a file are left out, and removed from the
+    knowledge bases by a background task after the response.
+    """
+    files = Files.get_file_metadatas_by_ids(
+        list(
+            {
+                file_id
+                for knowledge_base in knowledge_bases
+                if knowledge_base.data
+                for file_id in knowledge_base.data.get("file_ids", [])
+            }
+        )
+    )
+    # Most recently updated first, as from get_file_metadatas_by_ids
+    files_by_id = {file.id: file for file in files}
+    order = {file.id: idx for idx, file in enumerate(files)}
 
-                    files = Files.get_file_metadatas_by_ids(file_ids)
+    knowledge_with_files = []
+    missing_ids = []
+    for knowledge_base in knowledge_bases:
+        knowledge_files = []
+        data = knowledge_base.data
+        if data:
+            file_ids = data.get("file_ids", [])
+            existing_ids = [file_id for file_id in file_ids if file_id in files_by_id]
+            if len(existing_ids) != len(file_ids):
+                missing_ids.append(knowledge_base.id)
+                data = {**data, "file_ids": existing_ids}
+
+            knowledge_files = [
+                files_by_id[file_id]
+                for file_id in sorted(set(existing_ids), key=order.__getitem__)
+            ]
 
         knowledge_with_files.append(
             KnowledgeUserResponse(
-                **knowledge_base.model_dump(),
-                files=files,
+                **{**knowledge_base.model_dump(), "data": data},
+                files=knowledge_files,
             )
         )
 
-    return knowledge_with_files
+    if missing_ids:
+        background_tasks.add_task(remove_missing_knowledge_files, missing_ids)
 
+    return knowledge_with_files
 
-@router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
-    knowledge_bases = []
 
+@router.get("/", response_model=list[KnowledgeUserResponse])
+async def get_knowledge(
+    background_tasks: BackgroundTasks,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
+        knowledge_bases = Knowledges.get_knowledge_bases(skip, limit)
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
-
-    # Get files for each knowledge base
-    knowledge_with_files = []
-    for knowledge_base in knowledge_bases:
-        files = []
-        if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
-
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
-
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "read", skip, limit
+        )
 
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
+    return get_knowledge_bases_with_files(knowledge_bases, background_tasks)
 
-                    files = Files.get_file_metadatas_by_ids(file_ids)
 
-        knowledge_with_files.append(
-            KnowledgeUserResponse(
-                **knowledge_base.model_dump(),
-                files=files,
-            )
+@router.get("/list", response_model=list[KnowledgeUserResponse])
+async def get_knowledge_list(
+    background_tasks: BackgroundTasks,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    user=Depends(get_verified_user),
+):
+    if user.role == "admin":
+        knowledge_bases = Knowledges.get_knowledge_bases(skip, limit)
+    else:
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "write", skip, limit
         )
-    return knowledge_with_files
+
+    return get_knowledge_bases_with_files(knowledge_bases, background_tasks)
 
 
 ############################
@@ -166,80 +188,62 @@ async def create_new_knowledge(
 ############################
 
 
-@router.post("/reindex", response_model=bool)
+@router.post("/reindex", response_model=Optional[ReindexJobResponse])
 async def reindex_knowledge_files(request: Request, user=Depends(get_verified_user)):
+    """
+    Start a background job that reindexes every knowledge base, or return the
+    one already running. Progress is sent as knowledge-events over the socket.
+    """
     if user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.UNAUTHORIZED,
         )
 
-    knowledge_bases = Knowledges.get_knowledge_bases()
+    job = ReindexJobs.get_active_job()
+    if job is None:
+        knowledge_bases = Knowledges.get_knowledge_bases()
+        job = ReindexJobs.insert_new_job(
+            user.id,
+            [
+                (
+                    knowledge_base.id,
+                    (
+                        len(knowledge_base.data.get("file_ids", []))
+                        if isinstance(knowledge_base.data, dict)
+                        else 0
+                    ),
+                )
+                for knowledge_base in knowledge_bases
+            ],
+        )
+        if job is None:
+            # Started by a concurrent request
+            job = ReindexJobs.get_active_job()
+            if job is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=ERROR_MESSAGES.DEFAULT("Failed to start reindexing"),
+                )
+        else:
+            log.info(
+                f"Starting reindex job {job.id} for {len(knowledge_bases)} knowledge bases"
+            )
+            reindex.wakeup.set()
 
-    log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
+    return ReindexJobs.get_job_progress(job)
 
-    deleted_knowledge_bases = []
 
-    for knowledge_base in knowledge_bases:
-        # -- Robust error handling for missing or invalid data
-        if not knowledge_base.data or not isinstance(knowledge_base.data, dict):
-            log.warning(
-                f"Knowledge base {knowledge_base.id} has no data or invalid data ({knowledge_base.data!r}). Deleting."
-            )
-            try:
-                Knowledges.delete_knowledge_by_id(id=knowledge_base.id)
-                deleted_knowledge_bases.append(knowledge_base.id)
-            except Exception as e:
-                log.error(
-                    f"Failed to delete invalid knowledge base {knowledge_base.id}: {e}"
-                )
-            continue
-
-        try:
-            file_ids = knowledge_base.data.get("file_ids", [])
-            files = Files.get_files_by_ids(file_ids)
-            try:
-                if VECTOR_DB_CLIENT.has_collection(collection_name=knowledge_base.id):
-                    VECTOR_DB_CLIENT.delete_collection(
-                        collection_name=knowledge_base.id
-                    )
-            except Exception as e:
-                log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
-                continue  # Skip, don't raise
-
-            failed_files = []
-            for file in files:
-                try:
-                    process_file(
-                        request,
-                        ProcessFileForm(
-                            file_id=file.id, collection_name=knowledge_base.id
-                        ),
-                        user=user,
-                    )
-                except Exception as e:
-                    log.error(
-                        f"Error processing file {file.filename} (ID: {file.id}): {str(e)}"
-                    )
-                    failed_files.append({"file_id": file.id, "error": str(e)})
-                    continue
-
-        except Exception as e:
-            log.error(f"Error processing knowledge base {knowledge_base.id}: {str(e)}")
-            # Don't raise, just continue
-            continue
-
-        if failed_files:
-            log.warning(
-                f"Failed to process {len(failed_files)} files in knowledge base {knowledge_base.id}"
-            )
-            for failed in failed_files:
-                log.warning(f"File ID: {failed['file_id']}, Error: {failed['error']}")
+@router.get("/reindex", response_model=Optional[ReindexJobResponse])
+async def get_reindex_job(user=Depends(get_verified_user)):
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.UNAUTHORIZED,
+        )
 
-    log.info(
-        f"Reindexing completed. Deleted {len(deleted_knowledge_bases)} invalid knowledge bases: {deleted_knowledge_bases}"
-    )
-    return True
+    job = ReindexJobs.get_latest_job()
+    return ReindexJobs.get_job_progress(job) if job else None
 
 
 ############################
@@ -451,6 +455,9 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    if BM25_INDEX is not None:
+        BM25_INDEX.delete(knowledge.id, filter={"file_id": form_data.file_id})
+    DocumentHashes.delete_hashes_by_file_id(knowledge.id, form_data.file_id)
 
     # Add content to the vector database
     try:
@@ -522,6 +529,9 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        if BM25_INDEX is not None:
+            BM25_INDEX.delete(knowledge.id, filter={"file_id": form_data.file_id})
+        DocumentHashes.delete_hashes_by_file_id(knowledge.id, form_data.file_id)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -532,6 +542,9 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+        if BM25_INDEX is not None:
+            BM25_INDEX.delete_collection(file_collection)
+        DocumentHashes.delete_hashes_by_collection_name(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -630,6 +643,9 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        if BM25_INDEX is not None:
+            BM25_INDEX.delete_collection(id)
+        DocumentHashes.delete_hashes_by_collection_name(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -663,6 +679,9 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        if BM25_INDEX is not None:
+            BM25_INDEX.delete_collection(id)
+        DocumentHashes.delete_hashes_by_collection_name(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -1,9 +1,15 @@
+import asyncio
+import csv
+import hashlib
+import io
 import json
 import logging
-import requests
 import os
-import shutil
-from typing import Optional, List
+import re
+import tempfile
+from typing import Optional, List, Tuple
+
+import aiofiles
 from fastapi import (
     APIRouter,
     Depends,
@@ -11,18 +17,28 @@ from fastapi import (
     Request,
     status,
     UploadFile,
-    File,
-    Form,
 )
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from open_webui.utils.auth import get_verified_user
 from open_webui.env import (
+    ENABLE_NOTION_ATTACHMENT_STORAGE,
+    NOTION_ATTACHMENT_MAX_FILE_SIZE,
+    NOTION_ATTACHMENT_MAX_REQUEST_SIZE,
     NOTION_INTEGRATION_TOKEN,
     NOTION_DB_ID,
+    NOTION_USER_SYNC_INTERVAL,
     OPENAI_API_KEY,
     STATIC_DIR,
 )
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.models.files import FileForm, Files
+from open_webui.storage.provider import Storage
+from open_webui.utils.notion import (
+    DEFAULT_PRIORITY_MAP,
+    get_notion_client,
+    notion_schema_cache,
+)
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -33,13 +49,18 @@ router = APIRouter()
 UPLOADS_DIR = STATIC_DIR / "uploads"
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+# Room for the form_data field and multipart framing in a feature request's
+# Content-Length, on top of its attachments
+FEATURE_REQUEST_FORM_OVERHEAD = 1024 * 1024
+
 from open_webui.notion_workspace_manager import NotionWorkspaceManager
 
 _workspace_manager = None
 
 
-def get_workspace_manager():
-    """Get or create the workspace manager instance"""
+async def get_workspace_manager():
+    """Get or create the workspace manager instance with its users loaded"""
     global _workspace_manager
     if _workspace_manager is None:
         import os
@@ -47,13 +68,33 @@ def get_workspace_manager():
         os.environ["NOTION_INTEGRATION_TOKEN2"] = NOTION_INTEGRATION_TOKEN
         os.environ["NOTION_DB_ID2"] = NOTION_DB_ID
         _workspace_manager = NotionWorkspaceManager()
+    await _workspace_manager.get_workspace_users()
     return _workspace_manager
 
 
-def get_notion_user_id(name):
+async def periodic_notion_user_sync(app):
+    """Keep the workspace users fresh without blocking requests"""
+    if (
+        not (NOTION_INTEGRATION_TOKEN and NOTION_DB_ID)
+        or NOTION_USER_SYNC_INTERVAL <= 0
+    ):
+        return
+
+    while True:
+        try:
+            manager = await get_workspace_manager()
+            await manager.sync_users(app.state.redis, NOTION_USER_SYNC_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Notion user sync failed: {e}")
+        await asyncio.sleep(min(60, NOTION_USER_SYNC_INTERVAL))
+
+
+async def get_notion_user_id(name):
     """Get Notion user ID by name using fuzzy matching"""
     try:
-        manager = get_workspace_manager()
+        manager = await get_workspace_manager()
         user_id = manager.get_user_id_by_name(name)
         if user_id:
             return user_id
@@ -74,6 +115,7 @@ class FeatureRequestForm(BaseModel):
     priority: str
     due_date: str
     reference_link: Optional[str] = None
+    created_by: Optional[str] = ""
     attachments: Optional[List[str]] = []
     attachment_urls: Optional[List[str]] = []
 
@@ -105,8 +147,8 @@ async def get_all_notion_users(request: Request, user=Depends(get_verified_user)
     Get all users from Notion workspace for dropdown/autocomplete
     """
     try:
-        manager = get_workspace_manager()
-        users = manager.get_all_users_for_dropdown()
+        manager = await get_workspace_manager()
+        users = await manager.get_all_users_for_dropdown()
         return {"users": users, "total": len(users)}
     except Exception as e:
         log.error(f"Error getting all users: {e}")
@@ -127,7 +169,7 @@ async def get_name_suggestions(
     Get AI-powered name suggestions for partial input
     """
     try:
-        manager = get_workspace_manager()
+        manager = await get_workspace_manager()
         suggestions = manager.get_name_suggestions(request.partial_name, request.limit)
 
         # Format suggestions for frontend
@@ -160,7 +202,7 @@ async def match_user_name(request: UserMatchRequest, user=Depends(get_verified_u
     Find exact user match and provide suggestions if not found
     """
     try:
-        manager = get_workspace_manager()
+        manager = await get_workspace_manager()
         matched_user = manager.find_user_by_name(request.name)
 
         if matched_user:
@@ -211,15 +253,181 @@ async def match_user_name(request: UserMatchRequest, user=Depends(get_verified_u
         )
 
 
+def prepare_feature_request(
+    form_data_dict: dict, priority_map: dict, attachments: List[dict]
+) -> dict:
+    """Normalize a submitted feature request into a Notion database entry"""
+    # Reference Link: handle empty string/list/null
+    ref_link = form_data_dict.get("reference_link")
+    if isinstance(ref_link, list):
+        ref_link_val = ref_link[0] if ref_link and ref_link[0].strip() else None
+    elif isinstance(ref_link, str):
+        ref_link_val = ref_link.strip() if ref_link.strip() else None
+    else:
+        ref_link_val = None
+
+    priority_value = form_data_dict["priority"]
+    mapped_priority = priority_map.get(priority_value, "Medium")
+    log.info(f"Mapped priority '{priority_value}' to '{mapped_priority}'")
+    return {
+        "title": form_data_dict["title"],
+        "type": form_data_dict["type"],
+        "description": form_data_dict["description"],
+        "module": form_data_dict["module"],
+        "owner": form_data_dict["owner"],
+        "created_by": form_data_dict.get("created_by") or "",
+        "priority": mapped_priority,
+        "due_date": form_data_dict["due_date"],
+        "client": form_data_dict["client"],
+        "reference_link": ref_link_val,
+        "attachments": attachments,
+    }
+
+
+async def get_priority_map(request: Request) -> dict:
+    """Priority mapping for Notion format, derived once per schema version"""
+    try:
+        schema = await notion_schema_cache.get(
+            get_notion_client(NOTION_INTEGRATION_TOKEN),
+            NOTION_DB_ID,
+            request.app.state.redis,
+        )
+        return schema["priority_map"]
+    except Exception as e:
+        log.error(f"Error fetching database schema: {e}")
+        return DEFAULT_PRIORITY_MAP
+
+
+class AttachmentTooLarge(Exception):
+    pass
+
+
+async def save_attachment(
+    request: Request, file: UploadFile, max_size: int, user
+) -> Tuple[dict, int]:
+    """
+    Stream an uploaded attachment to disk in chunks, hashing it on the way, and
+    store it under its SHA-256 so identical uploads share one copy. Returns the
+    attachment for Notion and its size in bytes.
+    """
+    name = os.path.basename(file.filename)
+    limit_message = (
+        f"Attachment '{name}' exceeds the upload limit "
+        f"({NOTION_ATTACHMENT_MAX_FILE_SIZE} MB per file, "
+        f"{NOTION_ATTACHMENT_MAX_REQUEST_SIZE} MB per request)"
+    )
+    if file.size is not None and file.size > max_size:
+        raise AttachmentTooLarge(limit_message)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOADS_DIR, suffix=".part")
+    os.close(fd)
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(ATTACHMENT_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise AttachmentTooLarge(limit_message)
+                sha256.update(chunk)
+                await f.write(chunk)
+
+        digest = sha256.hexdigest()
+        base_url = str(request.base_url).rstrip("/")
+        if ENABLE_NOTION_ATTACHMENT_STORAGE:
+            if Files.get_file_by_id(digest) is None:
+                await asyncio.to_thread(
+                    store_attachment, tmp_path, digest, name, file.content_type, user
+                )
+            else:
+                log.info(f"Reusing stored attachment {digest} for '{name}'")
+            url = f"{base_url}/api/v1/notion/attachments/{digest}"
+        else:
+            extension = re.sub(r"[^a-z0-9.]", "", os.path.splitext(name)[1].lower())
+            stored_name = f"{digest}{extension}"
+            if (UPLOADS_DIR / stored_name).exists():
+                log.info(f"Reusing uploaded attachment {stored_name} for '{name}'")
+            else:
+                os.replace(tmp_path, UPLOADS_DIR / stored_name)
+            url = f"{base_url}/static/uploads/{stored_name}"
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {"name": file.filename, "url": url}, size
+
+
+def store_attachment(
+    file_path: str, digest: str, name: str, content_type: Optional[str], user
+):
+    """Upload an attachment with the configured StorageProvider"""
+    with open(file_path, "rb") as f:
+        _, path = Storage.upload_file(
+            f,
+            f"{digest}_{name}",
+            {
+                "OpenWebUI-User-Email": user.email,
+                "OpenWebUI-User-Id": user.id,
+                "OpenWebUI-User-Name": user.name,
+                "OpenWebUI-File-Id": digest,
+            },
+        )
+
+    Files.insert_new_file(
+        user.id,
+        FileForm(
+            id=digest,
+            hash=digest,
+            filename=name,
+            path=path,
+            meta={
+                "name": name,
+                "content_type": content_type,
+                "size": os.path.getsize(file_path),
+                "source": "notion",
+            },
+        ),
+    )
+
+
+@router.get("/attachments/{id}")
+async def get_attachment(id: str):
+    """
+    Serve a feature-request attachment kept with the StorageProvider. Like the
+    static uploads folder, the links are readable by anyone Notion shares them
+    with.
+    """
+    file = Files.get_file_by_id(id)
+    if not file or (file.meta or {}).get("source") != "notion":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    file_path = Path(await asyncio.to_thread(Storage.get_file, file.path))
+    if not file_path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+    return FileResponse(
+        file_path,
+        filename=file.filename,
+        media_type=file.meta.get("content_type"),
+    )
+
+
 @router.post("/feature-request")
 async def create_feature_request(
     request: Request,
-    form_data: str = Form(...),
-    files: Optional[List[UploadFile]] = File(None),
     user=Depends(get_verified_user),
 ):
     """
-    Create a new feature request entry in Notion database with enhanced people property support
+    Create a new feature request entry in Notion database with enhanced people property support.
+
+    Sent as multipart form data: a `form_data` JSON field and `files`. The
+    form is parsed here rather than by FastAPI, so a body over the request
+    limit is refused from its Content-Length before it's received.
     """
     if not NOTION_INTEGRATION_TOKEN or not NOTION_DB_ID:
         raise HTTPException(
@@ -227,21 +435,42 @@ async def create_feature_request(
             detail="Notion integration not configured",
         )
 
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > (
+        NOTION_ATTACHMENT_MAX_REQUEST_SIZE * 1024 * 1024 + FEATURE_REQUEST_FORM_OVERHEAD
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                "Attachments exceed the upload limit "
+                f"({NOTION_ATTACHMENT_MAX_REQUEST_SIZE} MB per request)"
+            ),
+        )
+
+    form = await request.form()
+    form_data = form.get("form_data")
+    if not isinstance(form_data, str):
+        await form.close()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Missing 'form_data' field",
+        )
+    files = [file for file in form.getlist("files") if not isinstance(file, str)]
+
     try:
         form_data_dict = json.loads(form_data)
         uploaded_files = []
-        if files:
-            for file in files:
-                if file.filename:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    safe_filename = f"{timestamp}_{file.filename.replace(' ', '_')}"
-                    file_path = UPLOADS_DIR / safe_filename
-                    with open(file_path, "wb") as buffer:
-                        shutil.copyfileobj(file.file, buffer)
-                    base_url = str(request.base_url).rstrip("/")
-                    file_url = f"{base_url}/static/uploads/{safe_filename}"
-
-                    uploaded_files.append({"name": file.filename, "url": file_url})
+        remaining = NOTION_ATTACHMENT_MAX_REQUEST_SIZE * 1024 * 1024
+        for file in files:
+            if file.filename:
+                attachment, size = await save_attachment(
+                    request,
+                    file,
+                    min(NOTION_ATTACHMENT_MAX_FILE_SIZE * 1024 * 1024, remaining),
+                    user,
+                )
+                remaining -= size
+                uploaded_files.append(attachment)
 
         all_files = uploaded_files + [
             {"name": name, "url": url}
@@ -251,161 +480,14 @@ async def create_feature_request(
             )
         ]
 
-        now_iso = datetime.now(timezone.utc).isoformat()
-        # Reference Link: handle empty string/list/null
-        ref_link = form_data_dict["reference_link"]
-        if isinstance(ref_link, list):
-            ref_link_val = ref_link[0] if ref_link and ref_link[0].strip() else None
-        elif isinstance(ref_link, str):
-            ref_link_val = ref_link.strip() if ref_link.strip() else None
-        else:
-            ref_link_val = None
-
-        # Priority mapping for Notion format
-        priority_value = form_data_dict["priority"]
-        try:
-            headers = {
-                "Authorization": f"Bearer {NOTION_INTEGRATION_TOKEN}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28",
-            }
-
-            db_response = requests.get(
-                f"https://api.notion.com/v1/databases/{NOTION_DB_ID}", headers=headers
-            )
-
-            if db_response.status_code == 200:
-                database_info = db_response.json()
-                actual_priority_options = []
-
-                if (
-                    "properties" in database_info
-                    and "Priority" in database_info["properties"]
-                ):
-                    priority_prop = database_info["properties"]["Priority"]
-                    if (
-                        "select" in priority_prop
-                        and "options" in priority_prop["select"]
-                    ):
-                        actual_priority_options = [
-                            option["name"]
-                            for option in priority_prop["select"]["options"]
-                        ]
-                        log.info(
-                            f"Actual Notion priority options: {actual_priority_options}"
-                        )
-                if actual_priority_options:
-                    priority_map = {}
-                    if "Critical" in actual_priority_options:
-                        priority_map.update(
-                            {
-                                "0 - Critical": "Critical",
-                                "0": "Critical",
-                                "critical": "Critical",
-                                "Critical": "Critical",
-                            }
-                        )
-                    if "High" in actual_priority_options:
-                        priority_map.update(
-                            {
-                                "1 - High": "High",
-                                "1": "High",
-                                "high": "High",
-                                "High": "High",
-                            }
-                        )
-                    if "Medium" in actual_priority_options:
-                        priority_map.update(
-                            {
-                                "2 - Medium": "Medium",
-                                "2": "Medium",
-                                "medium": "Medium",
-                                "Medium": "Medium",
-                            }
-                        )
-                    if "Low" in actual_priority_options:
-                        priority_map.update(
-                            {"3 - Low": "Low", "3": "Low", "low": "Low", "Low": "Low"}
-                        )
-                else:
-                    # Fallback to default mapping
-                    priority_map = {
-                        "0 - Critical": "Critical",
-                        "1 - High": "High",
-                        "2 - Medium": "Medium",
-                        "3 - Low": "Low",
-                        "0": "Critical",
-                        "1": "High",
-                        "2": "Medium",
-                        "3": "Low",
-                        "critical": "Critical",
-                        "high": "High",
-                        "medium": "Medium",
-                        "low": "Low",
-                        "Critical": "Critical",
-                        "High": "High",
-                        "Medium": "Medium",
-                        "Low": "Low",
-                    }
-            else:
-                # Fallback to default mapping if can't fetch database schema
-                priority_map = {
-                    "0 - Critical": "Critical",
-                    "1 - High": "High",
-                    "2 - Medium": "Medium",
-                    "3 - Low": "Low",
-                    "0": "Critical",
-                    "1": "High",
-                    "2": "Medium",
-                    "3": "Low",
-                    "critical": "Critical",
-                    "high": "High",
-                    "medium": "Medium",
-                    "low": "Low",
-                    "Critical": "Critical",
-                    "High": "High",
-                    "Medium": "Medium",
-                    "Low": "Low",
-                }
-        except Exception as e:
-            log.error(f"Error fetching database schema: {e}")
-            priority_map = {
-                "0 - Critical": "Critical",
-                "1 - High": "High",
-                "2 - Medium": "Medium",
-                "3 - Low": "Low",
-                "0": "Critical",
-                "1": "High",
-                "2": "Medium",
-                "3": "Low",
-                "critical": "Critical",
-                "high": "High",
-                "medium": "Medium",
-                "low": "Low",
-                "Critical": "Critical",
-                "High": "High",
-                "Medium": "Medium",
-                "Low": "Low",
-            }
-
-        mapped_priority = priority_map.get(priority_value, "Medium")
-        log.info(f"Mapped priority '{priority_value}' to '{mapped_priority}'")
-        enhanced_form_data = {
-            "title": form_data_dict["title"],
-            "type": form_data_dict["type"],
-            "description": form_data_dict["description"],
-            "module": form_data_dict["module"],
-            "owner": form_data_dict["owner"],
-            "created_by": form_data_dict.get("created_by", ""),
-            "priority": mapped_priority,
-            "due_date": form_data_dict["due_date"],
-            "client": form_data_dict["client"],
-            "reference_link": ref_link_val,
-            "attachments": all_files,
-        }
+        priority_map = await get_priority_map(request)
+        enhanced_form_data = prepare_feature_request(
+            form_data_dict, priority_map, all_files
+        )
+        mapped_priority = enhanced_form_data["priority"]
 
-        manager = get_workspace_manager()
-        result = manager.create_database_entry(enhanced_form_data)
+        manager = await get_workspace_manager()
+        result = await manager.create_database_entry(enhanced_form_data)
 
         return {
             "success": True,
@@ -414,12 +496,160 @@ async def create_feature_request(
             "priority_mapped": mapped_priority,
         }
 
+    except AttachmentTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
     except Exception as e:
         log.error(f"Error creating feature request: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create feature request: {str(e)}",
         )
+    finally:
+        await form.close()
+
+
+BULK_MAX_ROWS = 1000
+
+
+def parse_bulk_rows(content: bytes, content_type: str) -> List[dict]:
+    """Read feature requests from a JSON list or a CSV with a header row"""
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+        rows = []
+        for row in reader:
+            row = {
+                key.strip().lower().replace(" ", "_"): (value or "").strip()
+                for key, value in row.items()
+                if key
+            }
+            # Multiple attachments share one cell, separated by semicolons
+            for key in ("attachments", "attachment_urls"):
+                if key in row:
+                    row[key] = [v.strip() for v in row[key].split(";") if v.strip()]
+            rows.append(row)
+        return rows
+
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON list of feature requests")
+    return data
+
+
+@router.post("/feature-requests/bulk")
+async def create_feature_requests_bulk(
+    request: Request,
+    user=Depends(get_verified_user),
+):
+    """
+    Create many feature requests from a JSON list or CSV, sent as the request
+    body or as a `file` upload. Pages are created concurrently within the
+    Notion rate limit and each row's result is streamed back as NDJSON.
+    """
+    if not NOTION_INTEGRATION_TOKEN or not NOTION_DB_ID:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Notion integration not configured",
+        )
+
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            file = form.get("file")
+            if file is None or isinstance(file, str):
+                raise ValueError("Missing 'file' upload")
+            content = await file.read()
+            content_type = (
+                "text/csv"
+                if (file.filename or "").lower().endswith(".csv")
+                else file.content_type or ""
+            )
+        else:
+            content = await request.body()
+        rows = parse_bulk_rows(content, content_type)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid feature request import: {e}",
+        )
+
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many feature requests, at most {BULK_MAX_ROWS} per import",
+        )
+
+    forms, results = {}, []
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            forms[row_number] = FeatureRequestForm.model_validate(row)
+        except ValidationError as e:
+            results.append(
+                {"row": row_number, "success": False, "error": str(e).strip()}
+            )
+
+    priority_map = await get_priority_map(request)
+    manager = await get_workspace_manager()
+    user_ids = manager.resolve_user_ids(
+        name for form in forms.values() for name in (form.owner, form.created_by)
+    )
+
+    async def create_row(row_number: int, form: FeatureRequestForm) -> dict:
+        try:
+            entry = prepare_feature_request(
+                form.model_dump(),
+                priority_map,
+                [
+                    {"name": name, "url": url}
+                    for name, url in zip(
+                        form.attachments or [], form.attachment_urls or []
+                    )
+                ],
+            )
+            result = await manager.create_database_entry(entry, user_ids)
+            return {
+                "row": row_number,
+                "success": True,
+                "page_id": result.get("id"),
+                "priority_mapped": entry["priority"],
+            }
+        except Exception as e:
+            log.error(f"Error creating feature request in row {row_number}: {e}")
+            return {"row": row_number, "success": False, "error": str(e)}
+
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(create_row(row_number, form))
+            for row_number, form in forms.items()
+        ]
+        try:
+            for result in results:
+                yield json.dumps(result) + "\n"
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                results.append(result)
+                yield json.dumps(result) + "\n"
+
+            created = sum(1 for result in results if result["success"])
+            yield json.dumps(
+                {
+                    "done": True,
+                    "total": len(rows),
+                    "created": created,
+                    "failed": len(rows) - created,
+                }
+            ) + "\n"
+        finally:
+            # The client went away: stop creating the remaining pages
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 
 @router.get("/config")
@@ -446,42 +676,19 @@ async def get_notion_database_schema(request: Request, user=Depends(get_verified
         )
 
     try:
-        headers = {
-            "Authorization": f"Bearer {NOTION_INTEGRATION_TOKEN}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28",
-        }
-
-        response = requests.get(
-            f"https://api.notion.com/v1/databases/{NOTION_DB_ID}", headers=headers
+        schema = await notion_schema_cache.get(
+            get_notion_client(NOTION_INTEGRATION_TOKEN),
+            NOTION_DB_ID,
+            request.app.state.redis,
         )
+        database_info = schema["schema"]
 
-        if response.status_code == 200:
-            database_info = response.json()
-            properties = {}
-            if "properties" in database_info:
-                for prop_name, prop_info in database_info["properties"].items():
-                    prop_type = list(prop_info.keys())[0] if prop_info else "unknown"
-                    properties[prop_name] = {
-                        "type": prop_type,
-                        "options": (
-                            prop_info.get(prop_type, {}).get("options", [])
-                            if prop_type == "select"
-                            else []
-                        ),
-                    }
-
-            return {
-                "database_id": NOTION_DB_ID,
-                "properties": properties,
-                "title": database_info.get("title", []),
-                "description": database_info.get("description", ""),
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to fetch database schema: {response.text}",
-            )
+        return {
+            "database_id": NOTION_DB_ID,
+            "properties": schema["properties"],
+            "title": database_info.get("title", []),
+            "description": database_info.get("description", ""),
+        }
     except Exception as e:
         log.error(f"Error fetching database schema: {e}")
         raise HTTPException(
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timezone
@@ -11,7 +12,6 @@ load_dotenv()
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
-import requests
 
 from notion_workspace_manager import NotionWorkspaceManager
 
@@ -89,7 +89,7 @@ async def get_workspace_users():
     """
     try:
         manager = get_workspace_manager()
-        users = manager.get_workspace_users()
+        users = await manager.get_workspace_users()
 
         return [
             WorkspaceUserResponse(
@@ -122,6 +122,7 @@ async def match_user_name(request: NameMatchRequest):
     """
     try:
         manager = get_workspace_manager()
+        await manager.get_workspace_users()
         user = manager.find_user_by_name(request.name)
 
         if user:
@@ -172,7 +173,7 @@ async def create_database_entry(request: FormDataRequest):
     try:
         manager = get_workspace_manager()
         form_data = request.model_dump()
-        result = manager.create_database_entry(form_data)
+        result = await manager.create_database_entry(form_data)
 
         return DatabaseEntryResponse(success=True, page_id=result.get("id"), error=None)
     except Exception as e:
@@ -181,7 +182,7 @@ async def create_database_entry(request: FormDataRequest):
 
 
 @router.get("/database-schema")
-async def get_database_schema():
+async def get_database_schema(request: Request):
     """
     Get the database schema to understand available properties and options.
 
@@ -190,7 +191,9 @@ async def get_database_schema():
     """
     try:
         manager = get_workspace_manager()
-        schema = manager.get_database_schema()
+        schema = await manager.get_database_schema(
+            getattr(request.app.state, "redis", None)
+        )
         return schema
     except Exception as e:
         logger.error(f"Error getting database schema: {e}")
@@ -215,7 +218,7 @@ async def health_check():
         manager = get_workspace_manager()
 
         # Test basic functionality
-        users = manager.get_workspace_users()
+        users = await manager.get_workspace_users()
 
         return {
             "status": "healthy",
@@ -235,11 +238,11 @@ async def health_check():
 
 
 # Example usage function
-def example_usage():
+async def example_usage():
     """Example of how to use the workspace manager programmatically."""
     try:
         manager = NotionWorkspaceManager()
-        users = manager.get_workspace_users()
+        users = await manager.get_workspace_users()
         print(f"Found {len(users)} users in workspace")
         test_name = "Dinesh"
         user = manager.find_user_by_name(test_name)
@@ -260,11 +263,11 @@ def example_usage():
             "reference_link": "https://example.com",
         }
 
-        result = manager.create_database_entry(form_data)
+        result = await manager.create_database_entry(form_data)
 
     except Exception as e:
         print(f"Error in example usage: {e}")
 
 
 if __name__ == "__main__":
-    example_usage()
+    asyncio.run(example_usage())
@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -36,7 +31,7 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 
 from open_webui.models.models import Models
@@ -50,6 +45,7 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.ollama_balancer import OLLAMA_BALANCER, Call
 
 
 from open_webui.config import (
@@ -62,6 +58,8 @@ from open_webui.env import (
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
     BYPASS_MODEL_ACCESS_CONTROL,
+    OLLAMA_PS_POLL_INTERVAL,
+    OLLAMA_ROUTING_STRATEGY,
 )
 from open_webui.constants import ERROR_MESSAGES
 
@@ -108,11 +106,14 @@ async def send_get_request(url, key=None, user: UserModel = None):
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
+    call: Optional[Call] = None,
 ):
     if response:
         response.close()
     if session:
         await session.close()
+    if call:
+        OLLAMA_BALANCER.finish(call)
 
 
 async def send_post_request(
@@ -122,9 +123,14 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    call: Optional[Call] = None,
 ):
-
+    """
+    POST `payload` to Ollama. `call` is the balancer's record of the request,
+    finished once the response (or its stream) is done.
+    """
     r = None
+    streaming = False
     try:
         session = aiohttp.ClientSession(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -149,6 +155,8 @@ async def send_post_request(
             },
             ssl=AIOHTTP_CLIENT_SESSION_SSL,
         )
+        if call:
+            OLLAMA_BALANCER.record(call, ok=r.ok)
 
         if r.ok is False:
             try:
@@ -172,12 +180,13 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, session=session, call=call
                 ),
             )
         else:
@@ -188,12 +197,70 @@ async def send_post_request(
     except HTTPException as e:
         raise e  # Re-raise HTTPException to be handled by FastAPI
     except Exception as e:
+        if call and r is None:
+            OLLAMA_BALANCER.fail(call)
         detail = f"Ollama: {e}"
 
         raise HTTPException(
             status_code=r.status if r else 500,
             detail=detail if e else "Open WebUI: Server Connection Error",
         )
+    finally:
+        if call and not streaming:
+            OLLAMA_BALANCER.finish(call)
+
+
+async def invalidate_models(response=None):
+    """
+    Drop the cached model list once `response` (e.g. a pull's progress
+    stream) has finished, or right away if it isn't streaming.
+    """
+    # Imported here, open_webui.utils.models imports this router
+    from open_webui.utils.models import MODEL_REGISTRY
+
+    if isinstance(response, StreamingResponse):
+        tasks = BackgroundTasks([response.background] if response.background else [])
+        tasks.add_task(MODEL_REGISTRY.invalidate)
+        response.background = tasks
+    else:
+        await MODEL_REGISTRY.invalidate()
+    return response
+
+
+def select_url_idx(request: Request, model: str) -> int:
+    """The URL index of OLLAMA_MODELS[model] the balancer picks for `model`"""
+    url_idxs = request.app.state.OLLAMA_MODELS[model].get("urls", [])
+    urls = [request.app.state.config.OLLAMA_BASE_URLS[idx] for idx in url_idxs]
+    return url_idxs[OLLAMA_BALANCER.select(model, urls)]
+
+
+async def periodic_ollama_ps_poll(app):
+    """Keep the balancer's view of the models loaded on each URL current"""
+    if OLLAMA_PS_POLL_INTERVAL <= 0 or OLLAMA_ROUTING_STRATEGY == "random":
+        return
+
+    while True:
+        try:
+            config = app.state.config
+            if config.ENABLE_OLLAMA_API and len(config.OLLAMA_BASE_URLS) > 1:
+                urls = []
+                for idx, url in enumerate(config.OLLAMA_BASE_URLS):
+                    api_config = config.OLLAMA_API_CONFIGS.get(
+                        str(idx),
+                        config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+                    )
+                    if api_config.get("enable", True):
+                        urls.append(
+                            (
+                                url,
+                                get_api_key(idx, url, config.OLLAMA_API_CONFIGS),
+                                api_config.get("prefix_id", None),
+                            )
+                        )
+                await OLLAMA_BALANCER.poll(urls)
+        except Exception as e:
+            log.exception(f"Failed to poll Ollama for loaded models: {e}")
+        await asyncio.sleep(OLLAMA_PS_POLL_INTERVAL)
 
 
 def get_api_key(idx, url, configs):
@@ -305,6 +372,7 @@ async def update_config(
         for key, value in request.app.state.config.OLLAMA_API_CONFIGS.items()
         if key in keys
     }
+    await invalidate_models()
 
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
@@ -715,11 +783,13 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data.model_dump(exclude_none=True), "insecure": True}
 
-    return await send_post_request(
-        url=f"{url}/api/pull",
-        payload=json.dumps(payload),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
-        user=user,
+    return await invalidate_models(
+        await send_post_request(
+            url=f"{url}/api/pull",
+            payload=json.dumps(payload),
+            key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+            user=user,
+        )
     )
 
 
@@ -779,11 +849,13 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
-        url=f"{url}/api/create",
-        payload=form_data.model_dump_json(exclude_none=True).encode(),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
-        user=user,
+    return await invalidate_models(
+        await send_post_request(
+            url=f"{url}/api/create",
+            payload=form_data.model_dump_json(exclude_none=True).encode(),
+            key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+            user=user,
+        )
     )
 
 
@@ -838,6 +910,7 @@ async def copy_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await invalidate_models()
         return True
     except Exception as e:
         log.exception(e)
@@ -903,6 +976,7 @@ async def delete_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await invalidate_models()
         return True
     except Exception as e:
         log.exception(e)
@@ -935,7 +1009,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    url_idx = select_url_idx(request, form_data.name)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -1009,7 +1083,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1096,7 +1170,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1189,7 +1263,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1202,6 +1276,10 @@ async def generate_completion(
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
     )
 
+    model = form_data.model
+    if ":" not in model:
+        model = f"{model}:latest"
+
     prefix_id = api_config.get("prefix_id", None)
     if prefix_id:
         form_data.model = form_data.model.replace(f"{prefix_id}.", "")
@@ -1211,6 +1289,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        call=OLLAMA_BALANCER.start(url, model),
     )
 
 
@@ -1256,7 +1335,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_url_idx(request, model)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1327,6 +1406,7 @@ async def generate_chat_completion(
         payload["model"] = f"{payload['model']}:latest"
 
     url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1343,6 +1423,7 @@ async def generate_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
+        call=OLLAMA_BALANCER.start(url, model),
     )
 
 
@@ -1430,6 +1511,7 @@ async def generate_openai_completion(
         payload["model"] = f"{payload['model']}:latest"
 
     url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1446,6 +1528,7 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        call=OLLAMA_BALANCER.start(url, model),
     )
 
 
@@ -1512,6 +1595,7 @@ async def generate_openai_chat_completion(
         payload["model"] = f"{payload['model']}:latest"
 
     url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    model = payload["model"]
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1527,6 +1611,7 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        call=OLLAMA_BALANCER.start(url, model),
     )
 
 
@@ -177,6 +177,11 @@ async def update_config(
         if key in keys
     }
 
+    # Imported here, open_webui.utils.models imports this router
+    from open_webui.utils.models import MODEL_REGISTRY
+
+    await MODEL_REGISTRY.invalidate()
+
     return {
         "ENABLE_OPENAI_API": request.app.state.config.ENABLE_OPENAI_API,
         "OPENAI_API_BASE_URLS": request.app.state.config.OPENAI_API_BASE_URLS,
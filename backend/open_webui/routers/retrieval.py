@@ -4,12 +4,14 @@ import mimetypes
 import os
 import shutil
 import asyncio
+import itertools
 
 
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -25,18 +27,21 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.document_hashes import DocumentHashes
 from open_webui.storage.provider import Storage
+from open_webui.socket.main import emit_to_user
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.text_splitter import TextSplitterPool, get_text_splitter
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -90,6 +95,10 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    RAG_INGEST_WINDOW_SIZE,
+    RAG_BATCH_PROCESSING_WORKERS,
+    RAG_TEXT_SPLITTER_WORKERS,
+    RAG_TEXT_SPLITTER_PROCESS_MIN_CHARS,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -106,6 +115,10 @@ from open_webui.constants import ERROR_MESSAGES
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+TEXT_SPLITTER_POOL = TextSplitterPool(
+    RAG_TEXT_SPLITTER_WORKERS, RAG_TEXT_SPLITTER_PROCESS_MIN_CHARS
+)
+
 ##########################################
 #
 # Utility functions
@@ -352,6 +365,7 @@ async def update_embedding_config(
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
                 else None
             ),
+            cache=EMBEDDING_CACHE,
         )
 
         return {
@@ -1096,6 +1110,133 @@ async def update_rag_config(
 ####################################
 
 
+def get_ingest_embedding_function(request: Request):
+    """The embedding function of the configured engine and model"""
+    return get_embedding_function(
+        request.app.state.config.RAG_EMBEDDING_ENGINE,
+        request.app.state.config.RAG_EMBEDDING_MODEL,
+        request.app.state.ef,
+        (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        ),
+        (
+            request.app.state.config.RAG_OPENAI_API_KEY
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_API_KEY
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
+            )
+        ),
+        request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+        azure_api_version=(
+            request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+            else None
+        ),
+    )
+
+
+def get_ingest_windows(
+    request: Request,
+    docs: list[Document],
+    split: bool = True,
+    progress_info: Optional[dict] = None,
+) -> Iterator[list[Document]]:
+    """
+    The chunks of `docs` (or `docs` themselves if `split` is False),
+    RAG_INGEST_WINDOW_SIZE at a time. progress_info["documents"] counts the
+    documents done.
+    """
+    if progress_info is None:
+        progress_info = {"documents": 0}
+
+    if split:
+        text_splitter_options = (
+            request.app.state.config.TEXT_SPLITTER,
+            request.app.state.config.CHUNK_SIZE,
+            request.app.state.config.CHUNK_OVERLAP,
+            request.app.state.config.TIKTOKEN_ENCODING_NAME,
+        )
+        # Fail on an invalid splitter or encoding before anything is written
+        get_text_splitter(*text_splitter_options)
+
+    def get_chunks():
+        # Documents are split one at a time, so only the chunks of the
+        # current window (and of the shards the splitter workers are ahead
+        # by) are held in memory
+        if not split:
+            for doc in docs:
+                progress_info["documents"] += 1
+                yield doc
+            return
+
+        for chunks in TEXT_SPLITTER_POOL.split(docs, text_splitter_options):
+            progress_info["documents"] += 1
+            yield from chunks
+
+    def get_windows():
+        window = []
+        for chunk in get_chunks():
+            window.append(chunk)
+            if len(window) >= RAG_INGEST_WINDOW_SIZE:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    return get_windows()
+
+
+def get_vector_items(
+    request: Request,
+    window: list[Document],
+    embeddings: list,
+    metadata: Optional[dict] = None,
+) -> list[dict]:
+    """Vector DB items for the chunks of `window` and their embeddings"""
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+
+    items = []
+    for idx, doc in enumerate(window):
+        item_metadata = {
+            **doc.metadata,
+            **(metadata if metadata else {}),
+            "embedding_config": embedding_config,
+        }
+
+        # ChromaDB does not like datetime formats
+        # for meta-data so convert them to string.
+        for key, value in item_metadata.items():
+            if (
+                isinstance(value, datetime)
+                or isinstance(value, list)
+                or isinstance(value, dict)
+            ):
+                item_metadata[key] = str(value)
+
+        items.append(
+            {
+                "id": str(uuid.uuid4()),
+                "text": doc.page_content,
+                "vector": embeddings[idx],
+                "metadata": item_metadata,
+            }
+        )
+    return items
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -1105,7 +1246,15 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    progress: Optional[Callable[[dict], None]] = None,
 ) -> bool:
+    """
+    Split, embed and insert documents into a collection. Documents are split
+    one at a time and their chunks are embedded and inserted
+    RAG_INGEST_WINDOW_SIZE at a time, calling `progress` after each window
+    with the documents and chunks done so far.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1128,141 +1277,129 @@ def save_docs_to_vector_db(
 
     # Check if entries with the same hash (metadata.hash) already exist
     if metadata and "hash" in metadata:
-        result = VECTOR_DB_CLIENT.query(
-            collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
-        )
-
-        if result is not None:
-            existing_doc_ids = result.ids[0]
-            if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
-
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-        docs = text_splitter.split_documents(docs)
-
-    if len(docs) == 0:
+        if DocumentHashes.has_hash(collection_name, metadata["hash"]):
+            log.info(f"Document with hash {metadata['hash']} already exists")
+            raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+    progress_info = {"documents": 0, "total": len(docs)}
+    windows = get_ingest_windows(request, docs, split, progress_info)
+    # Check for content before touching an existing collection
+    first_window = next(windows, None)
+    if first_window is None:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            ),
-        }
-        for doc in docs
-    ]
-
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
-
+    inserted_ids = []
+    new_collection = True
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                if BM25_INDEX is not None:
+                    BM25_INDEX.delete_collection(collection_name)
+                DocumentHashes.delete_hashes_by_collection_name(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
                     f"collection {collection_name} already exists, overwrite is False and add is False"
                 )
                 return True
+            else:
+                new_collection = False
 
         log.info(f"adding to collection {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_API_KEY
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
+        embedding_function = get_ingest_embedding_function(request)
+
+        for window in itertools.chain([first_window], windows):
+            embeddings = embedding_function(
+                list(map(lambda x: x.page_content.replace("\n", " "), window)),
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            )
+            if embeddings is None:
+                raise ValueError(
+                    ERROR_MESSAGES.DEFAULT("Failed to generate embeddings")
                 )
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
-        )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
+            items = get_vector_items(request, window, embeddings, metadata)
+            VECTOR_DB_CLIENT.insert(
+                collection_name=collection_name,
+                items=items,
+            )
+            inserted_ids.extend(item["id"] for item in items)
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+            if BM25_INDEX is not None:
+                # Existing indexes are always kept up to date, but new ones are
+                # only created while hybrid search is on; any collection without
+                # an index is backfilled on its first hybrid search instead
+                BM25_INDEX.add(
+                    collection_name,
+                    items,
+                    create=new_collection
+                    and request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                )
 
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+            if progress:
+                progress({**progress_info, "chunks": len(inserted_ids)})
 
+        if metadata and "hash" in metadata:
+            DocumentHashes.insert_hash(
+                collection_name, metadata["hash"], metadata.get("file_id")
+            )
         return True
     except Exception as e:
         log.exception(e)
+        if inserted_ids:
+            # Don't leave a partially ingested document behind
+            try:
+                if new_collection:
+                    VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                    if BM25_INDEX is not None:
+                        BM25_INDEX.delete_collection(collection_name)
+                else:
+                    VECTOR_DB_CLIENT.delete(
+                        collection_name=collection_name, ids=inserted_ids
+                    )
+                    if BM25_INDEX is not None:
+                        BM25_INDEX.delete(collection_name, ids=inserted_ids)
+            except Exception as cleanup_error:
+                log.error(f"Failed to clean up {collection_name}: {cleanup_error}")
         raise e
 
 
+def get_collection_file_docs(file: FileModel) -> list[Document]:
+    """
+    The documents of an already processed file to add to a collection: the
+    chunks of its file collection, or its saved content
+    """
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=f"file-{file.id}", filter={"file_id": file.id}
+    )
+
+    if result is not None and len(result.ids[0]) > 0:
+        return [
+            Document(
+                page_content=result.documents[0][idx],
+                metadata=result.metadatas[0][idx],
+            )
+            for idx, id in enumerate(result.ids[0])
+        ]
+
+    return [
+        Document(
+            page_content=file.data.get("content", ""),
+            metadata={
+                **file.meta,
+                "name": file.filename,
+                "created_by": file.user_id,
+                "file_id": file.id,
+                "source": file.filename,
+            },
+        )
+    ]
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1290,6 +1427,9 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                if BM25_INDEX is not None:
+                    BM25_INDEX.delete_collection(f"file-{file.id}")
+                DocumentHashes.delete_hashes_by_collection_name(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1312,31 +1452,13 @@ def process_file(
             # Check if the file has already been processed and save the content
             # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
 
-            result = VECTOR_DB_CLIENT.query(
-                collection_name=f"file-{file.id}", filter={"file_id": file.id}
-            )
+            # Files already in the collection are rejected before their
+            # chunks are fetched
+            if file.hash and DocumentHashes.has_hash(collection_name, file.hash):
+                log.info(f"File {file.id} already exists in {collection_name}")
+                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-            if result is not None and len(result.ids[0]) > 0:
-                docs = [
-                    Document(
-                        page_content=result.documents[0][idx],
-                        metadata=result.metadatas[0][idx],
-                    )
-                    for idx, id in enumerate(result.ids[0])
-                ]
-            else:
-                docs = [
-                    Document(
-                        page_content=file.data.get("content", ""),
-                        metadata={
-                            **file.meta,
-                            "name": file.filename,
-                            "created_by": file.user_id,
-                            "file_id": file.id,
-                            "source": file.filename,
-                        },
-                    )
-                ]
+            docs = get_collection_file_docs(file)
 
             text_content = file.data.get("content", "")
         else:
@@ -1427,6 +1549,21 @@ def process_file(
                     },
                     add=(True if form_data.collection_name else False),
                     user=user,
+                    progress=(
+                        (
+                            lambda data: emit_to_user(
+                                user.id,
+                                "file-events",
+                                {
+                                    "file_id": file.id,
+                                    "collection_name": collection_name,
+                                    "data": {"type": "process:progress", **data},
+                                },
+                            )
+                        )
+                        if user
+                        else None
+                    ),
                 )
 
                 if result:
@@ -1966,13 +2103,9 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
+                collection_result=None,
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -1991,7 +2124,6 @@ def query_doc_handler(
                     if form_data.hybrid_bm25_weight
                     else request.app.state.config.HYBRID_BM25_WEIGHT
                 ),
-                user=user,
             )
         else:
             return query_doc(
@@ -2088,8 +2220,11 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 
             VECTOR_DB_CLIENT.delete(
                 collection_name=form_data.collection_name,
-                metadata={"hash": hash},
+                filter={"hash": hash},
             )
+            if BM25_INDEX is not None:
+                BM25_INDEX.delete(form_data.collection_name, filter={"hash": hash})
+            DocumentHashes.delete_hash(form_data.collection_name, hash)
             return {"status": True}
         else:
             return {"status": False}
@@ -2101,6 +2236,9 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    if BM25_INDEX is not None:
+        BM25_INDEX.reset()
+    DocumentHashes.delete_all_hashes()
     Knowledges.delete_all_knowledge()
 
 
@@ -2162,69 +2300,100 @@ def process_files_batch(
 ) -> BatchProcessFilesResponse:
     """
     Process a batch of files and save them to the vector database.
+
+    Files are hashed and prepared on a worker pool, then embedded and saved
+    concurrently, each on its own so that one failing file doesn't fail the
+    batch. Their hash, content and collection are written back in one bulk
+    update at the end.
     """
     results: List[BatchProcessFilesResult] = []
     errors: List[BatchProcessFilesResult] = []
     collection_name = form_data.collection_name
 
-    # Prepare all documents first
-    all_docs: List[Document] = []
-    for file in form_data.files:
-        try:
-            text_content = file.data.get("content", "")
-
-            docs: List[Document] = [
-                Document(
-                    page_content=text_content.replace("<br/>", "\n"),
-                    metadata={
-                        **file.meta,
-                        "name": file.filename,
-                        "created_by": file.user_id,
-                        "file_id": file.id,
-                        "source": file.filename,
-                    },
-                )
-            ]
-
-            hash = calculate_sha256_string(text_content)
-            Files.update_file_hash_by_id(file.id, hash)
-            Files.update_file_data_by_id(file.id, {"content": text_content})
-
-            all_docs.extend(docs)
-            results.append(BatchProcessFilesResult(file_id=file.id, status="prepared"))
-
-        except Exception as e:
-            log.error(f"process_files_batch: Error processing file {file.id}: {str(e)}")
-            errors.append(
-                BatchProcessFilesResult(file_id=file.id, status="failed", error=str(e))
+    def prepare_file(file: FileModel) -> tuple[str, List[Document]]:
+        text_content = file.data.get("content", "")
+
+        docs: List[Document] = [
+            Document(
+                page_content=text_content.replace("<br/>", "\n"),
+                metadata={
+                    **file.meta,
+                    "name": file.filename,
+                    "created_by": file.user_id,
+                    "file_id": file.id,
+                    "source": file.filename,
+                },
             )
+        ]
+        return calculate_sha256_string(text_content), docs
 
-    # Save all documents in one batch
-    if all_docs:
+    def save_file(file: FileModel) -> Optional[str]:
         try:
             save_docs_to_vector_db(
                 request=request,
-                docs=all_docs,
+                docs=prepared[file.id],
                 collection_name=collection_name,
                 add=True,
                 user=user,
             )
-
-            # Update all files with collection name
-            for result in results:
-                Files.update_file_metadata_by_id(
-                    result.file_id, {"collection_name": collection_name}
-                )
-                result.status = "completed"
-
+            return None
         except Exception as e:
             log.error(
-                f"process_files_batch: Error saving documents to vector DB: {str(e)}"
+                f"process_files_batch: Error saving file {file.id} to vector DB: {str(e)}"
             )
-            for result in results:
-                result.status = "failed"
+            return str(e)
+
+    prepared: dict[str, List[Document]] = {}
+    updates: dict[str, dict] = {}
+    with ThreadPoolExecutor(
+        max_workers=max(RAG_BATCH_PROCESSING_WORKERS, 1)
+    ) as executor:
+        futures = [
+            (file, executor.submit(prepare_file, file)) for file in form_data.files
+        ]
+        for file, future in futures:
+            try:
+                hash, docs = future.result()
+                prepared[file.id] = docs
+                updates[file.id] = {
+                    "hash": hash,
+                    "data": {"content": file.data.get("content", "")},
+                }
+            except Exception as e:
+                log.error(
+                    f"process_files_batch: Error processing file {file.id}: {str(e)}"
+                )
                 errors.append(
-                    BatchProcessFilesResult(file_id=result.file_id, error=str(e))
+                    BatchProcessFilesResult(
+                        file_id=file.id, status="failed", error=str(e)
+                    )
                 )
 
+        files = [file for file in form_data.files if file.id in prepared]
+
+        # A failed save removes the collection if it created it, so files are
+        # saved one at a time until the collection exists
+        saved: dict[str, Optional[str]] = {}
+        while files and not VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        ):
+            file = files.pop(0)
+            saved[file.id] = save_file(file)
+        saved.update(zip([file.id for file in files], executor.map(save_file, files)))
+
+    for file_id, error in saved.items():
+        if error is None:
+            updates[file_id]["meta"] = {"collection_name": collection_name}
+            results.append(BatchProcessFilesResult(file_id=file_id, status="completed"))
+        else:
+            results.append(
+                BatchProcessFilesResult(file_id=file_id, status="failed", error=error)
+            )
+            errors.append(
+                BatchProcessFilesResult(file_id=file_id, status="failed", error=error)
+            )
+
+    if not Files.update_files_by_id(updates):
+        log.error(f"process_files_batch: Error updating files in {collection_name}")
+
     return BatchProcessFilesResponse(results=results, errors=errors)
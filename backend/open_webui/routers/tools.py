@@ -13,7 +13,14 @@ from open_webui.models.tools import (
     ToolUserResponse,
     Tools,
 )
-from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
+from open_webui.utils.plugin import (
+    TOOL_MODULES,
+    get_content_hash,
+    get_tool_module_from_cache,
+    invalidate_module,
+    load_tool_module_by_id,
+    replace_imports,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -221,11 +228,12 @@ async def create_new_tools(
             )
             form_data.meta.manifest = frontmatter
 
-            TOOLS = request.app.state.TOOLS
-            TOOLS[form_data.id] = tool_module
+            content_hash = get_content_hash(form_data.content)
+            TOOL_MODULES.set(form_data.id, content_hash, (tool_module, frontmatter))
 
-            specs = get_tool_specs(TOOLS[form_data.id])
+            specs = get_tool_specs(tool_module)
             tools = Tools.insert_new_tool(user.id, form_data, specs)
+            await invalidate_module(request, TOOL_MODULES, form_data.id, content_hash)
 
             tool_cache_dir = CACHE_DIR / "tools" / form_data.id
             tool_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -308,10 +316,10 @@ async def update_tools_by_id(
         tool_module, frontmatter = load_tool_module_by_id(id, content=form_data.content)
         form_data.meta.manifest = frontmatter
 
-        TOOLS = request.app.state.TOOLS
-        TOOLS[id] = tool_module
+        content_hash = get_content_hash(form_data.content)
+        TOOL_MODULES.set(id, content_hash, (tool_module, frontmatter))
 
-        specs = get_tool_specs(TOOLS[id])
+        specs = get_tool_specs(tool_module)
 
         updated = {
             **form_data.model_dump(exclude={"id"}),
@@ -322,6 +330,7 @@ async def update_tools_by_id(
         tools = Tools.update_tool_by_id(id, updated)
 
         if tools:
+            await invalidate_module(request, TOOL_MODULES, id, content_hash)
             return tools
         else:
             raise HTTPException(
@@ -364,9 +373,7 @@ async def delete_tools_by_id(
 
     result = Tools.delete_tool_by_id(id)
     if result:
-        TOOLS = request.app.state.TOOLS
-        if id in TOOLS:
-            del TOOLS[id]
+        await invalidate_module(request, TOOL_MODULES, id)
 
     return result
 
@@ -406,11 +413,7 @@ async def get_tools_valves_spec_by_id(
 ):
     tools = Tools.get_tool_by_id(id)
     if tools:
-        if id in request.app.state.TOOLS:
-            tools_module = request.app.state.TOOLS[id]
-        else:
-            tools_module, _ = load_tool_module_by_id(id)
-            request.app.state.TOOLS[id] = tools_module
+        tools_module, _ = get_tool_module_from_cache(request, id)
 
         if hasattr(tools_module, "Valves"):
             Valves = tools_module.Valves
@@ -449,11 +452,7 @@ async def update_tools_valves_by_id(
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
 
-    if id in request.app.state.TOOLS:
-        tools_module = request.app.state.TOOLS[id]
-    else:
-        tools_module, _ = load_tool_module_by_id(id)
-        request.app.state.TOOLS[id] = tools_module
+    tools_module, _ = get_tool_module_from_cache(request, id)
 
     if not hasattr(tools_module, "Valves"):
         raise HTTPException(
@@ -505,11 +504,7 @@ async def get_tools_user_valves_spec_by_id(
 ):
     tools = Tools.get_tool_by_id(id)
     if tools:
-        if id in request.app.state.TOOLS:
-            tools_module = request.app.state.TOOLS[id]
-        else:
-            tools_module, _ = load_tool_module_by_id(id)
-            request.app.state.TOOLS[id] = tools_module
+        tools_module, _ = get_tool_module_from_cache(request, id)
 
         if hasattr(tools_module, "UserValves"):
             UserValves = tools_module.UserValves
@@ -529,11 +524,7 @@ async def update_tools_user_valves_by_id(
     tools = Tools.get_tool_by_id(id)
 
     if tools:
-        if id in request.app.state.TOOLS:
-            tools_module = request.app.state.TOOLS[id]
-        else:
-            tools_module, _ = load_tool_module_by_id(id)
-            request.app.state.TOOLS[id] = tools_module
+        tools_module, _ = get_tool_module_from_cache(request, id)
 
         if hasattr(tools_module, "UserValves"):
             UserValves = tools_module.UserValves
@@ -8,6 +8,7 @@ from redis import asyncio as aioredis
 from open_webui.models.users import Users, UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
+from open_webui.utils.chat_persistence import chat_message_writer
 from open_webui.utils.redis import (
     get_sentinels_from_env,
     get_sentinel_url_from_env,
@@ -353,27 +354,16 @@ def get_event_emitter(request_info, update_db=True):
                 )
 
             if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
+                chat_message_writer.append_content(
                     request_info["chat_id"],
                     request_info["message_id"],
+                    event_data.get("data", {}).get("content", ""),
                 )
 
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
             if "type" in event_data and event_data["type"] == "replace":
                 content = event_data.get("data", {}).get("content", "")
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat_message_writer.update(
                     request_info["chat_id"],
                     request_info["message_id"],
                     {
@@ -401,3 +391,23 @@ def get_event_call(request_info):
 
 
 get_event_caller = get_event_call
+
+
+# The socket server's event loop, for emitting from sync code in worker threads
+EVENT_LOOP = None
+
+
+def set_event_loop(loop: asyncio.AbstractEventLoop):
+    global EVENT_LOOP
+    EVENT_LOOP = loop
+
+
+def emit_to_user(user_id: str, event: str, data: dict):
+    """Emit an event to every session of a user from any thread, without waiting"""
+    if EVENT_LOOP is None or not user_id:
+        return
+
+    for session_id in USER_POOL.get(user_id, []):
+        asyncio.run_coroutine_threadsafe(
+            sio.emit(event, data, to=session_id), EVENT_LOOP
+        )
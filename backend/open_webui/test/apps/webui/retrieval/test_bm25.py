@@ -0,0 +1,107 @@
+import random
+import threading
+
+import pytest
+from langchain_community.retrievers import BM25Retriever
+
+from open_webui.retrieval.bm25 import BM25Index, tokenize
+from open_webui.retrieval.vector.main import GetResult
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(0)
+    # Zipf-like word frequencies, so the most common words are in more than
+    # half of the documents and get the idf floor
+    words = [f"w{i}" for i in range(300)]
+    weights = [1 / (i + 1) for i in range(len(words))]
+    return (
+        [
+            " ".join([f"doc{i}", *rng.choices(words, weights, k=rng.randint(5, 60))])
+            for i in range(200)
+        ],
+        words,
+        rng,
+    )
+
+
+def test_search_matches_bm25_retriever(tmp_path, corpus):
+    texts, words, rng = corpus
+    index = BM25Index(str(tmp_path))
+    index.add(
+        "collection",
+        [
+            {"id": str(i), "text": text, "metadata": {"i": i}}
+            for i, text in enumerate(texts)
+        ],
+        create=True,
+    )
+    vectorizer = BM25Retriever.from_texts(texts).vectorizer
+
+    k = 10
+    for _ in range(50):
+        query = " ".join(rng.choices(words[:100], k=rng.randint(1, 4)))
+        scores = vectorizer.get_scores(tokenize(query))
+
+        docs = index.search("collection", query, k)
+
+        # Ties can be ordered either way, so the scores are compared
+        assert len(docs) == k
+        assert sorted(scores[doc.metadata["i"]] for doc in docs) == pytest.approx(
+            sorted(scores)[-k:]
+        )
+        found = [scores[doc.metadata["i"]] for doc in docs]
+        assert found == sorted(found, reverse=True)
+
+
+def test_search_fills_with_unmatched_documents(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add(
+        "collection",
+        [
+            {"id": "a", "text": "apple banana", "metadata": {}},
+            {"id": "b", "text": "cherry", "metadata": {}},
+            {"id": "c", "text": "date", "metadata": {}},
+        ],
+        create=True,
+    )
+
+    docs = index.search("collection", "banana", 2)
+    assert [doc.page_content for doc in docs] == ["apple banana", "cherry"]
+
+    docs = index.search("collection", "missing", 5)
+    assert [doc.page_content for doc in docs] == ["apple banana", "cherry", "date"]
+
+
+@pytest.mark.parametrize("create", [False, True])
+def test_writes_during_build_are_kept(tmp_path, create):
+    index = BM25Index(str(tmp_path))
+    fetched = threading.Event()
+    release = threading.Event()
+
+    def get_collection():
+        # Snapshot of the vector DB before the write below
+        fetched.set()
+        release.wait(5)
+        return GetResult(ids=[["a"]], documents=[["apple"]], metadatas=[[{}]])
+
+    build = threading.Thread(target=index.build, args=("collection", get_collection))
+    build.start()
+    fetched.wait(5)
+
+    write = threading.Thread(
+        target=index.add,
+        args=("collection", [{"id": "b", "text": "banana", "metadata": {}}]),
+        kwargs={"create": create},
+    )
+    write.start()
+    # The write waits for the build to publish its index
+    write.join(0.2)
+    assert write.is_alive()
+
+    release.set()
+    build.join(5)
+    write.join(5)
+
+    docs = index.search("collection", "apple banana", 5)
+    assert sorted(doc.page_content for doc in docs) == ["apple", "banana"]
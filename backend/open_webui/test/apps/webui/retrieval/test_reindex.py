@@ -0,0 +1,298 @@
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.models.knowledge_reindex import ReindexFileModel
+from open_webui.retrieval import reindex
+from open_webui.retrieval.vector.main import GetResult
+
+OLD_CONFIG = json.dumps({"engine": "", "model": "old"})
+NEW_CONFIG = json.dumps({"engine": "", "model": "new"})
+
+
+class VectorDB:
+    """In-memory vector DB that, like the real ones, fixes a dimension per collection"""
+
+    def __init__(self, fail_on_upsert=None):
+        self.collections = {}
+        self.upserts = 0
+        self.fail_on_upsert = fail_on_upsert
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def upsert(self, collection_name, items):
+        self.upserts += 1
+        if self.upserts == self.fail_on_upsert:
+            raise ConnectionError("Vector DB went away")
+
+        collection = self.collections.setdefault(collection_name, {})
+        dimensions = {len(item["vector"]) for item in collection.values()}
+        if dimensions and dimensions != {len(items[0]["vector"])}:
+            raise ValueError("Embedding dimension does not match the collection")
+        for item in items:
+            collection[item["id"]] = item
+
+    def query(self, collection_name, filter, limit=None):
+        items = [
+            item
+            for item in self.collections.get(collection_name, {}).values()
+            if all(item["metadata"].get(key) == value for key, value in filter.items())
+        ][:limit]
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+    def delete(self, collection_name, ids=None, filter=None):
+        collection = self.collections.get(collection_name, {})
+        for id in ids or []:
+            collection.pop(id, None)
+        if filter:
+            for id in self.query(collection_name, filter).ids[0]:
+                collection.pop(id)
+
+    def file_ids(self, collection_name):
+        """{chunk id: file id} of a collection"""
+        return {
+            id: item["metadata"]["file_id"]
+            for id, item in self.collections.get(collection_name, {}).items()
+        }
+
+
+class DocumentHashes:
+    def __init__(self):
+        self.hashes = {}
+
+    def insert_hash(self, collection_name, hash, file_id):
+        self.hashes[(collection_name, file_id)] = hash
+
+    def delete_hashes_by_file_id(self, collection_name, file_id):
+        self.hashes.pop((collection_name, file_id), None)
+
+    def delete_hashes_by_collection_name(self, collection_name):
+        for key in [key for key in self.hashes if key[0] == collection_name]:
+            del self.hashes[key]
+
+
+class ReindexJobs:
+    def __init__(self, checkpoints=None):
+        self.checkpoints = checkpoints or {}
+        self.statuses = {}
+
+    def update_knowledge_status(
+        self, job_id, knowledge_id, status, error=None, refilled=None
+    ):
+        previous = self.statuses.get(knowledge_id, {})
+        self.statuses[knowledge_id] = {
+            "status": status,
+            "error": error,
+            "refilled": refilled if refilled is not None else previous.get("refilled"),
+        }
+
+    def get_file_checkpoints(self, job_id, knowledge_id):
+        return {
+            file_id: ReindexFileModel(
+                job_id=job_id, knowledge_id=knowledge_id, file_id=file_id, status=status
+            )
+            for file_id, status in self.checkpoints.items()
+        }
+
+    def upsert_file_status(self, job_id, knowledge_id, file_id, status, **kwargs):
+        self.checkpoints[file_id] = status
+
+
+def item(id, file_id, hash, dimension=4, config=OLD_CONFIG):
+    return {
+        "id": id,
+        "text": f"{file_id} {id}",
+        "vector": [1.0] * dimension,
+        "metadata": {"file_id": file_id, "hash": hash, "embedding_config": config},
+    }
+
+
+def build(job_id, knowledge_id, file_id, items):
+    """Write a file's built chunks like reindex.build_file"""
+    path = reindex.get_file_path(job_id, knowledge_id, file_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for chunk in items:
+            f.write(json.dumps(chunk) + "\n")
+    with open(reindex.get_meta_path(path), "w") as f:
+        json.dump(
+            {
+                "hash": items[0]["metadata"]["hash"],
+                "ids": [chunk["id"] for chunk in items],
+                "embedding_config": items[0]["metadata"]["embedding_config"],
+            },
+            f,
+        )
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    vector_db = VectorDB()
+    hashes = DocumentHashes()
+    jobs = ReindexJobs()
+    knowledge_files = {"kb": ["f1", "f2", "f3"]}
+
+    monkeypatch.setattr(reindex, "REINDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(reindex, "VECTOR_DB_CLIENT", vector_db)
+    monkeypatch.setattr(reindex, "BM25_INDEX", None)
+    monkeypatch.setattr(reindex, "DocumentHashes", hashes)
+    monkeypatch.setattr(reindex, "ReindexJobs", jobs)
+    monkeypatch.setattr(
+        reindex,
+        "Knowledges",
+        SimpleNamespace(
+            get_knowledge_by_id=lambda id: (
+                SimpleNamespace(id=id, data={"file_ids": knowledge_files[id]})
+                if id in knowledge_files
+                else None
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        reindex,
+        "Files",
+        SimpleNamespace(update_file_metadata_by_id=lambda id, metadata: None),
+    )
+
+    # The live collection: one chunk per file, f3 added after the build
+    vector_db.upsert(
+        "kb",
+        [
+            item("old-1", "f1", "h1"),
+            item("old-2", "f2", "h2"),
+            item("old-3", "f3", "h3"),
+        ],
+    )
+    for file_id in ("f1", "f2", "f3"):
+        hashes.insert_hash("kb", f"h{file_id[1]}", file_id)
+
+    app = SimpleNamespace(
+        state=SimpleNamespace(config=SimpleNamespace(ENABLE_RAG_HYBRID_SEARCH=False))
+    )
+    return SimpleNamespace(
+        app=app,
+        request=SimpleNamespace(app=app),
+        vector_db=vector_db,
+        hashes=hashes,
+        jobs=jobs,
+        knowledge_files=knowledge_files,
+    )
+
+
+def test_swap_keeps_failed_and_new_files(env):
+    build("job", "kb", "f1", [item("new-1a", "f1", "h1"), item("new-1b", "f1", "h1")])
+
+    assert reindex.swap_collection(env.request, "job", "kb", ["f1"]) == []
+
+    assert env.vector_db.file_ids("kb") == {
+        "new-1a": "f1",
+        "new-1b": "f1",
+        "old-2": "f2",
+        "old-3": "f3",
+    }
+    assert env.hashes.hashes == {
+        ("kb", "f1"): "h1",
+        ("kb", "f2"): "h2",
+        ("kb", "f3"): "h3",
+    }
+
+
+def test_swap_removes_files_that_left_and_duplicates(env):
+    env.knowledge_files["kb"] = ["f1", "f2"]
+    build("job", "kb", "f1", [item("new-1", "f1", "h1")])
+    build("job", "kb", "f2", [item("new-2", "f2", "h1")])
+    build("job", "kb", "f3", [item("new-3", "f3", "h3")])
+
+    assert reindex.swap_collection(env.request, "job", "kb", ["f1", "f2", "f3"]) == [
+        "f2"
+    ]
+
+    assert env.vector_db.file_ids("kb") == {"new-1": "f1"}
+    assert env.hashes.hashes == {("kb", "f1"): "h1"}
+
+
+def test_swap_without_built_files_fails_and_keeps_collection(env):
+    env.jobs.checkpoints = {"f1": "failed", "f2": "failed"}
+    run = reindex.ReindexRun(
+        env.app, SimpleNamespace(id="job", user_id="user"), threading.Event()
+    )
+
+    run.swap("kb")
+
+    assert env.jobs.statuses["kb"]["status"] == "failed"
+    assert env.vector_db.file_ids("kb") == {
+        "old-1": "f1",
+        "old-2": "f2",
+        "old-3": "f3",
+    }
+    assert len(env.hashes.hashes) == 3
+
+
+def test_swap_refills_on_dimension_change(env):
+    build("job", "kb", "f1", [item("new-1", "f1", "h1", 8, NEW_CONFIG)])
+    env.jobs.checkpoints = {"f1": "done", "f2": "failed"}
+    run = reindex.ReindexRun(
+        env.app, SimpleNamespace(id="job", user_id="user"), threading.Event()
+    )
+
+    run.swap("kb")
+
+    assert env.jobs.statuses["kb"] == {
+        "status": "done",
+        "error": None,
+        "refilled": True,
+    }
+    assert env.vector_db.file_ids("kb") == {"new-1": "f1"}
+    assert env.hashes.hashes == {("kb", "f1"): "h1"}
+
+
+def test_swap_does_not_refill_for_the_same_model(env):
+    build("job", "kb", "f1", [item("new-1", "f1", "h1", 8)])
+
+    with pytest.raises(ValueError):
+        reindex.swap_collection(env.request, "job", "kb", ["f1"])
+
+    assert env.vector_db.file_ids("kb") == {
+        "old-1": "f1",
+        "old-2": "f2",
+        "old-3": "f3",
+    }
+
+
+@pytest.mark.parametrize("fail_on_upsert", [1, 2, 3, 4])
+def test_interrupted_swap_resumes(env, monkeypatch, fail_on_upsert):
+    monkeypatch.setattr(reindex, "RAG_INGEST_WINDOW_SIZE", 1)
+    build("job", "kb", "f1", [item("new-1a", "f1", "h1"), item("new-1b", "f1", "h1")])
+    build("job", "kb", "f2", [item("new-2", "f2", "h2")])
+    env.vector_db.upserts = 0
+    env.vector_db.fail_on_upsert = fail_on_upsert
+
+    with pytest.raises(ConnectionError):
+        reindex.swap_collection(env.request, "job", "kb", ["f1", "f2"])
+    # Files not swapped yet keep their chunks
+    assert "old-3" in env.vector_db.file_ids("kb")
+
+    reindex.swap_collection(env.request, "job", "kb", ["f1", "f2"])
+
+    assert env.vector_db.file_ids("kb") == {
+        "new-1a": "f1",
+        "new-1b": "f1",
+        "new-2": "f2",
+        "old-3": "f3",
+    }
+    assert env.hashes.hashes == {
+        ("kb", "f1"): "h1",
+        ("kb", "f2"): "h2",
+        ("kb", "f3"): "h3",
+    }
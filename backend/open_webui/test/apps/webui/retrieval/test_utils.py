@@ -0,0 +1,83 @@
+from open_webui.retrieval.utils import merge_and_sort_query_results
+
+
+def result(*documents):
+    """A query result list of (document, distance) pairs"""
+    return {
+        "documents": [[document for document, _ in documents]],
+        "distances": [[distance for _, distance in documents]],
+        "metadatas": [[{"source": document} for document, _ in documents]],
+    }
+
+
+def test_empty():
+    assert merge_and_sort_query_results([], k=3) == {
+        "distances": [[]],
+        "documents": [[]],
+        "metadatas": [[]],
+    }
+
+
+def test_single_query_ranks_by_distance_across_collections():
+    strong = result(("a1", 0.95), ("a2", 0.9), ("a3", 0.85))
+    weak = result(("b1", 0.3), ("b2", 0.2))
+
+    merged = merge_and_sort_query_results([weak, strong], k=4)
+
+    assert merged["documents"][0] == ["a1", "a2", "a3", "b1"]
+    assert merged["distances"][0] == [0.95, 0.9, 0.85, 0.3]
+    assert merged["metadatas"][0][0] == {"source": "a1"}
+
+
+def test_duplicates_keep_best_distance_and_its_metadata():
+    first = result(("a", 0.5), ("b", 0.4))
+    second = result(("b", 0.9), ("c", 0.1))
+    second["metadatas"][0][0] = {"source": "b", "collection": "second"}
+
+    merged = merge_and_sort_query_results([first, second], k=5)
+
+    assert merged["documents"][0] == ["b", "a", "c"]
+    assert merged["distances"][0] == [0.9, 0.5, 0.1]
+    assert merged["metadatas"][0][0] == {"source": "b", "collection": "second"}
+
+
+def test_ties_at_k_go_to_the_better_distance():
+    first = result(("a1", 0.99), ("a2", 0.95), ("a3", 0.88), ("a4", 0.5), ("a5", 0.4))
+    second = result(("b1", 0.3), ("b2", 0.25), ("b3", 0.18), ("b4", 0.1), ("b5", 0.05))
+
+    # a3 and b3 share a fused score, as the third result of their query
+    merged = merge_and_sort_query_results(
+        [first, second], k=5, queries=["first", "second"]
+    )
+
+    assert merged["documents"][0] == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_multiple_queries_fuse_ranks():
+    # c is never first, but every query finds it
+    results = [
+        result(("a", 0.9), ("c", 0.8)),
+        result(("b", 0.9), ("c", 0.8)),
+        result(("d", 0.9), ("c", 0.7)),
+    ]
+
+    merged = merge_and_sort_query_results(results, k=2, queries=["q1", "q2", "q3"])
+
+    assert merged["documents"][0] == ["c", "a"]
+    assert merged["distances"][0] == [0.8, 0.9]
+
+
+def test_multiple_queries_rank_each_query_across_collections():
+    # Per query, the strong collection's results outrank the weak one's
+    results = [
+        result(("a1", 0.9), ("a2", 0.85)),
+        result(("w1", 0.2)),
+        result(("a2", 0.9), ("a1", 0.8)),
+        result(("w2", 0.1)),
+    ]
+
+    merged = merge_and_sort_query_results(
+        results, k=3, queries=["q1", "q1", "q2", "q2"]
+    )
+
+    assert merged["documents"][0] == ["a1", "a2", "w1"]
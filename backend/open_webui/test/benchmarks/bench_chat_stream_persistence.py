@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark DB writes while a response streams into a long chat.
+
+A chat with --history earlier messages receives a --tokens token response,
+saved the way ENABLE_REALTIME_CHAT_SAVE and socket "message" events do:
+
+- before: every token rewrites the chat through
+  Chats.upsert_message_to_chat_by_id_and_message_id ("message" events also
+  read the message back first to append to it)
+- after:  every token goes through the write-behind ChatMessageWriter
+
+Bytes written are the statement parameters of every INSERT/UPDATE sent to
+the database. Point DATABASE_URL at another database to compare dialects.
+
+Usage (from backend/, with WEBUI_SECRET_KEY set as for the app):
+    python -m open_webui.test.benchmarks.bench_chat_stream_persistence [--tokens 500]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event
+
+from open_webui.internal.db import engine
+from open_webui.models.chats import ChatForm, Chats
+from open_webui.utils.chat_persistence import ChatMessageWriter
+
+
+class WriteCounter:
+    def __init__(self):
+        self.statements = 0
+        self.bytes = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("UPDATE", "INSERT")):
+            return
+        self.statements += 1
+        rows = parameters if executemany else [parameters]
+        for row in rows:
+            values = row.values() if isinstance(row, dict) else row
+            for value in values:
+                if isinstance(value, (str, bytes)):
+                    self.bytes += len(value)
+
+
+def create_chat(history: int) -> tuple:
+    messages = {}
+    parent = None
+    for i in range(history):
+        message_id = str(uuid.uuid4())
+        messages[message_id] = {
+            "id": message_id,
+            "parentId": parent,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Earlier message {i}. " + "lorem ipsum dolor sit amet " * 60,
+        }
+        parent = message_id
+
+    message_id = str(uuid.uuid4())
+    messages[message_id] = {
+        "id": message_id,
+        "parentId": parent,
+        "role": "assistant",
+        "content": "",
+    }
+    chat = Chats.insert_new_chat(
+        "bench-user",
+        ChatForm(
+            chat={
+                "title": "Benchmark",
+                "history": {"messages": messages, "currentId": message_id},
+            }
+        ),
+    )
+    return chat.id, message_id
+
+
+def tokens(count: int):
+    return [f"tok{i} " for i in range(count)]
+
+
+async def stream_before(chat_id, message_id, args):
+    content = ""
+    for token in tokens(args.tokens):
+        content += token
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            chat_id, message_id, {"content": content}
+        )
+        await asyncio.sleep(args.token_interval)
+
+    for token in tokens(args.events):
+        message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            chat_id, message_id, {"content": message.get("content", "") + token}
+        )
+        await asyncio.sleep(args.token_interval)
+
+
+async def stream_after(chat_id, message_id, args):
+    writer = ChatMessageWriter(interval=args.flush_interval)
+    content = ""
+    for token in tokens(args.tokens):
+        content += token
+        writer.update(chat_id, message_id, {"content": content})
+        await asyncio.sleep(args.token_interval)
+
+    for token in tokens(args.events):
+        writer.append_content(chat_id, message_id, token)
+        await asyncio.sleep(args.token_interval)
+    writer.finish(chat_id, message_id)
+
+
+def expected_content(args) -> str:
+    return "".join(tokens(args.tokens)) + "".join(tokens(args.events))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument(
+        "--events", type=int, default=100, help='"message" events after the stream'
+    )
+    parser.add_argument("--token-interval", type=float, default=0.005)
+    parser.add_argument("--flush-interval", type=float, default=0.25)
+    args = parser.parse_args()
+
+    print(
+        f"{engine.dialect.name}, {args.history} earlier messages, "
+        f"{args.tokens} tokens + {args.events} message events"
+    )
+    for label, stream in (("before", stream_before), ("after", stream_after)):
+        chat_id, message_id = create_chat(args.history)
+        counter = WriteCounter()
+        event.listen(engine, "before_cursor_execute", counter)
+        start = time.perf_counter()
+        try:
+            asyncio.run(stream(chat_id, message_id, args))
+        finally:
+            event.remove(engine, "before_cursor_execute", counter)
+        elapsed = time.perf_counter() - start
+
+        message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+        assert message["content"] == expected_content(args), "content differs"
+        Chats.delete_chat_by_id(chat_id)
+        print(
+            f"{label:<7} | {counter.statements:>5} writes | "
+            f"{counter.bytes / 1024 / 1024:9.2f} MiB written | {elapsed:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
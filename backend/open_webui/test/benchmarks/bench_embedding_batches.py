@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingestion-sized embedding calls against a stand-in OpenAI API.
+
+A mock /v1/embeddings endpoint runs on a local port in its own thread. Each
+request takes --latency seconds plus a per-text cost, the server works on at
+most --server-slots requests at a time, and every --rate-limit-every'th
+request is answered with 429. --chunks texts (a 5,000-page PDF split into
+chunks) are embedded:
+
+- before: one blocking requests.post per RAG_EMBEDDING_BATCH_SIZE batch, in
+  sequence, as save_docs_to_vector_db used to
+- after:  generate_embeddings with the same batch size, token-budgeted
+  batches sent concurrently over the pooled session
+
+Usage (from backend/, with WEBUI_SECRET_KEY set as for the app):
+    python -m open_webui.test.benchmarks.bench_embedding_batches [--chunks 5000]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+from open_webui.retrieval.utils import generate_embeddings
+
+
+def embed_text(text: str) -> list[float]:
+    return [float(len(text)), float(sum(map(ord, text)) % 997)]
+
+
+def start_mock_openai(port: int, args) -> dict:
+    stats = {"requests": 0, "rate_limited": 0}
+    slots = {}
+
+    async def embeddings(request):
+        body = await request.json()
+        stats["requests"] += 1
+        if args.rate_limit_every and stats["requests"] % args.rate_limit_every == 0:
+            stats["rate_limited"] += 1
+            raise web.HTTPTooManyRequests(headers={"Retry-After": "0.1"})
+
+        async with slots["semaphore"]:
+            await asyncio.sleep(args.latency + args.per_text * len(body["input"]))
+        return web.json_response(
+            {
+                "data": [
+                    {"index": i, "embedding": embed_text(text)}
+                    for i, text in enumerate(body["input"])
+                ]
+            }
+        )
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/embeddings", embeddings)
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        slots["semaphore"] = asyncio.Semaphore(args.server_slots)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    time.sleep(0.5)
+    return stats
+
+
+def embed_before(texts, url, batch_size):
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        for _ in range(5):
+            r = requests.post(
+                f"{url}/embeddings",
+                headers={"Content-Type": "application/json"},
+                json={"input": texts[i : i + batch_size], "model": "bench"},
+            )
+            if r.status_code == 429:
+                time.sleep(float(r.headers.get("Retry-After", "1")))
+                continue
+            r.raise_for_status()
+            embeddings.extend(elem["embedding"] for elem in r.json()["data"])
+            break
+    return embeddings
+
+
+def embed_after(texts, url, batch_size):
+    return generate_embeddings(
+        engine="openai",
+        model="bench",
+        text=texts,
+        url=url,
+        key="",
+        batch_size=batch_size,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--per-text", type=float, default=0.001)
+    parser.add_argument("--server-slots", type=int, default=8)
+    parser.add_argument("--rate-limit-every", type=int, default=25)
+    parser.add_argument("--port", type=int, default=18765)
+    args = parser.parse_args()
+
+    stats = start_mock_openai(args.port, args)
+    url = f"http://127.0.0.1:{args.port}/v1"
+    texts = [
+        f"chunk {i} " + "lorem ipsum dolor sit amet " * 40 for i in range(args.chunks)
+    ]
+    expected = [embed_text(text) for text in texts]
+
+    print(
+        f"{args.chunks} chunks, batch size {args.batch_size}, "
+        f"{args.latency * 1000:.0f} ms latency, {args.server_slots} server slots"
+    )
+    for label, embed in (("before", embed_before), ("after", embed_after)):
+        stats.update(requests=0, rate_limited=0)
+        start = time.perf_counter()
+        embeddings = embed(texts, url, args.batch_size)
+        elapsed = time.perf_counter() - start
+        assert embeddings == expected, "embeddings differ or are out of order"
+        print(
+            f"{label:<7} | {elapsed:7.2f}s | {args.chunks / elapsed:7.0f} chunks/s | "
+            f"{stats['requests']} requests, {stats['rate_limited']} rate limited"
+        )
+
+
+if __name__ == "__main__":
+    main()
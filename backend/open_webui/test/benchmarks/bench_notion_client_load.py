@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Load test: event loop latency while feature requests are filed to Notion.
+
+A mock Notion API runs on a local port in its own thread. A simulated chat
+stream emits a token every 20 ms on the worker's event loop while batches of
+feature requests (schema fetch + page creation) are filed either with the old
+blocking `requests` calls or through the shared async NotionClient. Token gap
+percentiles show how much the stream stalls.
+
+Usage (from backend/, with WEBUI_SECRET_KEY set as for the app):
+    python -m open_webui.test.benchmarks.bench_notion_client_load [--requests 30]
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+
+import requests
+from aiohttp import web
+
+from open_webui.utils.notion import NotionClient
+
+NOTION_LATENCY = 0.25
+TOKEN_INTERVAL = 0.02
+DATABASE_ID = "mock-database"
+
+
+def start_mock_notion(port: int, rate_limit_every: int) -> threading.Thread:
+    counter = {"requests": 0}
+
+    async def throttle():
+        counter["requests"] += 1
+        await asyncio.sleep(NOTION_LATENCY)
+        if rate_limit_every and counter["requests"] % rate_limit_every == 0:
+            raise web.HTTPTooManyRequests(headers={"Retry-After": "0.2"})
+
+    async def get_database(request):
+        await throttle()
+        return web.json_response(
+            {
+                "id": request.match_info["database_id"],
+                "properties": {
+                    "Priority": {
+                        "select": {
+                            "options": [
+                                {"name": "Critical"},
+                                {"name": "High"},
+                                {"name": "Medium"},
+                                {"name": "Low"},
+                            ]
+                        }
+                    }
+                },
+            }
+        )
+
+    async def create_page(request):
+        await request.json()
+        await throttle()
+        return web.json_response({"object": "page", "id": str(uuid.uuid4())})
+
+    app = web.Application()
+    app.router.add_get("/v1/databases/{database_id}", get_database)
+    app.router.add_post("/v1/pages", create_page)
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+async def chat_stream(stop: asyncio.Event) -> list:
+    gaps = []
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TOKEN_INTERVAL)
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+    return gaps
+
+
+async def file_blocking(base_url: str):
+    # The previous handler: synchronous requests inside an async endpoint
+    requests.get(f"{base_url}/databases/{DATABASE_ID}")
+    requests.post(
+        f"{base_url}/pages",
+        json={"parent": {"database_id": DATABASE_ID}, "properties": {}},
+    )
+
+
+async def file_async(client: NotionClient):
+    await client.get_database(DATABASE_ID)
+    await client.create_page({"parent": {"database_id": DATABASE_ID}, "properties": {}})
+
+
+async def measure(label: str, make_request, count: int):
+    stop = asyncio.Event()
+    stream = asyncio.create_task(chat_stream(stop))
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    if make_request:
+        await asyncio.gather(*(make_request() for _ in range(count)))
+    else:
+        await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    gaps = sorted(await stream)
+    p50 = statistics.median(gaps)
+    p99 = gaps[min(int(len(gaps) * 0.99), len(gaps) - 1)]
+    print(
+        f"{label:<10} | filed {count if make_request else 0:>4} in {elapsed:6.2f}s | "
+        f"token gap p50 {p50:7.1f} ms p99 {p99:8.1f} ms max {gaps[-1]:8.1f} ms"
+    )
+
+
+async def main_async(args):
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    client = NotionClient("mock-token", base_url=base_url)
+
+    await measure("idle", None, 0)
+    await measure("blocking", lambda: file_blocking(base_url), args.requests)
+    await measure("async", lambda: file_async(client), args.requests)
+    await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--port", type=int, default=18765)
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        default=10,
+        help="Answer every Nth mock request with 429 (0 disables)",
+    )
+    args = parser.parse_args()
+
+    start_mock_notion(args.port, args.rate_limit_every)
+    time.sleep(0.5)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
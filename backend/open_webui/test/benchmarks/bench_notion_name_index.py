@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark NameIndex against the full-scan name matching it replaced.
+
+Usage (from backend/):
+    python -m open_webui.test.benchmarks.bench_notion_name_index [--sizes 1000 10000]
+
+Every query is checked for identical results
+between the indexed and scanning implementations before timings are reported.
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import Dict, List
+
+from open_webui.notion_workspace_manager import (
+    MATCH_THRESHOLD,
+    NameIndex,
+    _match_score,
+    _suggestion_score,
+)
+
+FIRST_NAMES = [
+    "Aarav",
+    "Aditi",
+    "Akash",
+    "Amit",
+    "Ananya",
+    "Anupama",
+    "Arjun",
+    "Deepak",
+    "Dinesh",
+    "Divya",
+    "Gaurav",
+    "Ishaan",
+    "Kavya",
+    "Kiran",
+    "Lakshmi",
+    "Manoj",
+    "Meera",
+    "Neha",
+    "Nikhil",
+    "Pooja",
+    "Priya",
+    "Rahul",
+    "Rajesh",
+    "Ravi",
+    "Rohan",
+    "Sanjay",
+    "Shreya",
+    "Sneha",
+    "Suresh",
+    "Tanvi",
+    "Varun",
+    "Vikram",
+    "Alice",
+    "Bob",
+    "Carol",
+    "David",
+    "Emma",
+    "Frank",
+    "Grace",
+    "Henry",
+]
+LAST_NAMES = [
+    "Agarwal",
+    "Bhat",
+    "Chopra",
+    "Das",
+    "Gupta",
+    "Iyer",
+    "Jain",
+    "Kapoor",
+    "Kumar",
+    "Menon",
+    "Mehta",
+    "Nair",
+    "Patel",
+    "Rao",
+    "Reddy",
+    "Shah",
+    "Sharma",
+    "Singh",
+    "Verma",
+    "Smith",
+    "Johnson",
+    "Brown",
+    "Garcia",
+    "Miller",
+]
+
+
+def make_users(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        parts = [rng.choice(FIRST_NAMES)]
+        if rng.random() < 0.15:
+            parts.append(rng.choice(FIRST_NAMES))
+        if rng.random() < 0.95:
+            parts.append(rng.choice(LAST_NAMES))
+        # Unique suffixes keep the workspace from collapsing into a few names
+        parts[-1] += "".join(rng.choices(string.ascii_lowercase, k=rng.randint(0, 3)))
+        users.append(
+            {
+                "id": f"user-{i}",
+                "name": " ".join(parts),
+                "email": f"user{i}@example.com",
+                "type": "person",
+            }
+        )
+    return users
+
+
+def make_queries(users: List[Dict], count: int = 50, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(users)["name"].lower()
+        kind = rng.random()
+        if kind < 0.3:
+            # Typo: swap two adjacent characters
+            pos = rng.randrange(max(len(name) - 1, 1))
+            name = (
+                name[:pos]
+                + name[pos + 1 : pos + 2]
+                + name[pos : pos + 1]
+                + name[pos + 2 :]
+            )
+        elif kind < 0.6:
+            name = name[: rng.randint(1, min(len(name), 6))]
+        elif kind < 0.8:
+            name = name.split()[-1][:-1]
+        else:
+            name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        queries.append(name.strip())
+    return [query for query in queries if query]
+
+
+def build_mapping(users: List[Dict]) -> Dict[str, str]:
+    mapping = {}
+    for user in users:
+        name = user.get("name", "").strip()
+        if not name:
+            continue
+        mapping[name.lower()] = user["id"]
+        parts = name.split()
+        mapping[parts[0].lower()] = user["id"]
+        if len(parts) > 1:
+            mapping[parts[-1].lower()] = user["id"]
+        for part in parts[1:-1]:
+            mapping[part.lower()] = user["id"]
+        if len(parts) >= 2:
+            mapping[f"{parts[0].lower()} {parts[-1].lower()}"] = user["id"]
+            mapping["".join([p[0].lower() for p in parts if p])] = user["id"]
+    return mapping
+
+
+def scan_find(users: List[Dict], mapping: Dict[str, str], search_lower: str):
+    if search_lower in mapping:
+        return next((u for u in users if u["id"] == mapping[search_lower]), None)
+
+    best_match, best_score = None, 0.0
+    for user in users:
+        user_name = user.get("name", "").strip()
+        if not user_name:
+            continue
+        score = _match_score(search_lower, user_name)
+        if score >= 0.5 and score > best_score:
+            best_match, best_score = user, score
+    return best_match if best_score >= MATCH_THRESHOLD else None
+
+
+def scan_suggestions(users: List[Dict], partial_lower: str, limit: int = 5):
+    suggestions = []
+    for user in users:
+        user_name = user.get("name", "").strip()
+        if not user_name:
+            continue
+        score = _suggestion_score(partial_lower, user_name)
+        if score > 0.3:
+            suggestions.append((user["id"], score))
+    suggestions.sort(key=lambda x: x[1], reverse=True)
+    return suggestions[:limit]
+
+
+def index_find(index: NameIndex, mapping: Dict[str, str], search_lower: str):
+    if search_lower in mapping:
+        return index.users_by_id.get(mapping[search_lower])
+    return index.best_match(search_lower)[0]
+
+
+def index_suggestions(index: NameIndex, partial_lower: str, limit: int = 5):
+    return [
+        (index.users[idx]["id"], score)
+        for idx, score in index.suggestions(partial_lower, limit)
+    ]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(query) for query in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(size: int):
+    users = make_users(size)
+    mapping = build_mapping(users)
+    queries = make_queries(users)
+
+    start = time.perf_counter()
+    index = NameIndex(users)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    scan_matches, scan_find_ms = timed(lambda q: scan_find(users, mapping, q), queries)
+    index_matches, index_find_ms = timed(
+        lambda q: index_find(index, mapping, q), queries
+    )
+    assert scan_matches == index_matches, "find_user_by_name results differ"
+
+    scan_sugg, scan_sugg_ms = timed(lambda q: scan_suggestions(users, q), queries)
+    index_sugg, index_sugg_ms = timed(lambda q: index_suggestions(index, q), queries)
+    assert scan_sugg == index_sugg, "get_name_suggestions results differ"
+
+    print(
+        f"{size:>8} users | build {build_ms:8.1f} ms | "
+        f"find scan {scan_find_ms:9.2f} ms index {index_find_ms:7.2f} ms | "
+        f"suggest scan {scan_sugg_ms:9.2f} ms index {index_sugg_ms:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
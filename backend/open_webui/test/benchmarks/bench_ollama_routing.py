@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark Ollama URL selection against stand-in Ollama servers.
+
+One stand-in /api/chat and /api/ps server per --speeds entry runs on a local
+port in its own thread. Each works on at most --parallel requests at a time
+(OLLAMA_NUM_PARALLEL), keeps at most --max-loaded models in memory (least
+recently used is unloaded), takes --load-time seconds to load a model and
+streams --tokens tokens, all scaled by its speed factor (2 is twice as
+slow). --clients concurrent clients send --requests chat requests in total
+for --models models, the first ones more popular, through
+send_post_request with each routing strategy:
+
+- random:            random.choice, as get_ollama_url used to
+- least_outstanding: shortest expected wait, with /api/ps polls
+- power_of_two:      best of two random URLs and the best warm one
+
+Usage (from backend/, with WEBUI_SECRET_KEY set as for the app):
+    python -m open_webui.test.benchmarks.bench_ollama_routing [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from collections import OrderedDict
+
+from aiohttp import web
+
+from open_webui.routers.ollama import send_post_request
+from open_webui.utils.ollama_balancer import OLLAMA_BALANCER
+
+
+def start_stand_in(port: int, speed: float, args) -> dict:
+    state = {"loaded": OrderedDict(), "loads": 0}
+
+    async def chat(request):
+        body = await request.json()
+        model = body["model"]
+
+        async with state["slots"]:
+            loaded = state["loaded"]
+            if model in loaded:
+                loaded.move_to_end(model)
+            else:
+                # Loading a model waits for the running requests, as in Ollama
+                async with state["loading"]:
+                    await asyncio.sleep(args.load_time * speed)
+                state["loads"] += 1
+                loaded[model] = True
+                while len(loaded) > args.max_loaded:
+                    loaded.popitem(last=False)
+
+            response = web.StreamResponse(
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            await response.prepare(request)
+            for _ in range(args.tokens):
+                await asyncio.sleep(args.token_time * speed)
+                await response.write(
+                    json.dumps({"model": model, "done": False}).encode() + b"\n"
+                )
+            await response.write(json.dumps({"model": model, "done": True}).encode())
+            return response
+
+    async def ps(request):
+        return web.json_response(
+            {"models": [{"name": m, "model": m} for m in state["loaded"]]}
+        )
+
+    app = web.Application()
+    app.router.add_post("/api/chat", chat)
+    app.router.add_get("/api/ps", ps)
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        state["slots"] = asyncio.Semaphore(args.parallel)
+        state["loading"] = asyncio.Lock()
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    return state
+
+
+async def chat(url: str, model: str) -> float:
+    start = time.perf_counter()
+    response = await send_post_request(
+        url=f"{url}/api/chat",
+        payload=json.dumps({"model": model, "messages": [], "stream": True}),
+        content_type="application/x-ndjson",
+        call=OLLAMA_BALANCER.start(url, model),
+    )
+    async for _ in response.body_iterator:
+        pass
+    await response.background()
+    return time.perf_counter() - start
+
+
+async def run(strategy: str, urls: list[str], args) -> list[float]:
+    OLLAMA_BALANCER.strategy = strategy
+    OLLAMA_BALANCER.backends.clear()
+
+    rng = random.Random(0)
+    models = [f"model-{i}:latest" for i in range(args.models)]
+    weights = [1 / (i + 1) for i in range(args.models)]
+    queue = [rng.choices(models, weights)[0] for _ in range(args.requests)]
+    latencies = []
+
+    async def client():
+        while queue:
+            model = queue.pop()
+            url = urls[OLLAMA_BALANCER.select(model, urls)]
+            latencies.append(await chat(url, model))
+
+    async def poll():
+        while True:
+            await OLLAMA_BALANCER.poll([(url, None, None) for url in urls])
+            await asyncio.sleep(args.poll_interval)
+
+    poller = asyncio.create_task(poll()) if strategy != "random" else None
+    await asyncio.gather(*[client() for _ in range(args.clients)])
+    if poller:
+        poller.cancel()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--speeds", type=float, nargs="+", default=[1, 1, 2])
+    parser.add_argument("--parallel", type=int, default=2)
+    parser.add_argument("--max-loaded", type=int, default=2)
+    parser.add_argument("--load-time", type=float, default=1.0)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--token-time", type=float, default=0.01)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=18434)
+    args = parser.parse_args()
+
+    print(
+        f"{len(args.speeds)} URLs (speeds {args.speeds}), {args.models} models, "
+        f"{args.clients} clients, {args.requests} requests"
+    )
+    for strategy in ["random", "least_outstanding", "power_of_two"]:
+        # Fresh servers for each strategy, with no models loaded
+        urls = [f"http://127.0.0.1:{args.port + i}" for i in range(len(args.speeds))]
+        servers = [
+            start_stand_in(args.port + i, speed, args)
+            for i, speed in enumerate(args.speeds)
+        ]
+        time.sleep(0.5)
+
+        start = time.perf_counter()
+        latencies = asyncio.run(run(strategy, urls, args))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print(
+            f"{strategy:<17} | {elapsed:6.2f}s total | "
+            f"p50 {statistics.median(latencies):5.2f}s | "
+            f"p95 {latencies[int(len(latencies) * 0.95)]:5.2f}s | "
+            f"{sum(server['loads'] for server in servers):4d} model loads"
+        )
+        args.port += len(args.speeds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark the reranking and merging of a multi-query, multi-collection
+hybrid search.
+
+--queries x --collections result lists of --k documents each, drawn from a
+shared pool so the same chunks turn up for several queries, are:
+
+- compressed: RerankCompressor scores each list's documents against its
+  query with the embedding function (cosine similarity) and keeps the top
+  k, with a relevance threshold
+- merged: merge_and_sort_query_results combines every list into the top k
+
+before is the previous per-item implementation (Python lists of tuples,
+sentence-transformers' cos_sim swapped for per-row dot products so torch
+isn't needed), after is the NumPy one. Embeddings come from an in-memory
+table, as they would from a warm embedding cache.
+
+Usage (from backend/, with WEBUI_SECRET_KEY set as for the app):
+    python -m open_webui.test.benchmarks.bench_rerank_fusion [--queries 20]
+"""
+
+import argparse
+import hashlib
+import math
+import operator
+import random
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from open_webui.retrieval.utils import RerankCompressor, merge_and_sort_query_results
+
+
+def compress_before(documents, query, embedding_function, top_n, r_score):
+    query_embedding = embedding_function(query, None)
+    document_embedding = embedding_function(
+        [doc.page_content for doc in documents], None
+    )
+    query_norm = math.sqrt(sum(x * x for x in query_embedding))
+    scores = [
+        sum(q * d for q, d in zip(query_embedding, embedding))
+        / (query_norm * math.sqrt(sum(x * x for x in embedding)))
+        for embedding in document_embedding
+    ]
+
+    docs_with_scores = list(zip(documents, scores))
+    if r_score:
+        docs_with_scores = [(d, s) for d, s in docs_with_scores if s >= r_score]
+
+    result = sorted(docs_with_scores, key=operator.itemgetter(1), reverse=True)
+    final_results = []
+    for doc, doc_score in result[:top_n]:
+        metadata = doc.metadata
+        metadata["score"] = doc_score
+        final_results.append(Document(page_content=doc.page_content, metadata=metadata))
+    return final_results
+
+
+def merge_before(query_results, k):
+    combined = dict()
+    for data in query_results:
+        for distance, document, metadata in zip(
+            data["distances"][0], data["documents"][0], data["metadatas"][0]
+        ):
+            if isinstance(document, str):
+                doc_hash = hashlib.sha256(document.encode()).hexdigest()
+                if doc_hash not in combined.keys():
+                    combined[doc_hash] = (distance, document, metadata)
+                    continue
+                if distance > combined[doc_hash][0]:
+                    combined[doc_hash] = (distance, document, metadata)
+
+    combined = list(combined.values())
+    combined.sort(key=lambda x: x[0], reverse=True)
+    sorted_distances, sorted_documents, sorted_metadatas = (
+        zip(*combined[:k]) if combined else ([], [], [])
+    )
+    return {
+        "distances": [list(sorted_distances)],
+        "documents": [list(sorted_documents)],
+        "metadatas": [list(sorted_metadatas)],
+    }
+
+
+def compress_after(documents, query, embedding_function, top_n, r_score):
+    return RerankCompressor(
+        embedding_function=embedding_function,
+        top_n=top_n,
+        reranking_function=None,
+        r_score=r_score,
+    ).compress_documents(documents, query)
+
+
+def run(compress, merge, lists, embedding_function, k, r_score):
+    results = []
+    for query, documents in lists:
+        docs = compress(documents, query, embedding_function, k, r_score)
+        results.append(
+            {
+                "distances": [[doc.metadata["score"] for doc in docs]],
+                "documents": [[doc.page_content for doc in docs]],
+                "metadatas": [[doc.metadata for doc in docs]],
+            }
+        )
+    return merge(results, k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--collections", type=int, default=10)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--pool", type=int, default=3000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--r", type=float, default=0.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [f"chunk {i} " + "lorem ipsum " * 50 for i in range(args.pool)]
+    queries = [f"query {i}" for i in range(args.queries)]
+    table = {
+        text: [rng.gauss(0, 1) for _ in range(args.dimensions)]
+        for text in texts + queries
+    }
+
+    def embedding_function(query, prefix=None, user=None):
+        if isinstance(query, list):
+            return [table[text] for text in query]
+        return table[query]
+
+    def make_lists():
+        return [
+            (
+                query,
+                [
+                    Document(page_content=text, metadata={"source": text[:10]})
+                    for text in rng.sample(texts, args.k * 2)
+                ],
+            )
+            for query in queries
+            for _ in range(args.collections)
+        ]
+
+    print(
+        f"{args.queries} queries x {args.collections} collections, "
+        f"{args.k * 2} candidates -> k={args.k}, {args.dimensions} dimensions"
+    )
+    for label, compress, merge in (
+        ("before", compress_before, merge_before),
+        ("after", compress_after, merge_and_sort_query_results),
+    ):
+        rng.seed(1)
+        timings = []
+        for _ in range(args.rounds):
+            lists = make_lists()
+            start = time.perf_counter()
+            result = run(compress, merge, lists, embedding_function, args.k, args.r)
+            timings.append(time.perf_counter() - start)
+        assert len(result["documents"][0]) == args.k
+        print(
+            f"{label:<7} | {np.median(timings) * 1000:8.1f} ms median "
+            f"of {args.rounds}"
+        )
+
+
+if __name__ == "__main__":
+    main()
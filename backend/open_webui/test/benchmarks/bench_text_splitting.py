@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark splitting a large ingest in process and on the splitter pool.
+
+--pages documents of about --page-size characters (a large PDF, one
+document per page) are split with the given splitter:
+
+- before: in the request thread, one document at a time
+- after:  on a TextSplitterPool with each of --workers processes
+
+Every run's chunks, metadata and start_index are checked against the
+in-process result. The pool is started before timing, so worker start-up
+(and the per-worker splitter and tiktoken encoding) isn't counted.
+
+Usage (from backend/):
+    python -m open_webui.test.benchmarks.bench_text_splitting [--workers 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.text_splitter import (
+    TextSplitterPool,
+    get_text_splitter,
+    split_shard,
+)
+
+WORDS = (
+    "the quarterly revenue report shows growth across regions while operating "
+    "costs remained flat and the board approved additional investment in "
+    "research infrastructure support hiring and customer programs"
+).split()
+
+
+def make_pages(count: int, size: int) -> list[Document]:
+    rng = random.Random(0)
+    pages = []
+    for i in range(count):
+        paragraphs, length = [], 0
+        while length < size:
+            paragraph = " ".join(rng.choices(WORDS, k=rng.randint(20, 120))) + "."
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+        pages.append(
+            Document(page_content="\n\n".join(paragraphs), metadata={"page": i})
+        )
+    return pages
+
+
+def split_in_process(pages: list[Document], options: tuple) -> list[Document]:
+    text_splitter = get_text_splitter(*options)
+    return [chunk for page in pages for chunk in text_splitter.split_documents([page])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=4000)
+    parser.add_argument(
+        "--splitter", default="character", choices=["character", "token"]
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--encoding", default="cl100k_base")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    options = (args.splitter, args.chunk_size, args.chunk_overlap, args.encoding)
+    pages = make_pages(args.pages, args.page_size)
+    chars = sum(len(page.page_content) for page in pages)
+    print(
+        f"{args.pages} pages, {chars / 1e6:.1f}M characters, {args.splitter} "
+        f"splitter, {os.cpu_count()} cores"
+    )
+
+    start = time.perf_counter()
+    expected = split_in_process(pages, options)
+    baseline = time.perf_counter() - start
+    print(f"{'before':<10} | {baseline:7.2f}s | {len(expected)} chunks")
+
+    for workers in args.workers:
+        pool = TextSplitterPool(workers, min_chars=0)
+        # Start the workers and load their splitters
+        executor = pool._get_executor()
+        list(
+            executor.map(
+                split_shard, [[page] for page in pages[:workers]], [options] * workers
+            )
+        )
+
+        start = time.perf_counter()
+        chunks = [chunk for chunks in pool.split(pages, options) for chunk in chunks]
+        elapsed = time.perf_counter() - start
+        pool.close()
+
+        assert [(c.page_content, c.metadata) for c in chunks] == [
+            (c.page_content, c.metadata) for c in expected
+        ], "chunks differ from the in-process split"
+        print(
+            f"{f'{workers} workers':<10} | {elapsed:7.2f}s | "
+            f"{baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
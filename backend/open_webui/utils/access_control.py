@@ -1,11 +1,64 @@
-from typing import Optional, Union, List, Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Union, List, Dict, Any, Callable
 from open_webui.models.users import Users, UserModel
-from open_webui.models.groups import Groups
+from open_webui.models.groups import Groups, GroupModel
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
 import json
 
+# Group memberships looked up during the current request, see access_cache
+_access_cache: ContextVar[Optional[dict]] = ContextVar("access_cache", default=None)
+
+
+@contextmanager
+def access_cache():
+    """
+    Memoize group memberships for the duration of the block, so a list
+    endpoint that checks access to every item looks the user's groups up once.
+    The app wraps every request in one.
+    """
+    token = _access_cache.set({})
+    try:
+        yield
+    finally:
+        _access_cache.reset(token)
+
+
+def _memoize(key: tuple, load: Callable):
+    cache = _access_cache.get()
+    if cache is None:
+        return load()
+    if key not in cache:
+        cache[key] = load()
+    return cache[key]
+
+
+def get_user_groups(user_id: str) -> list[GroupModel]:
+    return _memoize(
+        ("groups", user_id), lambda: Groups.get_groups_by_member_id(user_id)
+    )
+
+
+def get_user_group_ids(user_id: str) -> set[str]:
+    return _memoize(
+        ("group_ids", user_id), lambda: Groups.get_group_ids_by_member_id(user_id)
+    )
+
+
+def get_group_user_ids(group_ids: list[str]) -> set[str]:
+    """Members of any of `group_ids`, loading the groups not yet seen at once"""
+    cache = _access_cache.get()
+    if cache is None:
+        cache = {}
+
+    missing = [id for id in group_ids if ("user_ids", id) not in cache]
+    for id, user_ids in Groups.get_user_ids_by_group_ids(missing).items():
+        cache[("user_ids", id)] = user_ids
+
+    return set().union(*(cache[("user_ids", id)] for id in group_ids))
+
 
 def fill_missing_permissions(
     permissions: Dict[str, Any], default_permissions: Dict[str, Any]
@@ -53,7 +106,7 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = get_user_groups(user_id)
 
     # Deep copy default permissions to avoid modifying the original dict
     permissions = json.loads(json.dumps(default_permissions))
@@ -93,7 +146,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = get_user_groups(user_id)
 
     for group in user_groups:
         group_permissions = group.permissions
@@ -115,14 +168,14 @@ def has_access(
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
+    if user_id in permitted_user_ids:
+        return True
+    return bool(permitted_group_ids) and not get_user_group_ids(user_id).isdisjoint(
+        permitted_group_ids
     )
 
 
@@ -138,10 +191,7 @@ def get_users_with_access(
     permitted_user_ids = permission_access.get("user_ids", [])
 
     user_ids_with_access = set(permitted_user_ids)
-
-    for group_id in permitted_group_ids:
-        group_user_ids = Groups.get_group_user_ids_by_id(group_id)
-        if group_user_ids:
-            user_ids_with_access.update(group_user_ids)
+    if permitted_group_ids:
+        user_ids_with_access.update(get_group_user_ids(permitted_group_ids))
 
     return Users.get_users_by_user_ids(list(user_ids_with_access))
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+DEFAULT_ARTIFACTS_CONFIG_PATH = Path("artifacts.json")
+
+
+def get_workspace_artifacts_config_path(workspace_id: str) -> Path:
+    return (
+        Path.home()
+        / ".local"
+        / "share"
+        / "open-webui"
+        / "data"
+        / "workspace"
+        / workspace_id
+        / "artifacts.json"
+    )
+
+
+####################################
+# Field validation
+####################################
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def _check_text(value) -> Optional[str]:
+    return None if isinstance(value, str) else "must be a string"
+
+
+def _check_number(value) -> Optional[str]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return "must be a number"
+    return None
+
+
+def _check_boolean(value) -> Optional[str]:
+    return None if isinstance(value, bool) else "must be true or false"
+
+
+def _check_date(value) -> Optional[str]:
+    try:
+        date.fromisoformat(str(value)[:10])
+        return None
+    except ValueError:
+        return "must be an ISO date"
+
+
+def _check_url(value) -> Optional[str]:
+    parsed = urlparse(value) if isinstance(value, str) else None
+    if parsed and parsed.scheme in ("http", "https") and parsed.netloc:
+        return None
+    return "must be an http(s) URL"
+
+
+def _check_options(options: List[str]) -> Callable:
+    allowed = frozenset(options)
+
+    def check(value) -> Optional[str]:
+        values = value if isinstance(value, list) else [value]
+        if all(v in allowed for v in values):
+            return None
+        return f"must be one of: {', '.join(options)}"
+
+    return check
+
+
+FIELD_TYPE_CHECKS = {
+    "text": _check_text,
+    "textarea": _check_text,
+    "number": _check_number,
+    "checkbox": _check_boolean,
+    "boolean": _check_boolean,
+    "date": _check_date,
+    "url": _check_url,
+}
+
+
+class ArtifactDataValidator:
+    """
+    Validates artifact `data` payloads against the field definitions of an
+    artifacts.json config. Fields stored in their own artifact columns are
+    skipped; the checks for the remaining fields are built once per config.
+    """
+
+    def __init__(self, fields: List[dict], column_fields: Tuple[str, ...] = ()):
+        self.checks: List[Tuple[str, str, bool, Optional[Callable]]] = []
+        for field in fields:
+            key = field.get("key")
+            if not key or key in column_fields:
+                continue
+
+            if field.get("options"):
+                check = _check_options(field["options"])
+            else:
+                check = FIELD_TYPE_CHECKS.get(field.get("type"))
+            self.checks.append(
+                (key, field.get("name", key), bool(field.get("required")), check)
+            )
+
+    def validate(self, data: Optional[dict]) -> List[str]:
+        data = data or {}
+        errors = []
+        for key, name, required, check in self.checks:
+            value = data.get(key)
+            if _is_empty(value):
+                if required:
+                    errors.append(f"{name} is required")
+                continue
+            if check is not None:
+                error = check(value)
+                if error:
+                    errors.append(f"{name} {error}")
+        return errors
+
+
+####################################
+# Config cache
+####################################
+
+
+class ArtifactsConfigCache:
+    """
+    Parsed artifacts.json configs and their validators.
+
+    A workspace uses its own artifacts.json if it has one and the project
+    root's otherwise. Entries are keyed by file path, so workspaces without
+    their own config share one. Each lookup only stats the candidate files; a
+    config is re-read when its mtime or size changes. If a changed file cannot
+    be parsed (e.g. it is being written), the last good config is kept.
+    """
+
+    def __init__(self, column_fields: Tuple[str, ...] = ()):
+        self.column_fields = column_fields
+        self._entries: Dict[Path, dict] = {}
+        self._empty = self._build(None, None, {"fields": []})
+
+    def _resolve(self, workspace_id: Optional[str]) -> Optional[Tuple[Path, tuple]]:
+        paths = [DEFAULT_ARTIFACTS_CONFIG_PATH]
+        if workspace_id:
+            paths.insert(0, get_workspace_artifacts_config_path(workspace_id))
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            return path, (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def get(self, workspace_id: Optional[str] = None) -> dict:
+        """Returns {"path", "version", "config", "validator"} for the workspace"""
+        resolved = self._resolve(workspace_id)
+        if resolved is None:
+            return self._empty
+
+        path, version = resolved
+        entry = self._entries.get(path)
+        if entry and entry["version"] == version:
+            return entry
+
+        try:
+            with open(path, "r") as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            if entry:
+                log.warning(
+                    f"Keeping previous artifacts config, {path} is invalid: {e}"
+                )
+                return entry
+            raise
+
+        log.info(f"Loaded artifacts config {path}")
+        entry = self._build(path, version, config)
+        self._entries[path] = entry
+        return entry
+
+    def _build(
+        self, path: Optional[Path], version: Optional[tuple], config: dict
+    ) -> dict:
+        return {
+            "path": path,
+            "version": version,
+            "config": config,
+            "validator": ArtifactDataValidator(
+                config.get("fields", []), self.column_fields
+            ),
+        }
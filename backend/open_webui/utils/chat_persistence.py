@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    CHAT_SAVE_FLUSH_INTERVAL,
+    CHAT_SAVE_FLUSH_SIZE,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Known message content is forgotten after this long without updates (seconds)
+CONTENT_IDLE_TIMEOUT = 300
+
+
+class ChatMessageWriter:
+    """
+    Write-behind persistence for messages that are updated while they stream.
+
+    Updates are merged per message in memory and written at most every
+    `interval` seconds, as soon as `max_size` bytes are buffered, and when the
+    stream calls `finish`. Content that only grows is written as the appended
+    suffix, so a flush sends the delta since the last write rather than the
+    whole message, and Chats patches it into the chat JSON in place where the
+    database supports it.
+    """
+
+    def __init__(
+        self,
+        interval: float = CHAT_SAVE_FLUSH_INTERVAL,
+        max_size: int = CHAT_SAVE_FLUSH_SIZE,
+    ):
+        self.interval = interval
+        self.max_size = max_size
+
+        # (chat_id, message_id) -> {"fields", "append", "size", "timer"}
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        # Full message content as of the last update, when it is known
+        self._content: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def _get_pending(self, key: Tuple[str, str]) -> dict:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = {"fields": {}, "append": "", "size": 0, "timer": None}
+            self._pending[key] = pending
+
+            try:
+                loop = asyncio.get_running_loop()
+                pending["timer"] = loop.call_later(self.interval, self.flush, *key)
+            except RuntimeError:
+                pass
+        return pending
+
+    def _buffered(self, key: Tuple[str, str], pending: dict, size: int):
+        pending["size"] += size
+        if (
+            pending["timer"] is None
+            or self.interval == 0
+            or pending["size"] >= self.max_size
+        ):
+            self.flush(*key)
+
+    def update(self, chat_id: str, message_id: str, fields: dict):
+        """Set message fields; a content update that extends the known content is stored as a delta"""
+        key = (chat_id, message_id)
+        pending = self._get_pending(key)
+        fields = dict(fields)
+        size = 0
+
+        if "content" in fields and isinstance(fields["content"], str):
+            content = fields["content"]
+            known = self._content.get(key)
+            persisted = (
+                known[0][: len(known[0]) - len(pending["append"])]
+                if known and "content" not in pending["fields"]
+                else None
+            )
+
+            if persisted is not None and content.startswith(persisted):
+                del fields["content"]
+                size += len(content) - len(persisted) - len(pending["append"])
+                pending["append"] = content[len(persisted) :]
+            else:
+                pending["append"] = ""
+                size += len(content)
+            self._content[key] = (content, time.monotonic())
+
+        pending["fields"].update(fields)
+        for value in fields.values():
+            size += len(value) if isinstance(value, str) else len(json.dumps(value))
+        self._buffered(key, pending, max(size, 0))
+
+    def append_content(self, chat_id: str, message_id: str, content: str):
+        """Append to the message content without reading it first"""
+        key = (chat_id, message_id)
+        pending = self._get_pending(key)
+        if "content" in pending["fields"]:
+            pending["fields"]["content"] += content
+        else:
+            pending["append"] += content
+
+        known = self._content.get(key)
+        if known:
+            self._content[key] = (known[0] + content, time.monotonic())
+        self._buffered(key, pending, len(content))
+
+    def flush(self, chat_id: str, message_id: str):
+        key = (chat_id, message_id)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending["timer"] is not None:
+            pending["timer"].cancel()
+
+        if pending["fields"] or pending["append"]:
+            try:
+                Chats.update_message_fields_by_id_and_message_id(
+                    chat_id, message_id, pending["fields"], pending["append"]
+                )
+            except Exception as e:
+                log.exception(f"Failed to save message {message_id}: {e}")
+                self._content.pop(key, None)
+
+        now = time.monotonic()
+        for stale in [
+            k for k, (_, at) in self._content.items() if now - at > CONTENT_IDLE_TIMEOUT
+        ]:
+            del self._content[stale]
+
+    def finish(self, chat_id: str, message_id: str):
+        """Write everything buffered for a message once its stream is over"""
+        self.flush(chat_id, message_id)
+        self._content.pop((chat_id, message_id), None)
+
+
+chat_message_writer = ChatMessageWriter()
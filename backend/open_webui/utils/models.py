@@ -1,7 +1,10 @@
 import time
+import json
 import logging
 import asyncio
 import sys
+import uuid
+from typing import Optional
 
 from aiocache import cached
 from fastapi import Request
@@ -25,8 +28,14 @@ from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    GLOBAL_LOG_LEVEL,
+    MODELS_CACHE_TTL,
+    SRC_LOG_LEVELS,
+)
 from open_webui.models.users import UserModel
+from open_webui.utils.redis import release_lock
 
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
@@ -76,7 +85,7 @@ async def get_all_base_models(request: Request, user: UserModel = None):
     return function_models + openai_models + ollama_models
 
 
-async def get_all_models(request, user: UserModel = None):
+async def build_all_models(request, user: UserModel = None):
     models = await get_all_base_models(request, user=user)
 
     # If there are no models, return an empty list
@@ -121,69 +130,72 @@ async def get_all_models(request, user: UserModel = None):
     global_action_ids = [
         function.id for function in Functions.get_global_action_functions()
     ]
-    enabled_action_ids = [
+    enabled_action_ids = {
         function.id
         for function in Functions.get_functions_by_type("action", active_only=True)
-    ]
+    }
 
     global_filter_ids = [
         function.id for function in Functions.get_global_filter_functions()
     ]
-    enabled_filter_ids = [
+    enabled_filter_ids = {
         function.id
         for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
-
+    }
+
+    # Index the base models by id, and by name without the tag since Ollama
+    # may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
+    models_by_id = {}
+    models_by_name = {}
+    for idx, model in enumerate(models):
+        models_by_id.setdefault(model["id"], []).append(idx)
+        models_by_name.setdefault(model["id"].split(":")[0], []).append(idx)
+    model_ids = set(models_by_id)
+
+    removed = set()
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
-            for model in models:
-                if custom_model.id == model["id"] or (
-                    model.get("owned_by") == "ollama"
-                    and custom_model.id
-                    == model["id"].split(":")[
-                        0
-                    ]  # Ollama may return model ids in different formats (e.g., 'llama3' vs. 'llama3:7b')
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        # Set action_ids and filter_ids
-                        action_ids = []
-                        filter_ids = []
-
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-                            filter_ids.extend(
-                                model["info"]["meta"].get("filterIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                        model["filter_ids"] = filter_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
-        ):
+            matches = models_by_id.get(custom_model.id, []) + [
+                idx
+                for idx in models_by_name.get(custom_model.id, [])
+                if models[idx].get("owned_by") == "ollama"
+            ]
+            for idx in dict.fromkeys(matches):
+                model = models[idx]
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    # Set action_ids and filter_ids
+                    action_ids = []
+                    filter_ids = []
+
+                    if "info" in model and "meta" in model["info"]:
+                        action_ids.extend(model["info"]["meta"].get("actionIds", []))
+                        filter_ids.extend(model["info"]["meta"].get("filterIds", []))
+
+                    model["action_ids"] = action_ids
+                    model["filter_ids"] = filter_ids
+                else:
+                    removed.add(idx)
+
+        elif custom_model.is_active and (custom_model.id not in model_ids):
             owned_by = "openai"
             pipe = None
 
             action_ids = []
             filter_ids = []
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+            # The first model that is the base model, with or without its tag
+            candidates = models_by_id.get(custom_model.base_model_id, [])[:1] + (
+                models_by_name.get(custom_model.base_model_id, [])[:1]
+            )
+            if candidates:
+                model = models[min(candidates)]
+                owned_by = model.get("owned_by", "unknown owner")
+                if "pipe" in model:
+                    pipe = model["pipe"]
 
             if custom_model.meta:
                 meta = custom_model.meta.model_dump()
@@ -208,6 +220,10 @@ async def get_all_models(request, user: UserModel = None):
                     "filter_ids": filter_ids,
                 }
             )
+            model_ids.add(custom_model.id)
+
+    if removed:
+        models = [model for idx, model in enumerate(models) if idx not in removed]
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -253,9 +269,19 @@ async def get_all_models(request, user: UserModel = None):
             }
         ]
 
-    def get_function_module_by_id(function_id):
-        function_module, _, _ = get_function_module_from_cache(request, function_id)
-        return function_module
+    # Each action and filter is loaded once, however many models use it
+    functions = {}
+
+    def get_function_by_id(function_id):
+        if function_id not in functions:
+            function = Functions.get_function_by_id(function_id)
+            function_module = None
+            if function is not None:
+                function_module, _, _ = get_function_module_from_cache(
+                    request, function_id
+                )
+            functions[function_id] = (function, function_module)
+        return functions[function_id]
 
     for model in models:
         action_ids = [
@@ -271,34 +297,247 @@ async def get_all_models(request, user: UserModel = None):
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
+            action_function, function_module = get_function_by_id(action_id)
             if action_function is None:
                 raise Exception(f"Action not found: {action_id}")
 
-            function_module = get_function_module_by_id(action_id)
             model["actions"].extend(
                 get_action_items_from_module(action_function, function_module)
             )
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
+            filter_function, function_module = get_function_by_id(filter_id)
             if filter_function is None:
                 raise Exception(f"Filter not found: {filter_id}")
 
-            function_module = get_function_module_by_id(filter_id)
-
             if getattr(function_module, "toggle", None):
                 model["filters"].extend(
                     get_filter_items_from_module(filter_function, function_module)
                 )
 
-    log.debug(f"get_all_models() returned {len(models)} models")
-
-    request.app.state.MODELS = {model["id"]: model for model in models}
+    log.debug(f"build_all_models() returned {len(models)} models")
     return models
 
 
+class ModelRegistry:
+    """
+    The full model list of build_all_models, shared across workers through
+    Redis when it is configured.
+
+    A list younger than `ttl` is served as is. An older one is still served
+    while a single background task rebuilds it (stale-while-revalidate), so
+    requests only wait for the backends when there is no list yet or it was
+    invalidated. With Redis, one worker builds under a lock and the others
+    load its list, so the backends are called once per `ttl` in total.
+
+    With ENABLE_FORWARD_USER_INFO_HEADERS the backends may list different
+    models for each user, so every request builds its own list.
+    """
+
+    REDIS_KEY = "open-webui:models"
+    # Builds run again when an invalidation lands during them, before the
+    # last one is returned without being cached
+    MAX_BUILDS = 3
+
+    def __init__(self, ttl: int = MODELS_CACHE_TTL):
+        self.ttl = ttl
+        self.app = None
+        self.models: Optional[list[dict]] = None
+        self.version: Optional[str] = None
+        self.updated_at = 0.0
+        # Bumped on invalidation so builds started before it are discarded
+        self.generation = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _is_shared(self) -> bool:
+        return self.ttl > 0 and not ENABLE_FORWARD_USER_INFO_HEADERS
+
+    def _is_fresh(self) -> bool:
+        return self.models is not None and time.time() - self.updated_at < self.ttl
+
+    def _get_redis(self, app):
+        return getattr(app.state, "redis", None)
+
+    def _set(self, app, models: list[dict], version: str, updated_at: float):
+        self.models = models
+        self.version = version
+        self.updated_at = updated_at
+        app.state.MODELS = {model["id"]: model for model in models}
+
+    async def _load_shared(self, app) -> bool:
+        """
+        Pick up a newer list built by another worker. False if there is no
+        shared list, i.e. none was built yet or it was invalidated.
+        """
+        redis = self._get_redis(app)
+        version = await redis.get(f"{self.REDIS_KEY}:version")
+        if not version:
+            return False
+
+        if version != self.version:
+            data = await redis.get(self.REDIS_KEY)
+            if not data:
+                return False
+            entry = json.loads(data)
+            if entry["version"] != version:
+                return False
+            self._set(app, entry["models"], version, entry["updated_at"])
+        return True
+
+    async def _build(self, request: Request, user: UserModel = None) -> list[dict]:
+        for _ in range(self.MAX_BUILDS):
+            generation = self.generation
+            models = await build_all_models(request, user=user)
+            if generation == self.generation:
+                break
+            log.debug("Rebuilding model list invalidated while it was built")
+        else:
+            request.app.state.MODELS = {model["id"]: model for model in models}
+            return models
+
+        version = str(uuid.uuid4())
+        updated_at = time.time()
+        self._set(request.app, models, version, updated_at)
+
+        redis = self._get_redis(request.app)
+        if redis is not None:
+            # Kept past the TTL so stale lists can still be served
+            await redis.set(
+                self.REDIS_KEY,
+                json.dumps(
+                    {"version": version, "updated_at": updated_at, "models": models},
+                    default=str,
+                ),
+                ex=max(self.ttl * 10, 3600),
+            )
+            await redis.set(
+                f"{self.REDIS_KEY}:version", version, ex=max(self.ttl * 10, 3600)
+            )
+        return models
+
+    async def refresh(
+        self, request: Request, user: UserModel = None, wait: bool = True
+    ) -> Optional[list[dict]]:
+        """
+        Rebuild the list, once at a time, and return it. With `wait` unset
+        the call returns None without building if another worker holds the
+        build lock.
+        """
+        started_at = time.time()
+        async with self._lock:
+            # Someone else built it while we waited for the lock
+            if self.models is not None and self.updated_at >= started_at:
+                return self.models
+
+            redis = self._get_redis(request.app)
+            if redis is None:
+                return await self._build(request, user)
+
+            # Wait for the worker holding the lock to share its list, and
+            # build without the lock if it doesn't within the deadline
+            locked = False
+            token = str(uuid.uuid4())
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                locked = await redis.set(
+                    f"{self.REDIS_KEY}:lock", token, nx=True, ex=60
+                )
+                if locked or not wait:
+                    break
+                await asyncio.sleep(0.1)
+                if await self._load_shared(request.app) and self.models is not None:
+                    return self.models
+            if not locked and not wait:
+                return None
+
+            try:
+                return await self._build(request, user)
+            finally:
+                if locked:
+                    await release_lock(redis, f"{self.REDIS_KEY}:lock", token)
+
+    def _refresh_in_background(self, app):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def refresh():
+            try:
+                await self.refresh(get_app_request(app), wait=False)
+            except Exception as e:
+                log.exception(f"Failed to refresh the model list: {e}")
+
+        self._refresh_task = asyncio.create_task(refresh())
+
+    async def get(self, request: Request, user: UserModel = None) -> list[dict]:
+        self.app = self.app or request.app
+        if not self._is_shared():
+            models = await build_all_models(request, user=user)
+            request.app.state.MODELS = {model["id"]: model for model in models}
+            return models
+
+        shared = self.models is not None
+        if self._get_redis(request.app) is not None:
+            try:
+                shared = await self._load_shared(request.app)
+            except Exception as e:
+                log.warning(f"Failed to read the model list from Redis: {e}")
+
+        if self.models is None or not shared:
+            models = await self.refresh(request, user)
+            # Invalidated again since, but the caller still gets a list
+            if self.models is None:
+                return list(models or [])
+        elif not self._is_fresh():
+            self._refresh_in_background(request.app)
+        return list(self.models or [])
+
+    async def invalidate(self):
+        """Rebuild the list on its next use, in every worker"""
+        self.generation += 1
+        self.models = None
+        self.version = None
+        if self.app is not None and self._get_redis(self.app) is not None:
+            try:
+                await self._get_redis(self.app).delete(
+                    self.REDIS_KEY, f"{self.REDIS_KEY}:version"
+                )
+            except Exception as e:
+                log.warning(f"Failed to invalidate the shared model list: {e}")
+
+    async def run(self, app):
+        """Keep the list fresh in the background, whether or not it's used"""
+        self.app = app
+        if not self._is_shared():
+            return
+
+        while True:
+            try:
+                request = get_app_request(app)
+                if self.models is None:
+                    await self.get(request)
+                elif not self._is_fresh():
+                    await self.refresh(request, wait=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Failed to refresh the model list: {e}")
+            await asyncio.sleep(max(self.ttl / 2, 1))
+
+
+def get_app_request(app) -> Request:
+    """A request for building the model list outside of a request"""
+    return Request({"type": "http", "app": app, "headers": [], "query_string": b""})
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
+async def get_all_models(request, user: UserModel = None):
+    return await MODEL_REGISTRY.get(request, user=user)
+
+
 def check_model_access(user, model):
     if model.get("arena"):
         if not has_access(
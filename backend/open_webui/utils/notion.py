@@ -0,0 +1,400 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_SESSION_SSL,
+    NOTION_API_BASE_URL,
+    NOTION_CLIENT_MAX_CONCURRENCY,
+    NOTION_CLIENT_MAX_RETRIES,
+    NOTION_CLIENT_RATE_LIMIT,
+    NOTION_CLIENT_TIMEOUT,
+    NOTION_SCHEMA_CACHE_TTL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+NOTION_VERSION = "2022-06-28"
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Methods safe to send again after a 5xx or a dropped connection, when
+# Notion may already have applied them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+# Form priority values accepted for each Notion "Priority" select option
+PRIORITY_ALIASES = {
+    "Critical": ["0 - Critical", "0", "critical", "Critical"],
+    "High": ["1 - High", "1", "high", "High"],
+    "Medium": ["2 - Medium", "2", "medium", "Medium"],
+    "Low": ["3 - Low", "3", "low", "Low"],
+}
+
+DEFAULT_PRIORITY_MAP = {
+    alias: option for option, aliases in PRIORITY_ALIASES.items() for alias in aliases
+}
+
+
+class NotionAPIError(Exception):
+    def __init__(self, status: Optional[int], message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimiter:
+    """Spaces calls so that at most `rate` start per second (0 disables)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+
+    async def acquire(self):
+        if not self.interval:
+            return
+
+        now = asyncio.get_running_loop().time()
+        start_at = max(self._next_at, now)
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        self._next_at = start_at + self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+class NotionClient:
+    """
+    Async Notion API client.
+
+    One aiohttp connection pool is reused for every request made with the same
+    integration token, at most `max_concurrency` requests are in flight at once,
+    requests start no faster than `rate_limit` per second, and 429/5xx
+    responses are retried with exponential backoff. A 429 pauses
+    every request of the client until its Retry-After has passed, since Notion
+    rate limits per integration.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = NOTION_API_BASE_URL,
+        max_concurrency: int = NOTION_CLIENT_MAX_CONCURRENCY,
+        max_retries: int = NOTION_CLIENT_MAX_RETRIES,
+        timeout: int = NOTION_CLIENT_TIMEOUT,
+        rate_limit: float = NOTION_CLIENT_RATE_LIMIT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION,
+        }
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._resume_at = 0.0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # Sessions and semaphores are bound to the loop they were created on
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._rate_limiter = RateLimiter(self.rate_limit)
+            self._loop = loop
+            self._resume_at = 0.0
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return min(2**attempt, 30) * (0.5 + random.random() / 2)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        idempotent: Optional[bool] = None,
+    ) -> dict:
+        body, _ = await self._request(
+            method, path, json=json, params=params, idempotent=idempotent
+        )
+        return body
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        idempotent: Optional[bool] = None,
+    ) -> Tuple[Optional[dict], Mapping[str, str]]:
+        """
+        Send a request with retries; the body is None for 304 Not Modified.
+        Unless `idempotent` (by default, for IDEMPOTENT_METHODS), a request
+        is only retried when Notion cannot have applied it: on a 429, or when
+        the connection failed before it was sent.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        session = self._get_session()
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                wait = self._resume_at - self._loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self._rate_limiter.acquire()
+
+                status, message, retry_after = None, "", None
+                retryable = idempotent
+                try:
+                    async with session.request(
+                        method,
+                        url,
+                        json=json,
+                        params=params,
+                        headers=headers,
+                        ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                    ) as response:
+                        if response.status == 304:
+                            return None, response.headers
+                        if response.status < 400:
+                            return await response.json(), response.headers
+
+                        status = response.status
+                        message = await response.text()
+                        retry_after = response.headers.get("Retry-After")
+                        retryable = status in RETRYABLE_STATUS_CODES and (
+                            idempotent or status == 429
+                        )
+                except aiohttp.ClientConnectorError as e:
+                    # The connection was never made, so nothing was sent
+                    message = f"Connection error: {e}"
+                    retryable = True
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    message = f"Connection error: {e}"
+
+            if not retryable or attempt >= self.max_retries:
+                raise NotionAPIError(status, message)
+
+            delay = self._backoff(attempt, retry_after)
+            if status == 429:
+                self._resume_at = max(self._resume_at, self._loop.time() + delay)
+            log.warning(
+                f"Notion {method} {path} failed ({status or message}), "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_database(self, database_id: str) -> dict:
+        return await self.request("GET", f"databases/{database_id}")
+
+    async def get_database_if_changed(
+        self, database_id: str, etag: Optional[str] = None
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """Fetch a database conditionally; returns (None, etag) when unchanged"""
+        body, headers = await self._request(
+            "GET",
+            f"databases/{database_id}",
+            headers={"If-None-Match": etag} if etag else None,
+        )
+        return body, headers.get("ETag") or etag
+
+    async def create_page(self, page_data: dict) -> dict:
+        # Sending it again after a 5xx or a timeout could create a duplicate
+        return await self.request("POST", "pages", json=page_data, idempotent=False)
+
+    async def list_users(
+        self, start_cursor: Optional[str] = None, page_size: int = 100
+    ) -> dict:
+        params = {"page_size": page_size}
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        return await self.request("GET", "users", params=params)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_clients: Dict[str, NotionClient] = {}
+
+
+def get_notion_client(token: str) -> NotionClient:
+    """Get the shared client for an integration token"""
+    if token not in _clients:
+        _clients[token] = NotionClient(token)
+    return _clients[token]
+
+
+async def close_notion_clients():
+    for client in _clients.values():
+        await client.close()
+
+
+####################################
+# Database schema cache
+####################################
+
+
+def build_priority_map(database_info: dict) -> Dict[str, str]:
+    """Map form priority values onto the database's Priority select options"""
+    priority_prop = database_info.get("properties", {}).get("Priority", {})
+    options = [
+        option["name"] for option in priority_prop.get("select", {}).get("options", [])
+    ]
+    if not options:
+        return dict(DEFAULT_PRIORITY_MAP)
+
+    log.info(f"Actual Notion priority options: {options}")
+    return {
+        alias: option
+        for option, aliases in PRIORITY_ALIASES.items()
+        if option in options
+        for alias in aliases
+    }
+
+
+def build_form_properties(database_info: dict) -> Dict[str, dict]:
+    """Summarize database properties for form validation"""
+    properties = {}
+    for prop_name, prop_info in database_info.get("properties", {}).items():
+        prop_type = list(prop_info.keys())[0] if prop_info else "unknown"
+        properties[prop_name] = {
+            "type": prop_type,
+            "options": (
+                prop_info.get(prop_type, {}).get("options", [])
+                if prop_type == "select"
+                else []
+            ),
+        }
+    return properties
+
+
+class NotionSchemaCache:
+    """
+    Database schemas keyed by database id, shared across workers through Redis
+    when it is configured.
+
+    Entries are served for `ttl` seconds, then revalidated with If-None-Match
+    (when Notion sent an ETag) and last_edited_time. The priority map and form
+    properties are derived once per schema version and reused while it is
+    unchanged. If Notion cannot be reached, the last known schema is served.
+    """
+
+    REDIS_KEY = "open-webui:notion:schema"
+
+    def __init__(self, ttl: int = NOTION_SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _is_fresh(self, entry: Optional[dict]) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < self.ttl
+
+    async def _load(self, database_id: str, redis=None) -> Optional[dict]:
+        entry = self._entries.get(database_id)
+        if redis is None or self._is_fresh(entry):
+            return entry
+
+        try:
+            data = await redis.get(f"{self.REDIS_KEY}:{database_id}")
+            if data:
+                shared = json.loads(data)
+                if entry is None or shared["fetched_at"] > entry["fetched_at"]:
+                    self._entries[database_id] = entry = shared
+        except Exception as e:
+            log.warning(f"Failed to read Notion schema from Redis: {e}")
+        return entry
+
+    async def _store(self, entry: dict, redis=None):
+        self._entries[entry["database_id"]] = entry
+        if redis is None:
+            return
+
+        try:
+            # Kept well past the TTL so stale entries can still be revalidated
+            await redis.set(
+                f"{self.REDIS_KEY}:{entry['database_id']}",
+                json.dumps(entry),
+                ex=max(self.ttl * 10, 3600),
+            )
+        except Exception as e:
+            log.warning(f"Failed to write Notion schema to Redis: {e}")
+
+    async def _fetch(
+        self, client: NotionClient, database_id: str, entry: Optional[dict]
+    ) -> dict:
+        database_info, etag = await client.get_database_if_changed(
+            database_id, entry.get("etag") if entry else None
+        )
+        now = time.time()
+        if database_info is None:
+            return {**entry, "fetched_at": now}
+
+        version = database_info.get("last_edited_time") or etag
+        if entry and version and entry["version"] == version:
+            return {**entry, "etag": etag, "fetched_at": now}
+
+        log.info(f"Notion database {database_id} schema version: {version}")
+        return {
+            "database_id": database_id,
+            "version": version,
+            "etag": etag,
+            "fetched_at": now,
+            "schema": database_info,
+            "priority_map": build_priority_map(database_info),
+            "properties": build_form_properties(database_info),
+        }
+
+    async def get(self, client: NotionClient, database_id: str, redis=None) -> dict:
+        entry = await self._load(database_id, redis)
+        if self._is_fresh(entry):
+            return entry
+
+        lock = self._locks.setdefault(database_id, asyncio.Lock())
+        async with lock:
+            # Another request or worker may have refreshed it while we waited
+            entry = await self._load(database_id, redis)
+            if self._is_fresh(entry):
+                return entry
+
+            try:
+                entry = await self._fetch(client, database_id, entry)
+            except Exception as e:
+                if entry is None:
+                    raise
+                log.warning(f"Serving stale Notion schema for {database_id}: {e}")
+                return entry
+
+            await self._store(entry, redis)
+            return entry
+
+
+notion_schema_cache = NotionSchemaCache()
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_SESSION_SSL,
+    AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
+    OLLAMA_ROUTING_STRATEGY,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+# Weight of the newest sample in the latency averages
+EWMA_ALPHA = 0.3
+# Seconds to first byte assumed before a URL has served a request, with the
+# model loaded and with a model load
+DEFAULT_LATENCY = 0.5
+DEFAULT_LOAD_LATENCY = 5.0
+# Seconds a URL that failed to connect is avoided for, unless a poll or a
+# request reaches it first
+FAILURE_BACKOFF = 30
+
+
+@dataclass
+class Backend:
+    in_flight: int = 0
+    # Seconds to first byte, for models that were loaded and that weren't
+    latency: Optional[float] = None
+    load_latency: Optional[float] = None
+    # Models loaded in memory, as "prefix_id.model" like OLLAMA_MODELS
+    loaded: set[str] = field(default_factory=set)
+    failed_at: Optional[float] = None
+
+
+@dataclass
+class Call:
+    url: str
+    model: str
+    started: float
+    warm: bool
+
+
+def ewma(average: Optional[float], sample: float) -> float:
+    if average is None:
+        return sample
+    return EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * average
+
+
+class OllamaBalancer:
+    """
+    Picks which Ollama URL serves a request for a model several of them have.
+
+    Each URL's in-flight requests, time to first byte (kept separately for
+    models that were loaded and ones that had to be) and loaded models are
+    tracked; the loaded models come from /api/ps polls and from the requests
+    themselves. A URL's expected wait is its in-flight requests times its
+    latency, plus a model load if the model isn't loaded there.
+
+    - least_outstanding: the URL with the shortest expected wait
+    - power_of_two: the better of two random URLs and the best URL that has
+      the model loaded, which spreads load when counts are stale
+    - random: any URL
+
+    URLs that failed to connect are only used if every other one has too.
+    Counts are per worker process; loaded models are shared through the
+    polls.
+    """
+
+    def __init__(self, strategy: str = OLLAMA_ROUTING_STRATEGY):
+        self.strategy = strategy
+        self.backends: dict[str, Backend] = {}
+
+    def _get(self, url: str) -> Backend:
+        backend = self.backends.get(url)
+        if backend is None:
+            backend = self.backends[url] = Backend()
+        return backend
+
+    def cost(self, url: str, model: str, now: float) -> tuple[bool, float]:
+        backend = self._get(url)
+        failed = (
+            backend.failed_at is not None and now - backend.failed_at < FAILURE_BACKOFF
+        )
+
+        latency = backend.latency or DEFAULT_LATENCY
+        wait = backend.in_flight * latency
+        if model in backend.loaded:
+            wait += latency
+        else:
+            wait += backend.load_latency or max(DEFAULT_LOAD_LATENCY, latency)
+        return failed, wait
+
+    def select(self, model: str, urls: list[str]) -> int:
+        """Index of the URL in `urls` to send a request for `model` to"""
+        if len(urls) <= 1 or self.strategy == "random":
+            return random.randrange(len(urls)) if urls else 0
+
+        now = time.monotonic()
+        costs = [self.cost(url, model, now) for url in urls]
+
+        candidates = range(len(urls))
+        if self.strategy == "power_of_two":
+            candidates = random.sample(candidates, 2)
+            warm = [i for i, url in enumerate(urls) if model in self._get(url).loaded]
+            if warm:
+                candidates.append(min(warm, key=costs.__getitem__))
+
+        # Random tie-break, so idle URLs share the first requests
+        return min(candidates, key=lambda i: (costs[i], random.random()))
+
+    def start(self, url: str, model: str) -> Call:
+        backend = self._get(url)
+        backend.in_flight += 1
+        return Call(url, model, time.monotonic(), model in backend.loaded)
+
+    def record(self, call: Call, ok: bool = True):
+        """
+        Call once the response headers arrive. ok is False on an error
+        status, as a 4xx (e.g. a 404 for a model the URL lacks) shows
+        neither that the model is loaded nor how long loading it takes.
+        """
+        backend = self._get(call.url)
+        if not ok:
+            return
+
+        elapsed = time.monotonic() - call.started
+        if call.warm:
+            backend.latency = ewma(backend.latency, elapsed)
+        else:
+            backend.load_latency = ewma(backend.load_latency, elapsed)
+        backend.loaded.add(call.model)
+        backend.failed_at = None
+
+    def fail(self, call: Call):
+        """Call when the URL couldn't be reached"""
+        self._get(call.url).failed_at = time.monotonic()
+
+    def finish(self, call: Call):
+        backend = self._get(call.url)
+        backend.in_flight = max(backend.in_flight - 1, 0)
+
+    async def poll(self, urls: list[tuple[str, Optional[str], Optional[str]]]):
+        """
+        Refresh the loaded models of each (url, key, prefix_id) from its
+        /api/ps
+        """
+        timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
+
+        async def poll_url(session, url, key, prefix_id):
+            try:
+                async with session.get(
+                    f"{url}/api/ps",
+                    headers={"Authorization": f"Bearer {key}"} if key else {},
+                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
+                ) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+            except Exception as e:
+                log.debug(f"Failed to poll {url}/api/ps: {e}")
+                self._get(url).failed_at = time.monotonic()
+                return
+
+            backend = self._get(url)
+            backend.loaded = {
+                f"{prefix_id}.{model['model']}" if prefix_id else model["model"]
+                for model in data.get("models", [])
+            }
+            backend.failed_at = None
+
+        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+            await asyncio.gather(
+                *[
+                    poll_url(session, url, key, prefix_id)
+                    for url, key, prefix_id in urls
+                ]
+            )
+
+        # Forget URLs that were removed from the config
+        for url in set(self.backends) - {url for url, _, _ in urls}:
+            if self.backends[url].in_flight == 0:
+                del self.backends[url]
+
+
+OLLAMA_BALANCER = OllamaBalancer()
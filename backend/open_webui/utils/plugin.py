@@ -1,3 +1,4 @@
+import asyncio
 import os
 import re
 import subprocess
@@ -6,15 +7,28 @@ from importlib import util
 import types
 import tempfile
 import logging
+import hashlib
+import json
+import time
 from typing import Optional
 
-from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
+from open_webui.env import (
+    INSTANCE_ID,
+    SRC_LOG_LEVELS,
+    PIP_OPTIONS,
+    PIP_PACKAGE_INDEX_OPTIONS,
+    UVICORN_WORKERS,
+)
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Seconds a module is served before its row is checked again for changes
+# made on other workers, when they can't be announced over Redis
+MODULE_CHECK_INTERVAL = 5
+
 
 def extract_frontmatter(content):
     """
@@ -167,60 +181,269 @@ def load_function_module_by_id(function_id: str, content: Optional[str] = None):
         os.unlink(temp_file.name)
 
 
-def get_function_module_from_cache(request, function_id, load_from_db=True):
-    if load_from_db:
-        # Always load from the database by default
-        # This is useful for hooks like "inlet" or "outlet" where the content might change
-        # and we want to ensure the latest content is used.
+####################################
+# Module cache
+####################################
 
-        function = Functions.get_function_by_id(function_id)
-        if not function:
-            raise Exception(f"Function not found: {function_id}")
-        content = function.content
+# Redis channel that workers announce function and tool changes on
+MODULE_CACHE_CHANNEL = "open-webui:plugin-modules"
 
-        new_content = replace_imports(content)
-        if new_content != content:
-            content = new_content
-            # Update the function content in the database
-            Functions.update_function_by_id(function_id, {"content": content})
-
-        if (
-            hasattr(request.app.state, "FUNCTION_CONTENTS")
-            and function_id in request.app.state.FUNCTION_CONTENTS
-        ) and (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            if request.app.state.FUNCTION_CONTENTS[function_id] == content:
-                return request.app.state.FUNCTIONS[function_id], None, None
-
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id, content
-        )
-    else:
-        # Load from cache (e.g. "stream" hook)
-        # This is useful for performance reasons
 
-        if (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            return request.app.state.FUNCTIONS[function_id], None, None
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
 
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id
+
+class ModuleCache:
+    """
+    Loaded function or tool modules, each kept with the hash of the content
+    it was loaded from.
+
+    With Redis, a cached module is served without reading the database
+    until it's invalidated, by the routers that change it on this worker or
+    by another worker over MODULE_CACHE_CHANNEL. Without Redis but with
+    several workers, their changes are caught by comparing the row's
+    updated_at with the one the module was loaded at, at most every
+    MODULE_CHECK_INTERVAL seconds. Either way it's then reloaded only if the
+    stored content's hash differs from the one it was loaded from.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        # id -> (content hash, what the loader returned)
+        self.entries: dict[str, tuple[str, tuple]] = {}
+        self.stale: set[str] = set()
+        # id -> (updated_at of the row, time it was checked)
+        self.versions: dict[str, tuple[Optional[int], int]] = {}
+
+    def get(
+        self,
+        id: str,
+        content_hash: Optional[str] = None,
+        allow_stale: bool = False,
+    ) -> Optional[tuple]:
+        """
+        The cached module of `id`, if it's current; or, given `content_hash`,
+        if it was loaded from that content
+        """
+        entry = self.entries.get(id)
+        if entry is None:
+            return None
+        if content_hash is not None:
+            if entry[0] != content_hash:
+                return None
+            self.stale.discard(id)
+        elif id in self.stale and not allow_stale:
+            return None
+        return entry[1]
+
+    def set(
+        self,
+        id: str,
+        content_hash: str,
+        loaded: tuple,
+        updated_at: Optional[int] = None,
+    ):
+        self.entries[id] = (content_hash, loaded)
+        self.stale.discard(id)
+        self.versions[id] = (updated_at, int(time.time()))
+
+    def is_updated(self, id: str, updated_at: Optional[int]) -> bool:
+        """
+        Whether the row may have changed since the module was loaded, given
+        its current updated_at. updated_at is in seconds, so a row checked
+        within the second it was updated could still change at that time.
+        """
+        version = self.versions.get(id)
+        if version is None or updated_at is None:
+            return True
+        loaded_updated_at, checked_at = version
+        return updated_at != loaded_updated_at or checked_at <= updated_at
+
+    def is_checked(self, id: str, interval: float) -> bool:
+        """Whether `id` was checked against its row in the last `interval` seconds"""
+        version = self.versions.get(id)
+        return version is not None and time.time() - version[1] < interval
+
+    def set_checked(self, id: str, updated_at: Optional[int]):
+        self.versions[id] = (updated_at, int(time.time()))
+
+    def mark_stale(self):
+        """Check every module against the database before it's next served"""
+        self.stale.update(self.entries)
+
+    def invalidate(self, id: Optional[str] = None, content_hash: Optional[str] = None):
+        """
+        Mark `id` as changed, unless it was loaded from content with
+        `content_hash`. Without a hash (e.g. deleted) it's dropped; without an
+        id every module is.
+        """
+        if id is None:
+            self.entries.clear()
+            self.stale.clear()
+            self.versions.clear()
+        elif content_hash is None:
+            self.entries.pop(id, None)
+            self.stale.discard(id)
+            self.versions.pop(id, None)
+        elif id in self.entries and self.entries[id][0] != content_hash:
+            self.stale.add(id)
+
+
+FUNCTION_MODULES = ModuleCache("function")
+TOOL_MODULES = ModuleCache("tool")
+MODULE_CACHES = {cache.kind: cache for cache in (FUNCTION_MODULES, TOOL_MODULES)}
+
+
+async def invalidate_module(
+    request,
+    cache: ModuleCache,
+    id: Optional[str] = None,
+    content_hash: Optional[str] = None,
+):
+    """
+    Invalidate a module on this worker and the others; call after the
+    change is committed, so the other workers reload the new content
+    """
+    cache.invalidate(id, content_hash)
+
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        await redis.publish(
+            MODULE_CACHE_CHANNEL,
+            json.dumps(
+                {
+                    "instance_id": INSTANCE_ID,
+                    "kind": cache.kind,
+                    "id": id,
+                    "hash": content_hash,
+                }
+            ),
         )
 
-    if not hasattr(request.app.state, "FUNCTIONS"):
-        request.app.state.FUNCTIONS = {}
 
-    if not hasattr(request.app.state, "FUNCTION_CONTENTS"):
-        request.app.state.FUNCTION_CONTENTS = {}
+async def module_cache_listener(app):
+    """
+    Apply the function and tool changes other workers announce, resubscribing
+    with backoff when the connection is lost
+    """
+    delay = 1
+    connected = False
+    while True:
+        pubsub = app.state.redis.pubsub()
+        try:
+            await pubsub.subscribe(MODULE_CACHE_CHANNEL)
+            if connected:
+                # Changes announced while disconnected were missed
+                for cache in MODULE_CACHES.values():
+                    cache.mark_stale()
+            connected = True
+            delay = 1
+
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    if data.get("instance_id") != INSTANCE_ID:
+                        MODULE_CACHES[data["kind"]].invalidate(data["id"], data["hash"])
+                except Exception as e:
+                    log.exception(f"Error handling module cache message: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(
+                f"Module cache listener disconnected, retrying in {delay}s: {e}"
+            )
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 60)
+
+
+def is_cached_module_current(
+    request, cache: ModuleCache, id: str, get_updated_at
+) -> bool:
+    """
+    Without Redis, changes made on other workers aren't announced, so the
+    row's updated_at is checked before a cached module is served, once
+    every MODULE_CHECK_INTERVAL seconds. A single worker's own changes
+    already invalidate the cache.
+    """
+    if getattr(request.app.state, "redis", None) is not None or UVICORN_WORKERS <= 1:
+        return True
+    if cache.is_checked(id, MODULE_CHECK_INTERVAL):
+        return True
+
+    updated_at = get_updated_at(id)
+    if cache.is_updated(id, updated_at):
+        return False
+    cache.set_checked(id, updated_at)
+    return True
+
+
+def get_function_module_from_cache(request, function_id, load_from_db=True):
+    """
+    (module, type, frontmatter) of a function, loaded once per content.
 
-    request.app.state.FUNCTIONS[function_id] = function_module
-    request.app.state.FUNCTION_CONTENTS[function_id] = content
+    Hooks call this on every request, so a cached module is served without
+    reading the database unless the function changed since it was loaded.
+    With `load_from_db=False` (e.g. the "stream" hook) a changed module is
+    served as is until it's next loaded.
+    """
+    loaded = FUNCTION_MODULES.get(function_id, allow_stale=not load_from_db)
+    if loaded is not None and (
+        not load_from_db
+        or is_cached_module_current(
+            request,
+            FUNCTION_MODULES,
+            function_id,
+            Functions.get_function_updated_at_by_id,
+        )
+    ):
+        return loaded
+
+    function = Functions.get_function_by_id(function_id)
+    if not function:
+        raise Exception(f"Function not found: {function_id}")
+    content = function.content
+
+    new_content = replace_imports(content)
+    if new_content != content:
+        content = new_content
+        # Update the function content in the database
+        Functions.update_function_by_id(function_id, {"content": content})
 
-    return function_module, function_type, frontmatter
+    content_hash = get_content_hash(content)
+    loaded = FUNCTION_MODULES.get(function_id, content_hash=content_hash)
+    if loaded is None:
+        loaded = load_function_module_by_id(function_id, content)
+    FUNCTION_MODULES.set(function_id, content_hash, loaded, function.updated_at)
+    return loaded
+
+
+def get_tool_module_from_cache(request, tool_id):
+    """(module, frontmatter) of a tool, loaded once per content"""
+    loaded = TOOL_MODULES.get(tool_id)
+    if loaded is not None and is_cached_module_current(
+        request, TOOL_MODULES, tool_id, Tools.get_tool_updated_at_by_id
+    ):
+        return loaded
+
+    tool = Tools.get_tool_by_id(tool_id)
+    if not tool:
+        raise Exception(f"Toolkit not found: {tool_id}")
+
+    content_hash = get_content_hash(replace_imports(tool.content))
+    loaded = TOOL_MODULES.get(tool_id, content_hash=content_hash)
+    if loaded is None:
+        # Requirements are installed at startup and when the tool is saved
+        loaded = load_tool_module_by_id(tool_id)
+    TOOL_MODULES.set(tool_id, content_hash, loaded, tool.updated_at)
+    return loaded
 
 
 def install_frontmatter_requirements(requirements: str):
@@ -17,6 +17,21 @@ def parse_redis_service_url(redis_url):
     }
 
 
+# Deletes a lock only while it holds the caller's token, so a lock that
+# expired and was taken by another worker is left alone
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+async def release_lock(redis, name: str, token: str) -> bool:
+    """Release a lock taken with `set(name, token, nx=True, ex=...)`"""
+    return bool(await redis.eval(RELEASE_LOCK_SCRIPT, 1, name, token))
+
+
 def get_redis_connection(
     redis_url, redis_sentinels, async_mode=False, decode_responses=True
 ):
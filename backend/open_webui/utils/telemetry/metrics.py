@@ -8,8 +8,10 @@ Metrics collected:
 
 * http.server.requests (counter)
 * http.server.duration (histogram, milliseconds)
+* rag.embedding_cache.lookups (counter)
 
-Attributes used: http.method, http.route, http.status_code
+Attributes used: http.method, http.route, http.status_code; the embedding
+cache counter uses result (hit/miss) and tier (memory/redis/sqlite)
 
 If you wish to add more attributes (e.g. user-agent) you can, but beware of
 high-cardinality label sets.
@@ -108,3 +110,29 @@ def setup_metrics(app: FastAPI) -> None:
         duration_histogram.record(elapsed_ms, attrs)
 
         return response
+
+
+def record_embedding_cache_lookups(
+    hits: int, misses: int, tier: str = "memory"
+) -> None:
+    """Count query embedding cache lookups; a no-op until setup_metrics runs."""
+
+    if hits:
+        _embedding_cache_lookups().add(hits, {"result": "hit", "tier": tier})
+    if misses:
+        _embedding_cache_lookups().add(misses, {"result": "miss", "tier": tier})
+
+
+_embedding_cache_counter = None
+
+
+def _embedding_cache_lookups():
+    global _embedding_cache_counter
+    if _embedding_cache_counter is None:
+        # The global meter proxies to the provider installed by setup_metrics
+        _embedding_cache_counter = metrics.get_meter(__name__).create_counter(
+            name="rag.embedding_cache.lookups",
+            description="Query embedding cache lookups",
+            unit="1",
+        )
+    return _embedding_cache_counter